@@ -0,0 +1,188 @@
+"""
+PDF渲染性能基准测试
+比较进程内渲染与多进程渲染后端的吞吐量（页/秒），以及图像转换路径的开销
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+# 无界面环境下使用offscreen平台创建QPixmap
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPixmap
+
+from pdf_viewer.pdf_document import PDFDocument
+from pdf_viewer.page_image import PageImage
+from pdf_viewer.process_renderer import ProcessPoolRenderer
+from pdf_viewer.parallel_search import ParallelSearchEngine, search_page
+
+
+def bench_in_process(file_path, zoom_level, page_count=None):
+    """进程内逐页渲染"""
+    document = PDFDocument(file_path)
+    document.render_config.cache_pages = False  # 只测量光栅化
+    pages = range(page_count or document.get_page_count())
+    
+    start = time.perf_counter()
+    for page_num in pages:
+        document.get_page_image(page_num, zoom_level)
+    elapsed = time.perf_counter() - start
+    
+    document.close()
+    return len(pages), elapsed
+
+
+def bench_process_pool(file_path, zoom_level, num_workers, page_count=None):
+    """多进程批量渲染（不计进程池启动时间）"""
+    document = PDFDocument(file_path)
+    pages = range(page_count or document.get_page_count())
+    document.close()
+    
+    with ProcessPoolRenderer(file_path, num_workers=num_workers) as renderer:
+        # 预热：确保所有工作进程都已打开文档
+        list(renderer.render_pages(range(min(num_workers, len(pages))), zoom_level))
+        
+        start = time.perf_counter()
+        for _ in renderer.render_pages(pages, zoom_level):
+            pass
+        elapsed = time.perf_counter() - start
+        
+    return len(pages), elapsed
+
+
+def bench_disk_cache(file_path, zoom_level, page_count=None):
+    """磁盘缓存：首次打开渲染并写入缓存，再次打开只读取缓存（均包含上传到QPixmap）"""
+    app = QApplication.instance() or QApplication([])
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name in ("首次打开（写入磁盘缓存）", "再次打开（读取磁盘缓存）"):
+            document = PDFDocument(file_path)
+            document.render_config.disk_cache = True
+            document.render_config.disk_cache_dir = cache_dir
+            document.apply_render_config()
+            pages = range(page_count or document.get_page_count())
+            
+            start = time.perf_counter()
+            for page_num in pages:
+                # 映射的缓存文件在读取像素时才真正从磁盘加载
+                page_image = document.get_page(page_num, zoom_level, write_disk_cache=True)
+                QPixmap.fromImage(page_image.image)
+            results[name] = (len(pages), time.perf_counter() - start)
+            document.close()
+            
+    return results
+
+
+def bench_search(file_path, query, max_workers, whole_word=False):
+    """单进程逐页搜索与多进程搜索（1到max_workers个进程）的吞吐量"""
+    results = {}
+    doc = fitz.open(file_path)
+    start = time.perf_counter()
+    for page in doc:
+        search_page(page, query, whole_word=whole_word)
+    results["单进程"] = (len(doc), time.perf_counter() - start)
+    page_count = len(doc)
+    doc.close()
+    
+    num_workers = 1
+    while num_workers <= max_workers:
+        with ParallelSearchEngine(file_path, num_workers) as engine:
+            # 预热：等待所有工作进程打开文档
+            list(engine.search(query, whole_word=whole_word, pages=range(min(num_workers, page_count))))
+            
+            start = time.perf_counter()
+            for _ in engine.search(query, whole_word=whole_word):
+                pass
+            results[f"多进程 ({num_workers} 进程)"] = (page_count, time.perf_counter() - start)
+        num_workers *= 2
+        
+    return results
+
+
+def convert_legacy(pix):
+    """旧转换链：PPM编码 → PIL解码 → numpy → QImage → QPixmap，返回复制的字节数"""
+    img_data = pix.tobytes("ppm")
+    pil_image = Image.open(io.BytesIO(img_data))
+    pil_image.load()
+    img_array = np.array(pil_image, dtype=np.uint8)
+    height, width, _ = img_array.shape
+    qt_image = QImage(img_array.data, width, height, 3 * width, QImage.Format_RGB888)
+    pixmap = QPixmap.fromImage(qt_image)
+    frame = width * height * 3
+    return len(img_data) + frame + img_array.nbytes + frame, pixmap
+
+
+def convert_direct(pix):
+    """零复制路径：samples缓冲区 → QImage → QPixmap，返回复制的字节数"""
+    page_image = PageImage.from_pixmap(pix)
+    pixmap = QPixmap.fromImage(page_image.image)
+    return page_image.nbytes, pixmap
+
+
+def bench_conversion(file_path, zoom_level, page_count=None):
+    """比较图像转换路径的耗时和复制字节数（不含光栅化）"""
+    app = QApplication.instance() or QApplication([])
+    doc = fitz.open(file_path)
+    pages = range(min(page_count or len(doc), len(doc)))
+    mat = fitz.Matrix(zoom_level, zoom_level)
+    pixmaps = [doc[page_num].get_pixmap(matrix=mat, alpha=False, colorspace=fitz.csRGB)
+               for page_num in pages]
+               
+    results = {}
+    for name, convert in (("PPM/PIL/numpy", convert_legacy), ("零复制", convert_direct)):
+        copied = 0
+        start = time.perf_counter()
+        for pix in pixmaps:
+            nbytes, _ = convert(pix)
+            copied += nbytes
+        elapsed = time.perf_counter() - start
+        results[name] = (elapsed * 1000 / len(pixmaps), copied / len(pixmaps))
+        
+    doc.close()
+    return results
+
+
+def report(name, pages, elapsed):
+    """输出测试结果"""
+    print(f"  {name:<24} {pages:>5} 页  {elapsed:8.2f} s  {pages / elapsed:8.1f} 页/秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF渲染性能基准测试")
+    parser.add_argument("file", nargs="?", default="test_document.pdf", help="PDF文件路径")
+    parser.add_argument("--zoom", type=float, default=1.0, help="缩放级别")
+    parser.add_argument("--pages", type=int, default=None, help="渲染页数（默认全部）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="工作进程数")
+    parser.add_argument("--search", default=None, help="同时测试搜索该文本的吞吐量")
+    parser.add_argument("--whole-word", action="store_true", help="搜索时全字匹配")
+    args = parser.parse_args()
+    
+    print(f"📊 渲染基准测试: {args.file} (缩放 {args.zoom:.0%})")
+    report("进程内渲染", *bench_in_process(args.file, args.zoom, args.pages))
+    report(f"多进程渲染 ({args.workers} 进程)",
+           *bench_process_pool(args.file, args.zoom, args.workers, args.pages))
+    for name, result in bench_disk_cache(args.file, args.zoom, args.pages).items():
+        report(name, *result)
+    
+    print("\n🔁 图像转换路径（每页）:")
+    for name, (ms_per_page, bytes_per_page) in bench_conversion(
+            args.file, args.zoom, args.pages).items():
+        print(f"  {name:<24} {ms_per_page:8.2f} ms  {bytes_per_page / 1024 / 1024:8.2f} MB 复制")
+        
+    if args.search:
+        mode = "全字匹配" if args.whole_word else "子串"
+        print(f"\n🔍 搜索 \"{args.search}\"（{mode}）:")
+        for name, result in bench_search(args.file, args.search, args.workers,
+                                         args.whole_word).items():
+            report(name, *result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+无界面基准测试套件
+在不同页数和复杂度的合成文档上测试页面渲染、连续模式布局、图像转换、文本搜索和目录读取，
+报告吞吐量、延迟分位数和峰值内存；可以保存基线，之后与基线比较发现性能退化
+
+用法:
+    python benchmark_suite.py                      # 运行并输出结果
+    python benchmark_suite.py --save-baseline      # 运行并保存为基线
+    python benchmark_suite.py --compare            # 与基线比较，有退化时返回非0
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import math
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+
+# 无界面环境下使用offscreen平台（工作进程导入本模块时同样生效）
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from create_test_pdf import COMPLEXITIES, SYNTHETIC_KEYWORD, create_synthetic_pdf
+
+
+DEFAULT_PAGE_COUNTS = [20, 200]
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "pdf_viewer_benchmark")
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+# 与基线相比中位延迟或峰值内存增加超过该比例视为退化
+DEFAULT_TOLERANCE = 0.25
+
+# 每个用例最多渲染的页数，以及整体操作的重复次数
+MAX_RENDER_PAGES = 30
+REPEATS = 5
+
+
+def get_peak_rss():
+    """当前进程的峰值常驻内存（字节），平台不支持时返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux以KB为单位，macOS以字节为单位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(samples, q):
+    """第q（0~1）分位数（最近秩法）"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def open_document(file_path):
+    """打开文档并关闭内存和磁盘缓存，每次都测量实际的渲染"""
+    from pdf_viewer.pdf_document import PDFDocument
+    document = PDFDocument(file_path)
+    document.render_config.cache_pages = False
+    document.render_config.disk_cache = False
+    document.apply_render_config()
+    return document
+
+
+def get_application():
+    """创建（或获取）QApplication"""
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def case_get_page_image(file_path):
+    """PDFDocument.get_page_image：每页一个样本"""
+    document = open_document(file_path)
+    samples = []
+    for page_num in range(min(MAX_RENDER_PAGES, document.get_page_count())):
+        start = time.perf_counter()
+        document.get_page_image(page_num, 1.0)
+        samples.append((time.perf_counter() - start) * 1000)
+    document.close()
+    return samples, 1, "页"
+
+
+def case_pil_to_pixmap(file_path):
+    """PDFViewerWidget.pil_to_pixmap：每页一个样本（不含渲染）"""
+    from pdf_viewer.pdf_viewer_widget import PDFViewerWidget
+    app = get_application()
+    widget = PDFViewerWidget()
+    document = open_document(file_path)
+    images = [document.get_page_image(page_num, 1.0)
+              for page_num in range(min(MAX_RENDER_PAGES, document.get_page_count()))]
+              
+    samples = []
+    for image in images:
+        start = time.perf_counter()
+        widget.pil_to_pixmap(image)
+        samples.append((time.perf_counter() - start) * 1000)
+    document.close()
+    return samples, 1, "页"
+
+
+def case_load_all_pages(file_path):
+    """PDFViewerWidget.load_all_pages：创建并摆放所有页面标签，直到事件循环处理完布局"""
+    from pdf_viewer.pdf_viewer_widget import PDFViewerWidget
+    app = get_application()
+    widget = PDFViewerWidget()
+    widget.resize(1000, 800)
+    widget.show()
+    document = open_document(file_path)
+    widget.set_pdf_document(document)
+    
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        widget.load_all_pages(1.0)
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+        
+    page_count = widget.total_pages
+    widget.clear_pages()
+    widget.shutdown_renderer()
+    document.close()
+    return samples, page_count, "页"
+
+
+def case_search_text(file_path):
+    """PDFDocument.search_text：逐页扫描整个文档（不使用全文索引）"""
+    document = open_document(file_path)
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        document.search_text(SYNTHETIC_KEYWORD)
+        samples.append((time.perf_counter() - start) * 1000)
+    page_count = document.get_page_count()
+    document.close()
+    return samples, page_count, "页"
+
+
+def case_get_outline(file_path):
+    """PDFDocument.get_outline：读取并构建目录树"""
+    document = open_document(file_path)
+    samples = []
+    for _ in range(REPEATS * 4):
+        start = time.perf_counter()
+        document.get_outline()
+        samples.append((time.perf_counter() - start) * 1000)
+    document.close()
+    return samples, 1, "次"
+
+
+CASES = {
+    'get_page_image': case_get_page_image,
+    'pil_to_pixmap': case_pil_to_pixmap,
+    'load_all_pages': case_load_all_pages,
+    'search_text': case_search_text,
+    'get_outline': case_get_outline,
+}
+
+
+def run_case(case, file_path):
+    """在工作进程中运行一个用例并汇总结果（每个用例使用新进程，峰值内存互不影响）"""
+    from pdf_viewer.perf_stats import perf_stats
+    samples, items_per_sample, unit = CASES[case](file_path)
+    total_seconds = sum(samples) / 1000
+    return {
+        'samples': len(samples),
+        'unit': unit,
+        'throughput': items_per_sample * len(samples) / total_seconds if total_seconds else 0.0,
+        'mean_ms': sum(samples) / len(samples),
+        'p50_ms': percentile(samples, 0.5),
+        'p90_ms': percentile(samples, 0.9),
+        'p99_ms': percentile(samples, 0.99),
+        'peak_rss': get_peak_rss(),
+        # 各阶段的耗时（来自perf_stats），便于定位退化发生在哪一步
+        'stages': {name: {'count': histogram['count'], 'mean_ms': histogram['mean_ms']}
+                   for name, histogram in perf_stats.snapshot().items()}
+    }
+
+
+def prepare_documents(data_dir, page_counts, complexities):
+    """生成（或复用已生成的）合成文档，返回 {名称: 路径}"""
+    os.makedirs(data_dir, exist_ok=True)
+    documents = {}
+    for complexity in complexities:
+        for page_count in page_counts:
+            name = f"{complexity}_{page_count}"
+            path = os.path.join(data_dir, f"synthetic_{name}.pdf")
+            if not os.path.exists(path):
+                print(f"生成合成文档 {path} ...")
+                create_synthetic_pdf(path, page_count, complexity)
+            documents[name] = path
+    return documents
+
+
+def run_suite(documents, cases):
+    """运行所有文档和用例的组合，返回 {'文档/用例': 结果}"""
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for document_name, path in documents.items():
+        for case in cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(run_case, case, path).result()
+            key = f"{document_name}/{case}"
+            results[key] = result
+            report(key, result)
+    return results
+
+
+def format_rss(peak_rss):
+    """格式化峰值内存"""
+    return f"{peak_rss / 1024 / 1024:7.1f} MB" if peak_rss else "      - MB"
+
+
+def report(key, result):
+    """输出一个用例的结果"""
+    print(f"  {key:<30} {result['throughput']:9.1f} {result['unit']}/秒  "
+          f"p50 {result['p50_ms']:8.2f}  p90 {result['p90_ms']:8.2f}  "
+          f"p99 {result['p99_ms']:8.2f} ms  峰值 {format_rss(result['peak_rss'])}")
+
+
+def save_baseline(path, results):
+    """保存基线"""
+    data = {
+        'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'results': results
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"\n基线已保存: {path}")
+
+
+def compare_baseline(path, results, tolerance):
+    """与基线比较，返回退化的用例列表"""
+    with open(path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+        
+    print(f"\n与基线比较（{baseline['created']}，{baseline['platform']}，容差 {tolerance:.0%}）:")
+    regressions = []
+    for key, result in results.items():
+        base = baseline['results'].get(key)
+        if base is None:
+            print(f"  {key:<30} 基线中没有该用例")
+            continue
+            
+        changes = []
+        for metric in ('p50_ms', 'p90_ms', 'peak_rss'):
+            if not base.get(metric) or not result.get(metric):
+                continue
+            change = result[metric] / base[metric] - 1
+            # p90受偶发抖动影响较大，只作参考
+            regressed = metric != 'p90_ms' and change > tolerance
+            changes.append(f"{metric} {change:+.0%}{' ❌' if regressed else ''}")
+            if regressed:
+                regressions.append((key, metric, change))
+        print(f"  {key:<30} {'  '.join(changes)}")
+        
+    if regressions:
+        print(f"\n❌ {len(regressions)} 项性能退化")
+    else:
+        print("\n✅ 没有性能退化")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF阅读器无界面基准测试套件")
+    parser.add_argument("--pages", type=int, nargs="+", default=DEFAULT_PAGE_COUNTS,
+                        help="合成文档的页数")
+    parser.add_argument("--complexity", nargs="+", choices=COMPLEXITIES, default=list(COMPLEXITIES),
+                        help="合成文档的复杂度")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES),
+                        help="要运行的用例")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="合成文档的存放目录")
+    parser.add_argument("--output", default=None, help="把结果保存为JSON")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, default=None,
+                        help="把结果保存为基线")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, default=None,
+                        help="与基线比较，有退化时返回1")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="允许的退化比例")
+    args = parser.parse_args()
+    
+    documents = prepare_documents(args.data_dir, args.pages, args.complexity)
+    print(f"📊 基准测试: {len(documents)} 个文档 × {len(args.cases)} 个用例")
+    results = run_suite(documents, args.cases)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+    if args.compare:
+        if compare_baseline(args.compare, results, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
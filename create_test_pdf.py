@@ -2,17 +2,35 @@
 创建测试PDF文件
 """
 
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+import argparse
 import os
+import random
+
+import fitz  # PyMuPDF
+
+
+# 合成文档的复杂度：text 纯文本；vector 文本加大量矢量图形；image 文本加位图
+COMPLEXITIES = ("text", "vector", "image")
+
+# 合成文档每页都会出现的关键词，用于搜索测试
+SYNTHETIC_KEYWORD = "benchmark"
+
+SYNTHETIC_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua viewer render page cache search "
+    "document outline thumbnail zoom scroll layout tile pixel font vector image"
+).split()
 
 
 def create_test_pdf():
-    """创建测试PDF文件"""
+    """创建测试PDF文件（需要reportlab）"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    
     filename = "test_document.pdf"
     doc = SimpleDocTemplate(filename, pagesize=A4,
                           rightMargin=72, leftMargin=72,
@@ -167,5 +185,93 @@ def create_test_pdf():
     print(f"测试PDF文件已创建: {filename}")
 
 
+def create_synthetic_pdf(filename, page_count, complexity="text", seed=0):
+    """用PyMuPDF生成基准测试用的合成文档（内容由seed决定，可重复生成）
+    
+    每页约50行文本并包含SYNTHETIC_KEYWORD；每10页一个一级目录项，其下每5页一个二级目录项
+    """
+    if complexity not in COMPLEXITIES:
+        raise ValueError(f"未知的复杂度: {complexity}")
+        
+    rng = random.Random(seed)
+    doc = fitz.open()
+    toc = []
+    image_xref = 0
+    vector_doc = None
+    for page_num in range(page_count):
+        page = doc.new_page(width=595, height=842)
+        
+        # 文本
+        lines = []
+        for line_num in range(50):
+            words = rng.choices(SYNTHETIC_WORDS, k=12)
+            if line_num % 10 == 0:
+                words[rng.randrange(len(words))] = SYNTHETIC_KEYWORD
+            lines.append(" ".join(words))
+        page.insert_text((50, 60), f"Page {page_num + 1}", fontsize=16)
+        page.insert_text((50, 90), "\n".join(lines), fontsize=9)
+        
+        if complexity == "vector":
+            # 大量带填充和透明度的矢量图形，光栅化开销明显高于纯文本
+            # 图形只生成几种，各页以表单XObject引用，生成大文档时不必逐页绘制
+            if vector_doc is None:
+                vector_doc = create_vector_templates(rng)
+            page.show_pdf_page(page.rect, vector_doc, page_num % len(vector_doc))
+        elif complexity == "image":
+            # 每页嵌入同一张位图（与扫描件类似，需要解码和缩放）
+            rect = fitz.Rect(50, 550, 545, 800)
+            if image_xref:
+                page.insert_image(rect, xref=image_xref)
+            else:
+                width, height = 800, 400
+                samples = bytes(rng.getrandbits(8) for _ in range(width * height * 3))
+                pixmap = fitz.Pixmap(fitz.csRGB, width, height, samples, False)
+                image_xref = page.insert_image(rect, pixmap=pixmap)
+                
+        if page_num % 10 == 0:
+            toc.append([1, f"Chapter {page_num // 10 + 1}", page_num + 1])
+        elif page_num % 5 == 0:
+            toc.append([2, f"Section {page_num // 5 + 1}", page_num + 1])
+            
+    doc.set_toc(toc)
+    doc.save(filename, garbage=3, deflate=True)
+    doc.close()
+    if vector_doc is not None:
+        vector_doc.close()
+    return filename
+    
+    
+def create_vector_templates(rng, count=4):
+    """生成几页只包含矢量图形的页面（带填充和透明度，光栅化开销明显高于纯文本）"""
+    doc = fitz.open()
+    for _ in range(count):
+        page = doc.new_page(width=595, height=842)
+        shape = page.new_shape()
+        for _ in range(8):
+            for _ in range(40):
+                x, y = rng.uniform(0, 545), rng.uniform(0, 792)
+                shape.draw_rect(fitz.Rect(x, y, x + rng.uniform(5, 50), y + rng.uniform(5, 50)))
+            shape.finish(color=(rng.random(), rng.random(), rng.random()),
+                         fill=(rng.random(), rng.random(), rng.random()), fill_opacity=0.3)
+        for _ in range(300):
+            x, y = rng.uniform(0, 475), rng.uniform(30, 812)
+            shape.draw_bezier((x, y), (x + 40, y - 30), (x + 80, y + 30), (x + 120, y))
+        shape.finish(color=(0, 0, 0), width=0.5)
+        shape.commit()
+    return doc
+
+
 if __name__ == "__main__":
-    create_test_pdf()
+    parser = argparse.ArgumentParser(description="创建测试PDF文件")
+    parser.add_argument("--pages", type=int, default=None,
+                        help="生成指定页数的合成文档（不指定时生成示例文档test_document.pdf）")
+    parser.add_argument("--complexity", choices=COMPLEXITIES, default="text", help="合成文档的复杂度")
+    parser.add_argument("--output", default=None, help="合成文档的文件名")
+    args = parser.parse_args()
+    
+    if args.pages is None:
+        create_test_pdf()
+    else:
+        output = args.output or f"synthetic_{args.complexity}_{args.pages}.pdf"
+        create_synthetic_pdf(output, args.pages, args.complexity)
+        print(f"合成文档已创建: {output}")
@@ -0,0 +1,190 @@
+"""
+磁盘渲染缓存
+渲染结果以原始RGB文件保存，跨会话复用；读取时用mmap直接映射为PageImage，
+按总字节数上限以LRU策略淘汰（访问时间记录在文件修改时间中，每个文件每次会话只更新一次）
+"""
+
+from collections import OrderedDict
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+from .page_image import PageImage
+
+
+# 文件头：魔数、宽、高、每行字节数
+HEADER = struct.Struct('<4sIII')
+MAGIC = b'PVR1'
+FILE_SUFFIX = '.rgb'
+
+
+def get_document_key(file_path):
+    """根据文件路径、大小和修改时间生成文档标识，文件改变后旧缓存自然失效"""
+    stat = os.stat(file_path)
+    identity = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """磁盘LRU缓存（线程安全）"""
+    
+    def __init__(self, cache_dir, max_bytes=1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()  # 文件名 -> 字节数，按最近使用排序
+        self._touched = set()  # 本次会话中已更新过修改时间的文件名
+        self._lock = threading.Lock()
+        
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+        
+    def _load_index(self):
+        """扫描缓存目录，按文件修改时间恢复LRU顺序"""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(FILE_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, name, stat.st_size))
+            
+        with self._lock:
+            for _, name, size in sorted(files):
+                self._entries[name] = size
+                self.current_bytes += size
+            self._evict()
+            
+    def _get_file_name(self, key):
+        """缓存键对应的文件名"""
+        return hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + FILE_SUFFIX
+        
+    def get(self, key):
+        """读取缓存图像，未命中时返回None"""
+        name = self._get_file_name(key)
+        path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            if name not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+            touch = name not in self._touched
+            self._touched.add(name)
+            
+        mapped = None
+        try:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, width, height, stride = HEADER.unpack_from(mapped)
+            valid = magic == MAGIC and len(mapped) == HEADER.size + stride * height
+            if valid and touch:
+                # 记录最近使用时间，下次启动时恢复LRU顺序；会话内的顺序由_entries维护，
+                # 同一文件再次命中时不再写文件系统
+                os.utime(path)
+        except (OSError, ValueError, struct.error):
+            valid = False
+            
+        if not valid:
+            # 文件损坏或已被删除
+            if mapped is not None:
+                mapped.close()
+            self._discard(name)
+            with self._lock:
+                self.misses += 1
+            return None
+            
+        with self._lock:
+            self.hits += 1
+        # 像素数据直接引用映射的文件，PageImage持有mmap直到不再使用
+        return PageImage(memoryview(mapped)[HEADER.size:], width, height, stride, mapped)
+        
+    def put(self, key, page_image):
+        """写入缓存图像"""
+        name = self._get_file_name(key)
+        path = os.path.join(self.cache_dir, name)
+        nbytes = HEADER.size + page_image.nbytes
+        if nbytes > self.max_bytes:
+            return
+            
+        # 先写临时文件再替换，避免其他线程或进程读到不完整的文件
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, page_image.width, page_image.height, page_image.stride))
+                f.write(page_image.samples)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+            
+        with self._lock:
+            self.current_bytes += nbytes - self._entries.pop(name, 0)
+            self._entries[name] = nbytes
+            self._touched.add(name)  # 刚写入的文件修改时间已是最新
+            self._evict()
+            
+    def _evict(self):
+        """删除最久未使用的文件直到满足限制"""
+        while self._entries and self.current_bytes > self.max_bytes:
+            name, nbytes = self._entries.popitem(last=False)
+            self._touched.discard(name)
+            self.current_bytes -= nbytes
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass  # 文件仍被映射（Windows）或已被删除
+                
+    def _discard(self, name):
+        """从索引中移除一个文件"""
+        with self._lock:
+            nbytes = self._entries.pop(name, None)
+            self._touched.discard(name)
+            if nbytes is not None:
+                self.current_bytes -= nbytes
+                
+    def set_limit(self, max_bytes):
+        """更新字节数上限"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+            
+    def clear(self):
+        """删除所有缓存文件"""
+        with self._lock:
+            for name in self._entries:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._touched.clear()
+            self.current_bytes = 0
+            
+    def get_stats(self):
+        """获取缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'files': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+            
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,48 @@
+"""
+后台文档加载
+打开文档时先按估计的页面尺寸布局并显示第一页，目录和各页的实际尺寸
+在后台线程中读取，读取完成后再更新界面
+"""
+
+import fitz  # PyMuPDF
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+# 每读取多少页的尺寸通知一次界面
+PAGE_SIZE_BATCH = 500
+
+
+class DocumentLoader(QThread):
+    """后台读取文档目录和页面尺寸，使用独立的fitz.Document"""
+    
+    outlineLoaded = pyqtSignal(list)  # 目录树，格式与PDFDocument.get_outline一致
+    pageSizesLoaded = pyqtSignal(int, int)  # 页码范围 [起始, 结束)，已写入PDFDocument.page_geometry，分批发出
+    
+    def __init__(self, pdf_document):
+        super().__init__()
+        self.pdf_document = pdf_document
+        self._stopping = False
+        
+    def run(self):
+        """先读取目录，再分批补全页面几何信息表"""
+        doc = fitz.open(self.pdf_document.file_path)
+        try:
+            outline = self.pdf_document.get_outline(doc)
+            if self._stopping:
+                return
+            self.outlineLoaded.emit(outline)
+            
+            page_geometry = self.pdf_document.page_geometry
+            for start in range(0, page_geometry.page_count, PAGE_SIZE_BATCH):
+                if self._stopping:
+                    return
+                end = min(start + PAGE_SIZE_BATCH, page_geometry.page_count)
+                page_geometry.load_pages(doc, start, end)
+                self.pageSizesLoaded.emit(start, end)
+        finally:
+            doc.close()
+            
+    def stop(self):
+        """取消并等待线程结束"""
+        self._stopping = True
+        self.wait()
@@ -0,0 +1,280 @@
+"""
+文档库索引
+在后台为目录树中的所有PDF建立SQLite FTS5全文索引，按文件大小和修改时间
+增量更新；查询时跨文档按相关度（bm25）排序返回页面级结果
+"""
+
+import multiprocessing
+import os
+import re
+import sqlite3
+
+import fitz  # PyMuPDF
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+DEFAULT_LIBRARY_INDEX = os.path.join(
+    os.path.expanduser("~"), ".cache", "pdf_viewer", "library.sqlite3"
+)
+
+# 每处理多少个文件提交一次事务
+COMMIT_INTERVAL = 20
+
+# 页面行号 = 文件编号 << PAGE_BITS | 页码，按文件删除时只需扫描一段行号
+PAGE_BITS = 20
+
+# 中日韩字符逐字分词：FTS5的unicode61分词器会把连续的汉字当作一个词
+CJK_PATTERN = re.compile(r'([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af])')
+CJK_SPACING_PATTERN = re.compile(r' ?([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]) ?')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    page_count INTEGER NOT NULL,
+    title TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(text, tokenize = 'unicode61');
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def segment_text(text):
+    """索引和查询前的分词预处理：在中日韩字符之间插入空格"""
+    return CJK_PATTERN.sub(r' \1 ', text)
+
+
+def unsegment_text(text):
+    """去掉segment_text插入的空格，用于显示摘要"""
+    return CJK_SPACING_PATTERN.sub(r'\1', text)
+
+
+def build_match_query(query):
+    """把用户输入转换为FTS5查询：每个词作为短语并按前缀匹配，多个词同时出现"""
+    phrases = []
+    for word in query.split():
+        tokens = segment_text(word).split()
+        if tokens:
+            phrase = ' '.join(tokens).replace('"', '""')
+            phrases.append(f'"{phrase}"*')
+    return ' '.join(phrases)
+
+
+def connect(db_path):
+    """打开索引数据库（WAL模式，后台写入时可以同时查询）"""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def find_pdf_files(root):
+    """遍历目录树，返回 {路径: (大小, 修改时间)}"""
+    files = {}
+    for dir_path, _, file_names in os.walk(root):
+        for name in file_names:
+            if not name.lower().endswith('.pdf'):
+                continue
+            path = os.path.join(dir_path, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files[path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def extract_text(path):
+    """提取文档每页的文本（在工作进程中执行），无法打开时页面列表为空"""
+    try:
+        with fitz.open(path) as doc:
+            title = doc.metadata.get('title') if doc.metadata else None
+            return path, title, [segment_text(page.get_text()) for page in doc]
+    except Exception as e:
+        print(f"无法索引 {path}: {e}")
+        return path, None, []
+
+
+class LibraryIndex:
+    """文档库全文索引（查询接口）"""
+    
+    def __init__(self, db_path=DEFAULT_LIBRARY_INDEX):
+        self.db_path = db_path
+        self.connection = connect(db_path)
+        
+    def search(self, query, root=None, limit=200):
+        """跨文档搜索，按相关度排序
+        
+        返回 [{'path', 'page'(0基), 'score', 'snippet'}, ...]，root用于只搜索某个目录下的文件
+        """
+        match_query = build_match_query(query)
+        if not match_query:
+            return []
+            
+        sql = (
+            "SELECT files.path, pages.rowid, bm25(pages) AS score, "
+            "snippet(pages, 0, '[', ']', '…', 16) "
+            f"FROM pages JOIN files ON files.id = pages.rowid >> {PAGE_BITS} "
+            "WHERE pages MATCH ?"
+        )
+        params = [match_query]
+        if root:
+            sql += " AND files.path >= ? AND files.path < ?"
+            prefix = os.path.join(os.path.abspath(root), '')
+            params += [prefix, prefix + '\uffff']
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        
+        try:
+            rows = self.connection.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"文档库搜索错误: {e}")
+            return []
+        page_mask = (1 << PAGE_BITS) - 1
+        return [
+            {'path': path, 'page': rowid & page_mask, 'score': -score,
+             'snippet': unsegment_text(' '.join(snippet.split()))}
+            for path, rowid, score, snippet in rows
+        ]
+        
+    def get_stats(self, root=None):
+        """获取已索引的文件数和页数"""
+        sql = "SELECT COUNT(*), COALESCE(SUM(page_count), 0) FROM files"
+        params = []
+        if root:
+            prefix = os.path.join(os.path.abspath(root), '')
+            sql += " WHERE path >= ? AND path < ?"
+            params = [prefix, prefix + '\uffff']
+        file_count, page_count = self.connection.execute(sql, params).fetchone()
+        return {'files': file_count, 'pages': page_count}
+        
+    def get_meta(self, key, default=None):
+        """读取设置项"""
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+        
+    def set_meta(self, key, value):
+        """保存设置项"""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+            
+    def close(self):
+        """关闭数据库连接"""
+        self.connection.close()
+
+
+class LibraryIndexer(QThread):
+    """后台增量索引目录树中的PDF
+    
+    只重新索引新增或大小、修改时间改变的文件，并删除已不存在的文件；
+    文本提取在多个工作进程中并行进行，写入数据库在本线程中完成。
+    """
+    
+    progress = pyqtSignal(int, int)  # 已处理文件数, 需要处理的文件数
+    indexingFinished = pyqtSignal(dict)  # 统计信息
+    
+    def __init__(self, root, db_path=DEFAULT_LIBRARY_INDEX, num_workers=None):
+        super().__init__()
+        self.root = os.path.abspath(root)
+        self.db_path = db_path
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self._stopping = False
+        
+    def run(self):
+        """执行增量索引"""
+        connection = connect(self.db_path)
+        try:
+            stats = self.update_index(connection)
+        finally:
+            connection.close()
+        if stats is not None:
+            self.indexingFinished.emit(stats)
+            
+    def update_index(self, connection):
+        """比较磁盘上的文件与已索引的记录，更新变化的部分；取消时返回None"""
+        files = find_pdf_files(self.root)
+        prefix = os.path.join(self.root, '')
+        indexed = {
+            path: (file_id, size, mtime_ns)
+            for file_id, path, size, mtime_ns in connection.execute(
+                "SELECT id, path, size, mtime_ns FROM files WHERE path >= ? AND path < ?",
+                (prefix, prefix + '\uffff')
+            )
+        }
+        
+        # 删除已不存在的文件
+        removed = [file_id for path, (file_id, _, _) in indexed.items() if path not in files]
+        with connection:
+            for file_id in removed:
+                self.delete_file(connection, file_id)
+                
+        changed = [path for path, (size, mtime_ns) in files.items()
+                   if indexed.get(path, (None, None, None))[1:] != (size, mtime_ns)]
+        self.progress.emit(0, len(changed))
+        
+        page_count = 0
+        if changed:
+            context = multiprocessing.get_context("spawn")
+            pool = context.Pool(min(self.num_workers, len(changed)))
+            try:
+                results = pool.imap_unordered(extract_text, changed, chunksize=4)
+                for done, (path, title, pages) in enumerate(results, 1):
+                    if self._stopping:
+                        connection.commit()
+                        return None
+                    if path in indexed:
+                        self.delete_file(connection, indexed[path][0])
+                    self.insert_file(connection, path, files[path], title, pages)
+                    page_count += len(pages)
+                    
+                    if done % COMMIT_INTERVAL == 0:
+                        connection.commit()
+                        self.progress.emit(done, len(changed))
+                connection.commit()
+            finally:
+                pool.terminate()
+                pool.join()
+                
+        self.progress.emit(len(changed), len(changed))
+        return {
+            'files': len(files),
+            'indexed_files': len(changed),
+            'indexed_pages': page_count,
+            'removed_files': len(removed)
+        }
+        
+    def insert_file(self, connection, path, file_stat, title, pages):
+        """写入一个文件及其各页文本"""
+        size, mtime_ns = file_stat
+        cursor = connection.execute(
+            "INSERT INTO files (path, size, mtime_ns, page_count, title) VALUES (?, ?, ?, ?, ?)",
+            (path, size, mtime_ns, len(pages), title)
+        )
+        file_id = cursor.lastrowid
+        connection.executemany(
+            "INSERT INTO pages (rowid, text) VALUES (?, ?)",
+            (((file_id << PAGE_BITS) | page_num, text)
+             for page_num, text in enumerate(pages[:1 << PAGE_BITS]))
+        )
+        
+    def delete_file(self, connection, file_id):
+        """删除一个文件的索引"""
+        connection.execute(
+            "DELETE FROM pages WHERE rowid BETWEEN ? AND ?",
+            (file_id << PAGE_BITS, ((file_id + 1) << PAGE_BITS) - 1)
+        )
+        connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        
+    def stop(self):
+        """取消并等待线程结束（已写入的文件保留，下次继续）"""
+        self._stopping = True
+        self.wait()
@@ -1,5 +1,6 @@
 import sys
 import os
+import time
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
     QScrollArea, QLabel, QToolBar, QMenuBar, QMenu, QAction,
@@ -17,9 +18,17 @@ from .pdf_document import PDFDocument
 from .pdf_viewer_widget import PDFViewerWidget
 from .bookmark_manager import BookmarkManager
 from .plugin_manager import PluginManager
+from .zoom_controller import ZoomController
+from .thumbnail_panel import ThumbnailPanel
+from .text_index import TextIndexBuilder
+from .document_loader import DocumentLoader
+from .perf_stats import perf_stats
 
 
 class PDFViewerMainWindow(QMainWindow):
+    # 打开新文档后发出（PDFDocument），插件据此释放与旧文档相关的资源
+    documentOpened = pyqtSignal(object)
+    
     def __init__(self):
         super().__init__()
         self.current_pdf = None
@@ -31,6 +40,20 @@ class PDFViewerMainWindow(QMainWindow):
         self.bookmark_manager = BookmarkManager()
         self.plugin_manager = PluginManager()
         
+        # 合并连续的缩放请求，输入停止后只重新渲染一次
+        self.zoom_controller = ZoomController(self.zoom_level, parent=self)
+        self.zoom_controller.zoomChanged.connect(self.on_zoom_changed)
+        self.zoom_controller.zoomCommitted.connect(self.apply_zoom)
+        self.zoom_from_combo = False
+        
+        # 后台建立全文索引的线程
+        self.text_index_builder = None
+        
+        # 后台读取目录和页面尺寸的线程，以及打开文档各阶段的耗时（毫秒）
+        self.document_loader = None
+        self.open_start = None
+        self.open_timings = {}
+        
         self.init_ui()
         self.setup_menus()
         self.setup_toolbar()
@@ -65,6 +88,9 @@ class PDFViewerMainWindow(QMainWindow):
         self.pdf_viewer.zoom_in_signal.connect(self.zoom_in)
         self.pdf_viewer.zoom_out_signal.connect(self.zoom_out)
         self.pdf_viewer.currentPageChanged.connect(self.on_page_changed)
+        self.pdf_viewer.firstPaint.connect(self.on_first_paint)
+        # 缩略图放入缓存后由查看器按内存预算释放
+        self.thumbnail_widget.thumbnailReady.connect(self.pdf_viewer.on_thumbnail_ready)
         splitter.addWidget(self.pdf_viewer)
         
         # 设置分割器比例
@@ -92,7 +118,8 @@ class PDFViewerMainWindow(QMainWindow):
         self.bookmark_widget = bookmark_widget
         
         # 缩略图选项卡
-        thumbnail_widget = QScrollArea()
+        thumbnail_widget = ThumbnailPanel()
+        thumbnail_widget.pageSelected.connect(self.goto_page)
         tab_widget.addTab(thumbnail_widget, "缩略图")
         self.thumbnail_widget = thumbnail_widget
         
@@ -265,6 +292,10 @@ class PDFViewerMainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         
+        # 首次绘制耗时
+        self.first_paint_label = QLabel()
+        self.status_bar.addPermanentWidget(self.first_paint_label)
+        
         # 进度条
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -279,13 +310,24 @@ class PDFViewerMainWindow(QMainWindow):
             self.open_pdf(file_path)
             
     def open_pdf(self, file_path):
-        """打开PDF文件"""
+        """打开PDF文件
+        
+        先按估计的页面尺寸布局并显示第一页，目录和页面尺寸在后台读取，
+        全部完成后才开始建立全文索引；各阶段耗时记录在open_timings中
+        """
         try:
+            self.open_start = time.perf_counter()
+            self.open_timings = {}
+            self.stop_document_loader()
+            self.stop_text_index_builder()
+            
             self.current_pdf = PDFDocument(file_path)
             self.total_pages = self.current_pdf.get_page_count()
+            self.record_open_stage('document')
             
             # 设置PDF文档到查看器
             self.pdf_viewer.set_pdf_document(self.current_pdf)
+            self.documentOpened.emit(self.current_pdf)
             
             # 更新UI
             self.setWindowTitle(f"PDF阅读器 - {os.path.basename(file_path)}")
@@ -293,28 +335,89 @@ class PDFViewerMainWindow(QMainWindow):
             self.page_label.setText(f"/ {self.total_pages}")
             
             # 根据模式显示页面
+            self.zoom_controller.reset(self.zoom_level)
             if self.pdf_viewer.continuous_mode:
                 # 连续模式：加载所有页面
-                self.pdf_viewer.load_all_pages(self.zoom_level)
+                self.pdf_viewer.load_all_pages(self.zoom_level, self.open_start)
                 self.current_page = 1
             else:
                 # 单页模式：显示第一页
                 self.current_page = 1
+                self.pdf_viewer.expect_first_paint(self.open_start)
                 self.display_page()
             
             self.page_spinbox.setValue(1)
+            self.record_open_stage('layout')
             
-            # 加载目录
-            self.load_outline()
-            
-            # 生成缩略图
+            # 生成缩略图（只生成可见项）
             self.generate_thumbnails()
             
+            # 后台读取目录和页面尺寸
+            self.outline_widget.clear()
+            self.load_document_in_background()
+            
             self.status_bar.showMessage(f"已打开: {file_path}")
             
         except Exception as e:
+            self.open_start = None
             QMessageBox.critical(self, "错误", f"无法打开PDF文件: {str(e)}")
             
+    def record_open_stage(self, stage):
+        """记录打开文档的某个阶段完成的时间"""
+        if self.open_start is not None:
+            self.open_timings[stage] = (time.perf_counter() - self.open_start) * 1000
+            
+    def load_document_in_background(self):
+        """启动后台读取目录和页面尺寸的线程"""
+        self.document_loader = DocumentLoader(self.current_pdf)
+        self.document_loader.outlineLoaded.connect(self.on_outline_loaded)
+        self.document_loader.pageSizesLoaded.connect(self.on_page_sizes_loaded)
+        self.document_loader.finished.connect(self.on_document_loaded)
+        self.document_loader.start()
+        
+    def stop_document_loader(self):
+        """停止正在进行的后台读取"""
+        if self.document_loader:
+            self.document_loader.outlineLoaded.disconnect(self.on_outline_loaded)
+            self.document_loader.pageSizesLoaded.disconnect(self.on_page_sizes_loaded)
+            self.document_loader.finished.disconnect(self.on_document_loaded)
+            self.document_loader.stop()
+            self.document_loader = None
+            
+    def on_outline_loaded(self, outline):
+        """目录读取完成"""
+        self.outline_widget.clear()
+        self.populate_outline(outline, self.outline_widget)
+        self.record_open_stage('outline')
+        
+    def on_page_sizes_loaded(self, start, end):
+        """一批页面的实际尺寸读取完成（已写入PDFDocument的页面几何信息表）"""
+        self.pdf_viewer.update_page_sizes(range(start, end))
+        
+    def on_document_loaded(self):
+        """目录和页面尺寸全部读取完成"""
+        self.document_loader = None
+        self.record_open_stage('geometry')
+        self.check_open_completed()
+        
+    def check_open_completed(self):
+        """第一页已显示且后台读取完成时，文档完全可交互"""
+        if self.open_start is None:
+            return
+        if 'first_page' not in self.open_timings or 'geometry' not in self.open_timings:
+            return
+            
+        self.record_open_stage('interactive')
+        self.open_start = None
+        first_page_ms = self.open_timings['first_page']
+        interactive_ms = self.open_timings['interactive']
+        self.first_paint_label.setText(f"首页: {first_page_ms:.0f} ms，可交互: {interactive_ms:.0f} ms")
+        perf_stats.record('open_first_page', first_page_ms)
+        perf_stats.record('open_interactive', interactive_ms)
+        
+        # 打开完成后再建立全文索引，不与第一页争用CPU
+        self.build_text_index()
+            
     def display_page(self):
         """显示当前页面"""
         if self.current_pdf:
@@ -322,12 +425,18 @@ class PDFViewerMainWindow(QMainWindow):
                 if self.pdf_viewer.continuous_mode:
                     # 连续模式：跳转到指定页面
                     self.pdf_viewer.goto_page(self.current_page)
+                elif self.current_pdf.render_config.should_use_tiles(self.zoom_level):
+                    # 单页模式的高缩放级别：只渲染视口内的图块，不预取整页
+                    self.pdf_viewer.display_tiled_page(self.current_page - 1, self.zoom_level)
+                    self.thumbnail_widget.set_current_page(self.current_page)
                 else:
-                    # 单页模式：显示单个页面
-                    page_image = self.current_pdf.get_page_image(
+                    # 单页模式：显示单个页面（预取器先记录是否命中，之后预取后面的页面）
+                    self.pdf_viewer.notify_page_turn(self.current_page - 1, self.zoom_level)
+                    page_image = self.current_pdf.get_page(
                         self.current_page - 1, self.zoom_level
                     )
-                    self.pdf_viewer.display_image(page_image)
+                    self.pdf_viewer.display_image(page_image, self.current_page - 1)
+                    self.thumbnail_widget.set_current_page(self.current_page)
                 
                 # 更新状态栏
                 self.status_bar.showMessage(
@@ -341,11 +450,20 @@ class PDFViewerMainWindow(QMainWindow):
         """页面改变事件处理"""
         self.current_page = page_num
         self.page_spinbox.setValue(page_num)
+        self.thumbnail_widget.set_current_page(page_num)
         # 更新状态栏
         self.status_bar.showMessage(
             f"页面 {self.current_page}/{self.total_pages} - 缩放: {int(self.zoom_level * 100)}%"
         )
                 
+    def on_first_paint(self, elapsed_ms):
+        """显示打开或缩放后首次绘制的耗时"""
+        if self.open_start is not None and 'first_page' not in self.open_timings:
+            self.open_timings['first_page'] = elapsed_ms
+            self.check_open_completed()
+        else:
+            self.first_paint_label.setText(f"首次绘制: {elapsed_ms:.0f} ms")
+        
     def next_page(self):
         """下一页"""
         if self.current_page < self.total_pages:
@@ -377,21 +495,11 @@ class PDFViewerMainWindow(QMainWindow):
             
     def zoom_in(self):
         """放大"""
-        self.zoom_level = min(self.zoom_level * 1.25, 5.0)
-        self.update_zoom_combo()
-        if self.pdf_viewer.continuous_mode:
-            self.pdf_viewer.zoom_to_level(self.zoom_level)
-        else:
-            self.display_page()
+        self.zoom_controller.zoom_by(1.25)
         
     def zoom_out(self):
         """缩小"""
-        self.zoom_level = max(self.zoom_level / 1.25, 0.1)
-        self.update_zoom_combo()
-        if self.pdf_viewer.continuous_mode:
-            self.pdf_viewer.zoom_to_level(self.zoom_level)
-        else:
-            self.display_page()
+        self.zoom_controller.zoom_by(1 / 1.25)
         
     def set_zoom_level(self, text):
         """设置缩放级别"""
@@ -400,46 +508,65 @@ class PDFViewerMainWindow(QMainWindow):
                 zoom = float(text[:-1]) / 100
             else:
                 zoom = float(text) / 100
-            self.zoom_level = max(0.1, min(zoom, 5.0))
-            if self.pdf_viewer.continuous_mode:
-                self.pdf_viewer.zoom_to_level(self.zoom_level)
-            else:
-                self.display_page()
         except ValueError:
-            pass
+            return
+            
+        # 用户正在编辑下拉框，不回写文本
+        self.zoom_from_combo = True
+        self.zoom_controller.request_zoom(zoom)
+        self.zoom_from_combo = False
+        
+    def on_zoom_changed(self, zoom_level, previous_zoom):
+        """目标缩放级别改变：更新界面并立即缩放已显示的图像"""
+        self.zoom_level = zoom_level
+        if not self.zoom_from_combo:
+            self.update_zoom_combo()
+        if self.current_pdf:
+            self.pdf_viewer.preview_zoom(zoom_level, previous_zoom)
+            
+    def apply_zoom(self, zoom_level):
+        """缩放输入停止后重新渲染"""
+        if not self.current_pdf:
+            return
+        if self.pdf_viewer.continuous_mode:
+            self.pdf_viewer.zoom_to_level(zoom_level)
+        else:
+            self.display_page()
             
     def update_zoom_combo(self):
         """更新缩放下拉框"""
         zoom_text = f"{int(self.zoom_level * 100)}%"
+        if self.zoom_combo.currentText() == zoom_text:
+            return
+        # 更新显示文本时不触发set_zoom_level，避免重复缩放
+        self.zoom_combo.blockSignals(True)
         self.zoom_combo.setCurrentText(zoom_text)
+        self.zoom_combo.blockSignals(False)
         
     def fit_width(self):
-        """适合宽度"""
+        """适合宽度（按渲染设置中的策略，以当前页面或最宽的页面为准）"""
         if self.current_pdf:
-            viewer_width = self.pdf_viewer.viewport().width()
-            page_width = self.current_pdf.get_page_size(self.current_page - 1)[0]
-            self.zoom_level = viewer_width / page_width * 0.95  # 留一点边距
-            self.update_zoom_combo()
-            if self.pdf_viewer.continuous_mode:
-                self.pdf_viewer.zoom_to_level(self.zoom_level)
-            else:
-                self.display_page()
+            page_num = self.current_page - 1
+            self.current_pdf.get_page_size(page_num)  # 确保当前页的尺寸已读取
+            zoom = self.current_pdf.page_geometry.get_fit_width_zoom(
+                self.pdf_viewer.viewport().width(), page_num,
+                self.current_pdf.render_config.fit_policy
+            )
+            self.zoom_controller.request_zoom(zoom * 0.95)  # 留一点边距
+            self.zoom_controller.commit()
             
     def fit_page(self):
-        """适合页面"""
+        """适合页面（按渲染设置中的策略，以当前页面或最大的页面为准）"""
         if self.current_pdf:
+            page_num = self.current_page - 1
+            self.current_pdf.get_page_size(page_num)
             viewer_size = self.pdf_viewer.viewport().size()
-            page_size = self.current_pdf.get_page_size(self.current_page - 1)
-            
-            width_ratio = viewer_size.width() / page_size[0]
-            height_ratio = viewer_size.height() / page_size[1]
-            
-            self.zoom_level = min(width_ratio, height_ratio) * 0.95
-            self.update_zoom_combo()
-            if self.pdf_viewer.continuous_mode:
-                self.pdf_viewer.zoom_to_level(self.zoom_level)
-            else:
-                self.display_page()
+            zoom = self.current_pdf.page_geometry.get_fit_page_zoom(
+                viewer_size.width(), viewer_size.height(), page_num,
+                self.current_pdf.render_config.fit_policy
+            )
+            self.zoom_controller.request_zoom(zoom * 0.95)
+            self.zoom_controller.commit()
                 
     def toggle_continuous_mode(self):
         """切换连续页面模式"""
@@ -448,6 +575,7 @@ class PDFViewerMainWindow(QMainWindow):
         
         # 重新加载PDF以应用新模式
         if self.current_pdf:
+            self.zoom_controller.reset(self.zoom_level)
             if continuous:
                 self.pdf_viewer.load_all_pages(self.zoom_level)
                 self.pdf_viewer.goto_page(self.current_page)
@@ -455,6 +583,16 @@ class PDFViewerMainWindow(QMainWindow):
                 self.pdf_viewer.clear_pages()
                 self.display_page()
             
+    def on_render_settings_changed(self):
+        """渲染设置改变后清除缓存并重新渲染"""
+        if self.current_pdf:
+            self.current_pdf.apply_render_config()
+            self.pdf_viewer.update_memory_budget()
+            if self.pdf_viewer.continuous_mode:
+                self.pdf_viewer.refresh_pages()
+            else:
+                self.display_page()
+                
     def toggle_fullscreen(self):
         """切换全屏"""
         if self.isFullScreen():
@@ -462,13 +600,6 @@ class PDFViewerMainWindow(QMainWindow):
         else:
             self.showFullScreen()
             
-    def load_outline(self):
-        """加载PDF目录"""
-        if self.current_pdf:
-            self.outline_widget.clear()
-            outline = self.current_pdf.get_outline()
-            self.populate_outline(outline, self.outline_widget)
-            
     def populate_outline(self, outline, parent):
         """填充目录树"""
         for item in outline:
@@ -517,9 +648,42 @@ class PDFViewerMainWindow(QMainWindow):
                 self.display_page()
             
     def generate_thumbnails(self):
-        """生成缩略图"""
-        # 这里可以实现缩略图生成逻辑
-        pass
+        """生成缩略图（只渲染缩略图面板中可见的项）"""
+        self.thumbnail_widget.set_pdf_document(self.current_pdf)
+        self.thumbnail_widget.set_current_page(self.current_page)
+        
+    def build_text_index(self):
+        """在后台加载或建立当前文档的全文索引"""
+        self.stop_text_index_builder()
+        if not self.current_pdf:
+            return
+            
+        self.text_index_builder = TextIndexBuilder(self.current_pdf)
+        self.text_index_builder.indexReady.connect(self.on_text_index_ready)
+        self.text_index_builder.start(QThread.LowPriority)
+        
+    def on_text_index_ready(self, text_index):
+        """全文索引就绪"""
+        builder = self.sender()
+        if builder is not None and self.current_pdf is builder.pdf_document:
+            self.current_pdf.text_index = text_index
+            
+    def stop_text_index_builder(self):
+        """停止正在建立的全文索引"""
+        if self.text_index_builder:
+            self.text_index_builder.indexReady.disconnect(self.on_text_index_ready)
+            self.text_index_builder.stop()
+            self.text_index_builder = None
+            
+    def closeEvent(self, event):
+        """窗口关闭事件"""
+        self.pdf_viewer.shutdown_renderer()
+        self.thumbnail_widget.shutdown()
+        self.stop_document_loader()
+        self.stop_text_index_builder()
+        # 插件可能有后台线程（如文档库索引），退出前停止
+        self.plugin_manager.finalize_all()
+        super().closeEvent(event)
         
     def show_about(self):
         """显示关于对话框"""
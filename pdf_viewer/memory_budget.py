@@ -0,0 +1,146 @@
+"""
+内存预算
+统计页面标签上的图像、图块，以及页面、图块、缩略图缓存占用的字节数，
+超出预算时按与视口的距离由远到近、同距离按最久未使用的顺序释放
+"""
+
+from collections import OrderedDict
+
+
+# 释放顺序：同样距离下先丢弃缓存中的图像（只是副本），再释放标签上的图像
+TIER_CACHE = 0
+TIER_PIXMAP = 1
+
+
+def get_pixmap_nbytes(pixmap):
+    """QPixmap占用的字节数"""
+    if pixmap is None or pixmap.isNull():
+        return 0
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+class MemoryBudget:
+    """页面图像的全局内存预算（只在界面线程中使用）
+    
+    标签上的图像通过track登记并提供释放回调；缓存通过set_caches登记，
+    由缓存自己统计字节数。视口内正在显示的图像不会被释放。
+    """
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._pixmaps = OrderedDict()  # (类别, 页码) -> (字节数, 释放回调)，按使用时间排序
+        self._pixmap_bytes = {'pages': 0, 'tiles': 0}
+        self._caches = {}  # 类别 -> PageCache
+        self.visible_range = None  # 视口内的页面 (首页, 末页)，0基
+        self.evictions = 0
+        
+    def set_caches(self, pages=None, tiles=None, thumbnails=None):
+        """登记文档的页面、图块和缩略图缓存"""
+        caches = {'pages': pages, 'tiles': tiles, 'thumbnails': thumbnails}
+        self._caches = {kind: cache for kind, cache in caches.items() if cache is not None}
+        
+    def set_limit(self, max_bytes):
+        """更新预算并立即按新预算释放"""
+        self.max_bytes = max_bytes
+        self.enforce()
+        
+    def set_visible_range(self, first, last):
+        """更新视口内的页面范围（闭区间）"""
+        self.visible_range = (first, last)
+        
+    def get_distance(self, page_index):
+        """页面与视口的距离（页数），视口内为0"""
+        if self.visible_range is None:
+            return 0
+        first, last = self.visible_range
+        if page_index < first:
+            return first - page_index
+        if page_index > last:
+            return page_index - last
+        return 0
+        
+    def track(self, kind, page_index, nbytes, release):
+        """登记（或更新）标签上某页的图像，release(page_index)用于释放
+        
+        kind为'pages'（整页图像或预览）或'tiles'（该页所有图块），登记后按预算释放
+        """
+        key = (kind, page_index)
+        self.untrack(kind, page_index)
+        if nbytes <= 0:
+            return
+        self._pixmaps[key] = (nbytes, release)
+        self._pixmap_bytes[kind] += nbytes
+        self.enforce()
+        
+    def untrack(self, kind, page_index):
+        """图像已被释放"""
+        entry = self._pixmaps.pop((kind, page_index), None)
+        if entry is not None:
+            self._pixmap_bytes[kind] -= entry[0]
+            
+    def touch(self, kind, page_index):
+        """标记为最近使用"""
+        key = (kind, page_index)
+        if key in self._pixmaps:
+            self._pixmaps.move_to_end(key)
+            
+    def clear(self):
+        """清除所有登记的图像（不调用释放回调）"""
+        self._pixmaps.clear()
+        self._pixmap_bytes = {'pages': 0, 'tiles': 0}
+        self.visible_range = None
+        
+    def get_used_bytes(self):
+        """当前占用的总字节数"""
+        cache_bytes = sum(cache.current_bytes for cache in self._caches.values())
+        return sum(self._pixmap_bytes.values()) + cache_bytes
+        
+    def enforce(self):
+        """超出预算时释放图像直到满足预算，返回释放的字节数"""
+        excess = self.get_used_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+            
+        # 候选按 (距离由远到近, 缓存优先, 最久未使用优先) 排序
+        candidates = []
+        for age, ((kind, page_index), (nbytes, _)) in enumerate(self._pixmaps.items()):
+            distance = self.get_distance(page_index)
+            if distance > 0:
+                candidates.append((-distance, TIER_PIXMAP, age, kind, page_index, nbytes))
+        for kind, cache in self._caches.items():
+            for age, (key, page_index, nbytes) in enumerate(cache.get_entries()):
+                candidates.append((-self.get_distance(page_index), TIER_CACHE, age,
+                                   kind, key, nbytes))
+        candidates.sort(key=lambda candidate: candidate[:3])
+        
+        freed = 0
+        for _, tier, _, kind, key, nbytes in candidates:
+            if freed >= excess:
+                break
+            if tier == TIER_CACHE:
+                self._caches[kind].discard(key)
+            else:
+                _, release = self._pixmaps[(kind, key)]
+                release(key)
+                self.untrack(kind, key)
+            freed += nbytes
+            self.evictions += 1
+        return freed
+        
+    def get_usage(self):
+        """获取内存占用（字节），供界面和插件查询
+        
+        返回 {'used', 'max', 'pages', 'tiles', 'thumbnails', 'pixmaps', 'caches', 'evictions'}，
+        pages/tiles/thumbnails为各类图像在标签和缓存中的合计
+        """
+        usage = {'pages': 0, 'tiles': 0, 'thumbnails': 0}
+        for kind, nbytes in self._pixmap_bytes.items():
+            usage[kind] += nbytes
+        for kind, cache in self._caches.items():
+            usage[kind] += cache.current_bytes
+        usage['pixmaps'] = sum(self._pixmap_bytes.values())
+        usage['caches'] = sum(cache.current_bytes for cache in self._caches.values())
+        usage['used'] = usage['pixmaps'] + usage['caches']
+        usage['max'] = self.max_bytes
+        usage['evictions'] = self.evictions
+        return usage
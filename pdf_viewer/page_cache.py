@@ -0,0 +1,120 @@
+"""
+页面图像缓存
+按LRU策略淘汰，同时限制缓存页数和占用字节数
+"""
+
+from collections import OrderedDict
+import threading
+
+
+class PageCache:
+    """页面图像LRU缓存（线程安全）"""
+    
+    def __init__(self, max_pages=50, max_bytes=256 * 1024 * 1024, page_of_key=None):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        # 从缓存键取出页码（0基），默认为键的第一项
+        self.page_of_key = page_of_key or (lambda key: key[0])
+        self.current_bytes = 0
+        self._entries = OrderedDict()  # key -> (image, nbytes)
+        self._lock = threading.Lock()
+        
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+    def get(self, key):
+        """获取缓存图像，未命中时返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+                
+            # 命中后移动到队尾（最近使用）
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        
+    def put(self, key, image, nbytes):
+        """放入缓存图像"""
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+                
+            # 单张图像超过字节上限时不缓存
+            if nbytes > self.max_bytes or self.max_pages <= 0:
+                return
+                
+            self._entries[key] = (image, nbytes)
+            self.current_bytes += nbytes
+            self._evict()
+        
+    def _evict(self):
+        """淘汰最久未使用的图像直到满足限制"""
+        while self._entries and (len(self._entries) > self.max_pages or
+                                 self.current_bytes > self.max_bytes):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
+            self.evictions += 1
+            
+    def set_limits(self, max_pages, max_bytes):
+        """更新缓存限制"""
+        with self._lock:
+            self.max_pages = max_pages
+            self.max_bytes = max_bytes
+            self._evict()
+        
+    def get_entries(self):
+        """获取缓存项 [(键, 页码, 字节数)]，按最久未使用在前排序"""
+        with self._lock:
+            return [(key, self.page_of_key(key), nbytes)
+                    for key, (_, nbytes) in self._entries.items()]
+            
+    def get_nbytes(self, key):
+        """缓存项的字节数，不在缓存中时返回0（不影响LRU顺序和命中统计）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else 0
+            
+    def discard(self, key):
+        """移除一个缓存项（由内存预算释放）"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.current_bytes -= entry[1]
+                self.evictions += 1
+                
+    def invalidate_page(self, page_num):
+        """使指定页面的所有缓存失效"""
+        with self._lock:
+            for key in [k for k in self._entries if self.page_of_key(k) == page_num]:
+                self.current_bytes -= self._entries.pop(key)[1]
+            
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+        
+    def get_stats(self):
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'pages': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_pages': self.max_pages,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+        
+    def __len__(self):
+        return len(self._entries)
+        
+    def __contains__(self, key):
+        return key in self._entries
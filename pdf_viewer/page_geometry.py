@@ -0,0 +1,231 @@
+"""
+页面几何信息表
+每个文档建立一次，用紧凑数组保存所有页面的页面框尺寸和旋转角度，
+无需加载或渲染页面即可按任意缩放级别计算整个连续模式的布局（与页数成线性关系）
+"""
+
+from array import array
+import threading
+
+
+# 适合宽度/适合页面的策略
+FIT_POLICY_PAGE = 'page'            # 按当前页面的尺寸
+FIT_POLICY_MAX_WIDTH = 'max_width'  # 按文档中最宽（最高）的页面，保证每一页都能完整显示
+
+# 默认页面尺寸（A4，PDF点），文档没有页面时使用
+DEFAULT_PAGE_SIZE = (595.0, 842.0)
+
+
+def parse_box(value):
+    """解析PDF矩形数组字符串，如 '[0 0 595 842]'，返回 (x0, y0, x1, y1)，无效时返回None"""
+    try:
+        numbers = [float(item) for item in value.strip().strip('[]').split()]
+    except ValueError:
+        return None
+    if len(numbers) != 4:
+        return None
+    x0, y0, x1, y1 = numbers
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+def compute_offsets(sizes, spacing):
+    """按页面显示尺寸 [(宽, 高)] 计算每页的垂直位置
+    
+    返回 (位置列表, 最大宽度, 总高度)，页面之间间隔spacing
+    """
+    offsets = []
+    max_width = 0
+    y = 0
+    for width, height in sizes:
+        offsets.append(y)
+        max_width = max(max_width, width)
+        y += height + spacing
+    return offsets, max_width, max(0, y - spacing)
+
+
+def rotate_box(box, rotation, width, height):
+    """把未旋转页面坐标中的矩形 (x0, y0, x1, y1) 转换为显示坐标（与page.rotation_matrix一致）
+    
+    width, height为页面的显示尺寸（已考虑旋转）；搜索结果和文本坐标都在未旋转的页面坐标中
+    """
+    x0, y0, x1, y1 = box
+    if rotation == 90:
+        return width - y1, x0, width - y0, x1
+    if rotation == 180:
+        return width - x1, height - y1, width - x0, height - y0
+    if rotation == 270:
+        return y0, height - x1, y1, height - x0
+    return x0, y0, x1, y1
+
+
+class PageGeometry:
+    """文档所有页面的几何信息
+    
+    保存每页未旋转的页面框宽高（PDF点，有CropBox时取其与MediaBox的交集，
+    与PyMuPDF的page.rect一致）和旋转角度。尚未读取的页面以第一页的尺寸估计。
+    页面框直接从页面对象的字典读取（包括从页面树继承的值），不需要加载页面。
+    DocumentLoader线程和界面线程（get_page_size）都会调用load_pages，写入由锁保护。
+    """
+    
+    def __init__(self, page_count, default_size=DEFAULT_PAGE_SIZE):
+        self.page_count = page_count
+        self.widths = array('d', [default_size[0]]) * page_count
+        self.heights = array('d', [default_size[1]]) * page_count
+        self.rotations = array('h', [0]) * page_count
+        self.loaded = bytearray(page_count)  # 每页是否已读取实际尺寸
+        self.loaded_count = 0
+        self._max_size = None  # (最大显示宽度, 最大显示高度)，页面尺寸变化时重新计算
+        self._lock = threading.Lock()
+        
+    @classmethod
+    def from_document(cls, doc):
+        """读取文档所有页面的几何信息"""
+        geometry = cls.for_document(doc)
+        geometry.load_pages(doc, 0, geometry.page_count)
+        return geometry
+        
+    @classmethod
+    def for_document(cls, doc):
+        """只读取第一页，其余页面以第一页的尺寸估计，之后通过load_pages补全"""
+        geometry = cls(len(doc))
+        if geometry.page_count:
+            geometry.load_pages(doc, 0, 1)
+            width, height = geometry.widths[0], geometry.heights[0]
+            rotation = geometry.rotations[0]
+            for page_num in range(1, geometry.page_count):
+                geometry.widths[page_num] = width
+                geometry.heights[page_num] = height
+                geometry.rotations[page_num] = rotation
+        return geometry
+        
+    def load_pages(self, doc, start, end):
+        """读取 [start, end) 范围内页面的页面框和旋转角度"""
+        inherited = {}  # 页面树中间节点继承的值 {(xref, 键): 值}，多页共用
+        for page_num in range(start, min(end, self.page_count)):
+            if self.loaded[page_num]:
+                continue
+            geometry = self._read_page(doc, page_num, inherited)
+            if geometry is None:
+                # 结构不常见的页面退回到加载页面
+                page = doc[page_num]
+                geometry = page.cropbox.width, page.cropbox.height, page.rotation
+            width, height, rotation = geometry
+            with self._lock:
+                # 另一个线程可能已经读取了同一页，只计数一次
+                if self.loaded[page_num]:
+                    continue
+                self.widths[page_num] = width
+                self.heights[page_num] = height
+                self.rotations[page_num] = rotation
+                self.loaded[page_num] = 1
+                self.loaded_count += 1
+                self._max_size = None
+        
+    def _read_page(self, doc, page_num, inherited):
+        """从页面字典读取 (宽, 高, 旋转角度)，无法解析时返回None"""
+        try:
+            xref = doc.page_xref(page_num)
+            media_box = parse_box(self._get_inherited(doc, xref, 'MediaBox', inherited) or '')
+            if media_box is None:
+                return None
+            box = media_box
+            crop_value = self._get_inherited(doc, xref, 'CropBox', inherited)
+            if crop_value is not None:
+                crop_box = parse_box(crop_value)
+                if crop_box is None:
+                    return None
+                x0, y0 = max(crop_box[0], media_box[0]), max(crop_box[1], media_box[1])
+                x1, y1 = min(crop_box[2], media_box[2]), min(crop_box[3], media_box[3])
+                if x1 > x0 and y1 > y0:
+                    box = (x0, y0, x1, y1)
+            rotation = int(float(self._get_inherited(doc, xref, 'Rotate', inherited) or 0))
+        except (RuntimeError, ValueError):
+            return None
+        if box[2] <= box[0] or box[3] <= box[1]:
+            return None
+        rotation %= 360
+        return box[2] - box[0], box[3] - box[1], rotation if rotation % 90 == 0 else 0
+        
+    def _get_inherited(self, doc, xref, key, inherited):
+        """读取对象字典中的键，没有时沿Parent向上查找；间接引用会被解析"""
+        kind, value = doc.xref_get_key(xref, key)
+        if kind == 'xref':
+            return doc.xref_object(int(value.split()[0]), compressed=True)
+        if kind != 'null':
+            return value
+            
+        kind, parent = doc.xref_get_key(xref, 'Parent')
+        if kind != 'xref':
+            return None
+        parent_key = (int(parent.split()[0]), key)
+        if parent_key not in inherited:
+            inherited[parent_key] = self._get_inherited(doc, parent_key[0], key, inherited)
+        return inherited[parent_key]
+        
+    def is_loaded(self, page_num):
+        """页面的实际尺寸是否已读取"""
+        return bool(self.loaded[page_num])
+        
+    def is_complete(self):
+        """所有页面是否都已读取"""
+        return self.loaded_count >= self.page_count
+        
+    def get_page_size(self, page_num):
+        """页面的显示尺寸（PDF点，已考虑旋转）"""
+        if self.rotations[page_num] in (90, 270):
+            return self.heights[page_num], self.widths[page_num]
+        return self.widths[page_num], self.heights[page_num]
+        
+    def get_rotation(self, page_num):
+        """页面的旋转角度"""
+        return self.rotations[page_num]
+        
+    def get_max_size(self):
+        """所有页面中最大的显示宽度和高度（PDF点）"""
+        with self._lock:
+            if self._max_size is None:
+                max_width = max_height = 0.0
+                for page_num in range(self.page_count):
+                    width, height = self.get_page_size(page_num)
+                    max_width = max(max_width, width)
+                    max_height = max(max_height, height)
+                self._max_size = (max_width, max_height)
+            return self._max_size
+        
+    def get_max_width(self):
+        """所有页面中最大的显示宽度（PDF点）"""
+        return self.get_max_size()[0]
+        
+    def get_display_size(self, page_num, zoom_level):
+        """页面在指定缩放级别下的显示尺寸（逻辑像素）"""
+        width, height = self.get_page_size(page_num)
+        return max(1, int(width * zoom_level)), max(1, int(height * zoom_level))
+        
+    def get_display_sizes(self, zoom_level):
+        """所有页面在指定缩放级别下的显示尺寸"""
+        return [self.get_display_size(page_num, zoom_level) for page_num in range(self.page_count)]
+        
+    def compute_layout(self, zoom_level, spacing):
+        """计算指定缩放级别下的连续模式布局
+        
+        返回 (显示尺寸列表, 位置列表, 最大宽度, 总高度)，只做算术，不加载页面
+        """
+        sizes = self.get_display_sizes(zoom_level)
+        offsets, max_width, total_height = compute_offsets(sizes, spacing)
+        return sizes, offsets, max_width, total_height
+        
+    def get_fit_width_zoom(self, viewport_width, page_num, policy=FIT_POLICY_PAGE):
+        """适合宽度的缩放级别：按当前页面或最宽的页面"""
+        if policy == FIT_POLICY_MAX_WIDTH:
+            width = self.get_max_width()
+        else:
+            width = self.get_page_size(page_num)[0]
+        return viewport_width / width
+        
+    def get_fit_page_zoom(self, viewport_width, viewport_height, page_num, policy=FIT_POLICY_PAGE):
+        """适合页面的缩放级别：按当前页面或最大的页面宽高"""
+        if policy == FIT_POLICY_MAX_WIDTH:
+            width, height = self.get_max_size()
+        else:
+            width, height = self.get_page_size(page_num)
+        return min(viewport_width / width, viewport_height / height)
@@ -0,0 +1,64 @@
+"""
+渲染后的页面图像
+直接包装像素缓冲区为QImage，避免PPM编码、PIL解码和numpy转换带来的整帧复制
+"""
+
+from PIL import Image
+from PyQt5.QtGui import QImage
+
+
+class PageImage:
+    """页面图像（RGB888）
+    
+    QImage不复制像素数据，只引用samples缓冲区，因此必须持有缓冲区的
+    所有者（fitz.Pixmap或bytes）直到QImage不再使用。跨线程传递时应传递
+    PageImage对象本身，而不是单独的QImage。
+    """
+    
+    def __init__(self, samples, width, height, stride, owner=None):
+        self.samples = samples      # 像素缓冲区（bytes或memoryview）
+        self.width = width
+        self.height = height
+        self.stride = stride        # 每行字节数
+        self._owner = owner         # 缓冲区所有者，保证缓冲区有效
+        self.device_pixel_ratio = 1.0
+        self.image = QImage(samples, width, height, stride, QImage.Format_RGB888)
+        
+    @classmethod
+    def from_pixmap(cls, pixmap):
+        """零复制包装fitz.Pixmap（要求RGB、无alpha）"""
+        return cls(pixmap.samples_mv, pixmap.width, pixmap.height, pixmap.stride, pixmap)
+        
+    @classmethod
+    def from_pil(cls, pil_image):
+        """从PIL图像创建（复制一次像素数据）"""
+        if pil_image.mode != 'RGB':
+            pil_image = pil_image.convert('RGB')
+        width, height = pil_image.size
+        return cls(pil_image.tobytes('raw', 'RGB'), width, height, width * 3)
+        
+    def set_device_pixel_ratio(self, ratio):
+        """设置设备像素比，使高分屏上的逻辑尺寸等于页面显示尺寸"""
+        self.device_pixel_ratio = ratio
+        self.image.setDevicePixelRatio(ratio)
+        
+    def with_device_pixel_ratio(self, ratio):
+        """共用像素缓冲区、只有设备像素比不同的图像（不复制像素），用于按其他缩放级别显示"""
+        view = PageImage(self.samples, self.width, self.height, self.stride, self)
+        view.set_device_pixel_ratio(ratio)
+        return view
+        
+    @property
+    def nbytes(self):
+        """像素数据占用的字节数"""
+        return self.stride * self.height
+        
+    def size(self):
+        """图像尺寸 (宽, 高)"""
+        return self.width, self.height
+        
+    def to_pil(self):
+        """转换为PIL图像（复制一份，结果与本对象的缓冲区无关）"""
+        return Image.frombuffer(
+            'RGB', (self.width, self.height), self.samples, 'raw', 'RGB', self.stride, 1
+        ).copy()
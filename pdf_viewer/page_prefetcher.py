@@ -0,0 +1,194 @@
+"""
+单页模式的翻页预取
+根据最近的翻页方向和速度，在界面空闲时以最低优先级把后面几页渲染到页面缓存，
+翻页时直接从缓存显示；内存或CPU紧张时少预取，跳转（目录、书签等）时立即停止
+"""
+
+from collections import deque
+import math
+import os
+import time
+
+from PyQt5.QtCore import QTimer
+
+from .render_scheduler import PRIORITY_IDLE
+
+
+# 记录最近的翻页次数，用于估计方向和速度
+HISTORY_SIZE = 8
+
+# 翻页间隔超过该秒数时不再计入速度
+HISTORY_SECONDS = 10.0
+
+# 一次翻过超过该页数视为跳转
+JUMP_DISTANCE = 3
+
+# 按翻页速度预取未来多少秒内会看到的页面
+LOOKAHEAD_SECONDS = 2.0
+
+# 翻页后等待多久（毫秒）再开始预取，连续翻页时只预取一次
+IDLE_DELAY = 50
+
+# 预取后内存占用不超过预算的比例
+MEMORY_HEADROOM = 0.8
+
+# 每个CPU的平均负载超过该值时最多预取一页
+CPU_LOAD_LIMIT = 1.0
+
+
+def get_cpu_load():
+    """每个CPU的平均负载（最近1分钟），平台不支持时返回None"""
+    if not hasattr(os, 'getloadavg'):
+        return None
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        return None
+
+
+class PagePrefetcher:
+    """翻页预取器（只在界面线程中使用）
+    
+    每次翻页时调用on_page_changed：先判断该页是否已被预取（命中率），
+    再记录翻页方向和时间，空闲时沿阅读方向请求渲染后面的页面。
+    """
+    
+    def __init__(self, pdf_document, render_scheduler, memory_budget):
+        self.pdf_document = pdf_document
+        self.render_scheduler = render_scheduler
+        self.memory_budget = memory_budget
+        
+        self.history = deque(maxlen=HISTORY_SIZE)  # (时间, 页码)
+        self.prefetched = set()  # 已请求预取的 (页码, 缩放级别)
+        self.current = None  # 当前显示的 (页码, 缩放级别)
+        self.direction = 1
+        self.lookahead = 0
+        self.hits = 0
+        self.misses = 0
+        self.requested = 0
+        
+        self.prefetch_timer = QTimer()
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(IDLE_DELAY)
+        self.prefetch_timer.timeout.connect(self.prefetch)
+        
+    def on_page_changed(self, page_index, zoom_level):
+        """即将显示page_index（在读取页面之前调用，以便判断是否命中）"""
+        now = time.monotonic()
+        previous = self.history[-1][1] if self.history else None
+        self.current = (page_index, zoom_level)
+        
+        if previous is not None and abs(page_index - previous) > JUMP_DISTANCE:
+            # 跳转：立即停止预取，下一次翻页后重新学习阅读方向
+            self.cancel()
+            self.history.clear()
+            self.history.append((now, page_index))
+            return
+            
+        if previous is not None and page_index != previous:
+            if self.is_prefetched(page_index, zoom_level):
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.prefetched.discard((page_index, zoom_level))
+            
+        if previous != page_index:
+            self.history.append((now, page_index))
+        self.prefetch_timer.start()
+        
+    def is_prefetched(self, page_index, zoom_level):
+        """页面是否已被预取到缓存中"""
+        if (page_index, zoom_level) not in self.prefetched:
+            return False
+        return self.pdf_document.is_page_cached(page_index, zoom_level)
+        
+    def get_direction(self):
+        """阅读方向：1向后，-1向前（最近的翻页权重更大）"""
+        pages = [page_index for _, page_index in self.history]
+        weight = sum((index + 1) * (page - previous)
+                     for index, (previous, page) in enumerate(zip(pages, pages[1:])))
+        return -1 if weight < 0 else 1
+        
+    def get_speed(self):
+        """最近的翻页速度（页/秒），没有足够的记录时返回0"""
+        now = time.monotonic()
+        recent = [(t, page_index) for t, page_index in self.history if now - t <= HISTORY_SECONDS]
+        if len(recent) < 2:
+            return 0.0
+        elapsed = recent[-1][0] - recent[0][0]
+        pages = sum(abs(page - previous) for (_, previous), (_, page) in zip(recent, recent[1:]))
+        return pages / elapsed if elapsed > 0 else 0.0
+        
+    def get_lookahead(self, page_bytes):
+        """本次预取的页数：按速度估计，再按内存和CPU负载减少"""
+        render_config = self.pdf_document.render_config
+        max_pages = render_config.prefetch_pages
+        if max_pages <= 0 or not render_config.cache_pages:
+            return 0
+        lookahead = max(1, min(max_pages, math.ceil(self.get_speed() * LOOKAHEAD_SECONDS)))
+        
+        # 内存：预取的页面不能挤掉当前页面，也不能让总占用逼近预算
+        if page_bytes > 0:
+            page_cache = self.pdf_document.page_cache
+            cache_room = min(page_cache.max_pages, page_cache.max_bytes // page_bytes) - 1
+            budget_room = int((self.memory_budget.max_bytes * MEMORY_HEADROOM
+                               - self.memory_budget.get_used_bytes()) // page_bytes)
+            lookahead = min(lookahead, cache_room, budget_room)
+            
+        # CPU：系统繁忙时只预取下一页
+        cpu_load = get_cpu_load()
+        if cpu_load is not None and cpu_load > CPU_LOAD_LIMIT:
+            lookahead = min(lookahead, 1)
+        return max(0, lookahead)
+        
+    def prefetch(self):
+        """沿阅读方向请求渲染后面的页面（空闲优先级）"""
+        if self.current is None:
+            return
+        page_index, zoom_level = self.current
+        self.direction = self.get_direction()
+        
+        # 以当前页面的图像大小估计每页占用的内存
+        page_bytes = self.pdf_document.get_cached_page_nbytes(page_index, zoom_level)
+        self.lookahead = self.get_lookahead(page_bytes)
+        
+        # 方向或缩放改变后，之前排队的预取已经没有用处
+        self.render_scheduler.cancel_priority(PRIORITY_IDLE)
+        page_count = self.pdf_document.get_page_count()
+        for step in range(1, self.lookahead + 1):
+            target = page_index + step * self.direction
+            if not 0 <= target < page_count:
+                break
+            if self.is_prefetched(target, zoom_level):
+                continue
+            key = (target, zoom_level)
+            if key not in self.prefetched:
+                self.prefetched.add(key)
+                self.requested += 1
+            # 已在渲染中的页面不会重复渲染
+            self.render_scheduler.request(target, zoom_level, PRIORITY_IDLE)
+            
+    def cancel(self):
+        """立即停止预取"""
+        self.prefetch_timer.stop()
+        self.render_scheduler.cancel_priority(PRIORITY_IDLE)
+        
+    def reset(self):
+        """停止预取并清除翻页记录（切换显示模式时调用）"""
+        self.cancel()
+        self.history.clear()
+        self.prefetched.clear()
+        self.current = None
+        
+    def get_stats(self):
+        """获取预取统计 {'hits', 'misses', 'hit_rate', 'requested', 'direction', 'lookahead', 'speed'}"""
+        turns = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / turns if turns else 0.0,
+            'requested': self.requested,
+            'direction': self.direction,
+            'lookahead': self.lookahead,
+            'speed': self.get_speed()
+        }
@@ -0,0 +1,201 @@
+"""
+多进程文档搜索
+按页码范围把搜索任务分给多个工作进程，每个进程只打开一次PDF文件；
+结果按页码顺序逐块返回，支持区分大小写、全字匹配和正则表达式
+"""
+
+from collections import deque
+import multiprocessing
+import os
+import re
+
+import fitz  # PyMuPDF
+
+
+# 每个任务搜索的页数
+DEFAULT_CHUNK_SIZE = 8
+
+# 工作进程中的文档对象（每个进程一份）
+_worker_doc = None
+# 与主进程共享的搜索代数，改变后工作进程放弃旧搜索中尚未完成的任务
+_worker_generation = None
+
+
+def compile_pattern(query, case_sensitive=False, whole_word=False, regex=False):
+    """将查询编译为正则表达式，正则语法错误时抛出re.error"""
+    if regex:
+        pattern = query
+    else:
+        # 查询中的空白可以匹配换行，短语可以跨行
+        pattern = r'\s+'.join(re.escape(part) for part in query.split())
+    if whole_word:
+        pattern = rf'\b(?:{pattern})\b'
+    return re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+
+
+def search_page(page, query, case_sensitive=False, whole_word=False, regex=False):
+    """在单个页面中搜索，返回结果列表（边界框为元组，便于跨进程传递）
+    
+    默认模式（不区分大小写的子串）直接使用page.search_for；其他模式在页面的
+    字符序列上做正则匹配，结果的boxes为匹配内容在每一行上的边界框。
+    """
+    if not (case_sensitive or whole_word or regex):
+        return [
+            {'page': page.number, 'bbox': tuple(rect), 'text': query, 'boxes': [tuple(rect)]}
+            for rect in page.search_for(query)
+        ]
+        
+    pattern = compile_pattern(query, case_sensitive, whole_word, regex)
+    text, char_boxes, char_lines = _get_page_chars(page)
+    
+    results = []
+    for match in pattern.finditer(text):
+        if match.start() == match.end():
+            continue  # 忽略空匹配
+            
+        # 按行合并匹配字符的边界框
+        line_boxes = {}
+        for i in range(match.start(), match.end()):
+            box = char_boxes[i]
+            if box is None:
+                continue  # 行分隔符
+            line = char_lines[i]
+            current = line_boxes.get(line)
+            line_boxes[line] = box if current is None else (
+                min(current[0], box[0]), min(current[1], box[1]),
+                max(current[2], box[2]), max(current[3], box[3])
+            )
+        if not line_boxes:
+            continue
+            
+        boxes = list(line_boxes.values())
+        bbox = (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+        results.append({'page': page.number, 'bbox': bbox, 'text': match.group(), 'boxes': boxes})
+    return results
+
+
+def _get_page_chars(page):
+    """提取页面的字符序列及每个字符的边界框和所在行，行之间以换行分隔"""
+    chars = []
+    char_boxes = []
+    char_lines = []
+    line_number = 0
+    for block in page.get_text("rawdict")["blocks"]:
+        for line in block.get("lines", ()):
+            for span in line["spans"]:
+                for char in span["chars"]:
+                    chars.append(char["c"])
+                    char_boxes.append(tuple(char["bbox"]))
+                    char_lines.append(line_number)
+            chars.append("\n")
+            char_boxes.append(None)
+            char_lines.append(line_number)
+            line_number += 1
+    return "".join(chars), char_boxes, char_lines
+
+
+def _init_worker(file_path, generation):
+    """工作进程初始化：打开文档"""
+    global _worker_doc, _worker_generation
+    _worker_doc = fitz.open(file_path)
+    _worker_generation = generation
+
+
+def _search_chunk(args):
+    """在工作进程中搜索一段页面，返回 [(页码, 结果列表), ...]；所属的搜索已停止时提前返回"""
+    start, end, query, options, generation = args
+    chunk_results = []
+    for page_num in range(start, end):
+        if _worker_generation.value != generation:
+            break
+        chunk_results.append((page_num, search_page(_worker_doc[page_num], query, **options)))
+    return chunk_results
+
+
+def to_rect_results(results):
+    """将边界框元组转换为fitz.Rect，结果格式与PDFDocument.search_text一致"""
+    for result in results:
+        result['bbox'] = fitz.Rect(result['bbox'])
+    return results
+
+
+class ParallelSearchEngine:
+    """多进程搜索引擎
+    
+    使用spawn方式启动工作进程：GUI进程中有渲染线程，fork可能复制到被占用的锁。
+    """
+    
+    def __init__(self, file_path, num_workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.file_path = file_path
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = None
+        self._generation = None  # 共享的搜索代数，每次搜索停止后加一
+        
+    def start(self):
+        """启动工作进程池"""
+        if self._pool is None:
+            context = multiprocessing.get_context("spawn")
+            self._generation = context.Value('i', 0)
+            self._pool = context.Pool(
+                self.num_workers,
+                initializer=_init_worker,
+                initargs=(self.file_path, self._generation)
+            )
+            
+    def search(self, query, case_sensitive=False, whole_word=False, regex=False, pages=None):
+        """搜索文档，按页码顺序逐页产生 (页码, 结果列表)
+        
+        同时只提交少量任务；停止迭代（关闭生成器）后已提交的任务不再继续搜索，
+        工作进程保留给下一次搜索。
+        """
+        # 在主进程中检查正则表达式，语法错误直接抛给调用者
+        compile_pattern(query, case_sensitive, whole_word, regex)
+        options = {'case_sensitive': case_sensitive, 'whole_word': whole_word, 'regex': regex}
+        
+        if pages is None:
+            with fitz.open(self.file_path) as doc:
+                pages = range(len(doc))
+        self.start()
+        generation = self._generation.value
+        chunks = iter([
+            (start, min(start + self.chunk_size, pages.stop), query, options, generation)
+            for start in range(pages.start, pages.stop, self.chunk_size)
+        ])
+        pending = deque()
+        
+        def submit():
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(self._pool.apply_async(_search_chunk, (chunk,)))
+                
+        try:
+            for _ in range(self.num_workers * 2):
+                submit()
+            while pending:
+                chunk_results = pending.popleft().get()
+                submit()
+                for page_num, results in chunk_results:
+                    yield page_num, to_rect_results(results)
+        finally:
+            # 提前停止时丢弃未取回的结果，并通知工作进程放弃这些任务
+            if pending:
+                with self._generation.get_lock():
+                    self._generation.value += 1
+                pending.clear()
+                
+    def close(self):
+        """关闭工作进程池（未完成的任务直接终止）"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            self._generation = None
+            
+    def __enter__(self):
+        self.start()
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,16 +1,54 @@
 import fitz  # PyMuPDF
 from PIL import Image
-import io
 from .render_config import RenderConfig
+from .page_cache import PageCache
+from .page_image import PageImage
+from .page_geometry import PageGeometry
+from .disk_cache import DiskCache, get_document_key
+from .perf_stats import perf_stats
+
+
+# 图块和缩略图缓存条目数上限，实际由字节数限制
+TILE_CACHE_MAX_ENTRIES = 4096
+THUMBNAIL_CACHE_MAX_ENTRIES = 100000
 
 
 class PDFDocument:
     """PDF文档处理类"""
     
-    def __init__(self, file_path):
+    def __init__(self, file_path, render_config=None):
         self.file_path = file_path
         self.doc = fitz.open(file_path)
-        self.render_config = RenderConfig()
+        self.render_config = render_config or RenderConfig()
+        # 页面几何信息表：先只读取第一页，其余页面由DocumentLoader在后台补全
+        self.page_geometry = PageGeometry.for_document(self.doc)
+        
+        # 页面图像缓存
+        self.page_cache = PageCache(
+            self.render_config.max_cache_size,
+            self.render_config.get_max_cache_bytes()
+        )
+        
+        # 图块缓存（只按字节数限制）
+        self.tile_cache = PageCache(
+            TILE_CACHE_MAX_ENTRIES,
+            self.render_config.get_max_tile_cache_bytes()
+        )
+        
+        # 缩略图缓存（与页面缓存分开，浏览缩略图不会挤掉页面图像）
+        self.thumbnail_cache = PageCache(
+            THUMBNAIL_CACHE_MAX_ENTRIES,
+            self.render_config.get_max_thumbnail_cache_bytes(),
+            page_of_key=lambda key: key[1]  # 键为 ('thumbnail', 页码, ...)
+        )
+        
+        # 全文索引，后台建立完成后由TextIndexBuilder设置
+        self.text_index = None
+        
+        # 磁盘缓存，按文件路径、大小和修改时间区分文档
+        self.document_key = get_document_key(file_path)
+        self.disk_cache = None
+        self._update_disk_cache()
         
         # 设置PyMuPDF的全局渲染选项
         if hasattr(fitz, 'set_aa_level'):
@@ -20,61 +58,359 @@ class PDFDocument:
         """获取页面总数"""
         return len(self.doc)
         
-    def get_page_image(self, page_num, zoom_level=1.0):
-        """获取指定页面的图像"""
-        page = self.doc[page_num]
+    def get_page_image(self, page_num, zoom_level=1.0, doc=None):
+        """获取指定页面的PIL图像（兼容接口，显示时请使用get_page），尺寸与缩放级别完全对应"""
+        return self.get_page(page_num, zoom_level, doc, snap=False).to_pil()
         
-        # 计算渲染参数
-        dpi = self.render_config.get_render_dpi(zoom_level)
-        use_hq = self.render_config.should_use_high_quality(zoom_level)
+    def get_page(self, page_num, zoom_level=1.0, doc=None, snap=True, write_disk_cache=False):
+        """获取指定页面的PageImage（优先从缓存读取）
         
-        # 计算缩放矩阵 - 使用DPI计算更精确的缩放
-        scale_factor = dpi / 72.0  # PDF默认是72 DPI
-        mat = fitz.Matrix(scale_factor, scale_factor)
+        snap为True时按缩放分桶渲染（见get_render_zoom），返回的图像通过设备像素比
+        显示为zoom_level下的尺寸；为False时按zoom_level本身渲染。
+        write_disk_cache为True时把新渲染的图像写入磁盘缓存（只在工作线程中使用，不在界面线程写文件）
+        """
+        render_zoom = self.get_render_zoom(page_num, zoom_level) if snap else zoom_level
+        page_image = self._get_cached_page(page_num, render_zoom)
+        if page_image is None:
+            page_image = self.get_disk_cached_page(page_num, render_zoom)
+        if page_image is None:
+            page_image = self.render_page(page_num, render_zoom, doc)
+            if write_disk_cache:
+                self.put_disk_cached_page(page_num, render_zoom, page_image)
+        return self.get_display_image(page_image, render_zoom, zoom_level)
         
-        # 使用高质量渲染参数
+    def get_cached_page(self, page_num, zoom_level=1.0):
+        """从缓存获取页面图像（按缩放分桶），未缓存时返回None"""
+        render_zoom = self.get_render_zoom(page_num, zoom_level)
+        page_image = self._get_cached_page(page_num, render_zoom)
+        if page_image is None:
+            return None
+        return self.get_display_image(page_image, render_zoom, zoom_level)
+        
+    def _get_cached_page(self, page_num, zoom_level):
+        """从缓存获取按zoom_level渲染的页面图像"""
+        if not self.render_config.cache_pages:
+            return None
+        return self.page_cache.get(self.get_cache_key(page_num, zoom_level))
+        
+    def get_render_zoom(self, page_num, zoom_level):
+        """渲染页面使用的缩放级别（缩放分桶）
+        
+        相邻分桶已在缓存中且与zoom_level的误差不超过容差时直接复用，
+        否则使用不小于zoom_level的最近分桶
+        """
+        config = self.render_config
+        bucket = config.snap_zoom(zoom_level)
+        if not config.zoom_snapping or not config.cache_pages:
+            return bucket
+            
+        candidates = [config.snap_zoom(zoom_level, offset) for offset in (0, -1, 1)]
+        candidates.sort(key=lambda candidate: abs(candidate / zoom_level - 1))
+        for candidate in candidates:
+            if abs(candidate / zoom_level - 1) > config.zoom_snap_tolerance:
+                break
+            if self.get_cache_key(page_num, candidate) in self.page_cache:
+                return candidate
+        return bucket
+        
+    def get_display_image(self, page_image, render_zoom, zoom_level):
+        """按render_zoom渲染的图像以zoom_level显示：只调整设备像素比，由Qt缩放"""
+        if render_zoom == zoom_level:
+            return page_image
+        ratio = self.render_config.device_pixel_ratio * render_zoom / zoom_level
+        return page_image.with_device_pixel_ratio(ratio)
+        
+    def is_page_cached(self, page_num, zoom_level):
+        """页面是否已在内存缓存中（按缩放分桶，不影响命中统计）"""
+        key = self.get_cache_key(page_num, self.get_render_zoom(page_num, zoom_level))
+        return key in self.page_cache
+        
+    def get_cached_page_nbytes(self, page_num, zoom_level):
+        """页面在内存缓存中占用的字节数，未缓存时返回0"""
+        key = self.get_cache_key(page_num, self.get_render_zoom(page_num, zoom_level))
+        return self.page_cache.get_nbytes(key)
+        
+    def render_page(self, page_num, zoom_level=1.0, doc=None):
+        """渲染页面图像并放入缓存
+        
+        doc可以传入工作线程自己打开的fitz.Document，PyMuPDF文档对象不是线程安全的
+        """
+        with perf_stats.measure('render_page'):
+            page_image = self._render_page(page_num, zoom_level, doc)
+            if self.render_config.cache_pages:
+                key = self.get_cache_key(page_num, zoom_level)
+                self.page_cache.put(key, page_image, page_image.nbytes)
+        return page_image
+        
+    def get_disk_cached_page(self, page_num, zoom_level=1.0):
+        """从磁盘缓存读取页面图像并放入内存缓存，未缓存时返回None"""
+        if not self.render_config.cache_pages or self.disk_cache is None:
+            return None
+            
+        key = self.get_cache_key(page_num, zoom_level)
+        with perf_stats.measure('disk_cache_read'):
+            page_image = self.disk_cache.get(self.get_disk_cache_key(key))
+        if page_image is not None:
+            page_image.set_device_pixel_ratio(self.render_config.device_pixel_ratio)
+            self.page_cache.put(key, page_image, page_image.nbytes)
+        return page_image
+        
+    def put_disk_cached_page(self, page_num, zoom_level, page_image):
+        """将渲染结果写入磁盘缓存（磁盘缓存未开启时不做任何事）"""
+        if not self.render_config.cache_pages or self.disk_cache is None:
+            return
+        key = self.get_cache_key(page_num, zoom_level)
+        with perf_stats.measure('disk_cache_write'):
+            self.disk_cache.put(self.get_disk_cache_key(key), page_image)
+        
+    def get_disk_cache_key(self, key):
+        """磁盘缓存键：文档标识加内存缓存键"""
+        return (self.document_key,) + key
+        
+    def get_cache_key(self, page_num, zoom_level):
+        """计算页面图像缓存键：页码、有效DPI和渲染标志"""
+        effective_dpi = round(72.0 * self.render_config.get_target_scale(zoom_level), 3)
+        render_dpi = round(72.0 * self.render_config.get_render_scale(zoom_level), 3)
+        return (page_num, effective_dpi, render_dpi,
+                self.render_config.get_render_flags(zoom_level))
+        
+    def apply_render_config(self):
+        """渲染设置改变后使缓存失效并更新缓存限制"""
+        self.page_cache.clear()
+        self.page_cache.set_limits(
+            self.render_config.max_cache_size,
+            self.render_config.get_max_cache_bytes()
+        )
+        self.tile_cache.clear()
+        self.tile_cache.set_limits(
+            TILE_CACHE_MAX_ENTRIES,
+            self.render_config.get_max_tile_cache_bytes()
+        )
+        # 缩略图不受渲染质量设置影响，只更新限制
+        self.thumbnail_cache.set_limits(
+            THUMBNAIL_CACHE_MAX_ENTRIES,
+            self.render_config.get_max_thumbnail_cache_bytes()
+        )
+        self._update_disk_cache()
+        
+    def _update_disk_cache(self):
+        """按渲染配置创建、更新或关闭磁盘缓存"""
+        config = self.render_config
+        if not config.disk_cache:
+            self.disk_cache = None
+        elif self.disk_cache is None or self.disk_cache.cache_dir != config.disk_cache_dir:
+            try:
+                self.disk_cache = DiskCache(config.disk_cache_dir, config.get_max_disk_cache_bytes())
+            except OSError:
+                self.disk_cache = None  # 缓存目录不可用时只使用内存缓存
+        else:
+            self.disk_cache.set_limit(config.get_max_disk_cache_bytes())
+        
+    def render_preview(self, page_num, zoom_level, doc=None):
+        """快速渲染低分辨率预览（不缓存），显示时由Qt放大到页面尺寸"""
+        page = (doc if doc is not None else self.doc)[page_num]
+        preview_scale = self.render_config.preview_scale
+        scale = self.render_config.get_target_scale(zoom_level) * preview_scale
+        with perf_stats.measure('render_preview'):
+            pix = page.get_pixmap(
+                matrix=fitz.Matrix(scale, scale),
+                alpha=False,
+                annots=False,       # 预览不需要注释
+                colorspace=fitz.csRGB
+            )
+        
+        preview = PageImage.from_pixmap(pix)
+        preview.set_device_pixel_ratio(self.render_config.device_pixel_ratio * preview_scale)
+        return preview
+        
+    def get_thumbnail_size(self, page_num):
+        """缩略图的显示尺寸 (宽, 高)，单位为逻辑像素"""
+        box_width, box_height = self.render_config.get_thumbnail_box()
+        width, height = self.get_page_size(page_num)
+        scale = min(box_width / width, box_height / height)
+        return max(1, int(width * scale)), max(1, int(height * scale))
+        
+    def get_thumbnail_key(self, page_num):
+        """缩略图缓存键：页码、尺寸和设备像素比"""
+        return ('thumbnail', page_num, self.render_config.get_thumbnail_box(),
+                self.render_config.device_pixel_ratio)
+        
+    def get_cached_thumbnail(self, page_num):
+        """从内存缓存获取缩略图，未缓存时返回None"""
+        return self.thumbnail_cache.get(self.get_thumbnail_key(page_num))
+        
+    def get_thumbnail(self, page_num, doc=None):
+        """获取缩略图（依次查找内存缓存、磁盘缓存，最后渲染）"""
+        key = self.get_thumbnail_key(page_num)
+        thumbnail = self.thumbnail_cache.get(key)
+        if thumbnail is not None:
+            return thumbnail
+            
+        disk_key = self.get_disk_cache_key(key)
+        if self.disk_cache is not None:
+            thumbnail = self.disk_cache.get(disk_key)
+        if thumbnail is None:
+            with perf_stats.measure('render_thumbnail'):
+                thumbnail = self._render_thumbnail(page_num, doc)
+            if self.disk_cache is not None:
+                self.disk_cache.put(disk_key, thumbnail)
+                
+        # 设置设备像素比，使逻辑尺寸恰好放入缩略图框（不访问文档，工作线程中也可调用）
+        box_width, box_height = self.render_config.get_thumbnail_box()
+        thumbnail.set_device_pixel_ratio(
+            max(thumbnail.width / box_width, thumbnail.height / box_height)
+        )
+        self.thumbnail_cache.put(key, thumbnail, thumbnail.nbytes)
+        return thumbnail
+        
+    def _render_thumbnail(self, page_num, doc=None):
+        """渲染缩略图，优先使用PDF内嵌的页面缩略图"""
+        doc = doc if doc is not None else self.doc
+        page = doc[page_num]
+        
+        pix = self._load_embedded_thumbnail(doc, page)
+        if pix is None:
+            # 按缩略图尺寸以很低的分辨率渲染，不包含注释
+            box_width, box_height = self.render_config.get_thumbnail_box()
+            scale = min(box_width / page.rect.width, box_height / page.rect.height)
+            scale *= self.render_config.device_pixel_ratio
+            pix = page.get_pixmap(
+                matrix=fitz.Matrix(scale, scale),
+                alpha=False,
+                annots=False,
+                colorspace=fitz.csRGB
+            )
+        return PageImage.from_pixmap(pix)
+        
+    def _load_embedded_thumbnail(self, doc, page):
+        """读取页面内嵌的缩略图（/Thumb），没有时返回None"""
+        try:
+            kind, value = doc.xref_get_key(page.xref, "Thumb")
+            if kind != 'xref':
+                return None
+            pix = fitz.Pixmap(doc, int(value.split()[0]))
+            if pix.colorspace is None or pix.colorspace.n != 3:
+                pix = fitz.Pixmap(fitz.csRGB, pix)
+            if pix.alpha:
+                pix = fitz.Pixmap(pix, 0)
+            return pix
+        except (RuntimeError, ValueError):
+            return None  # 内嵌缩略图损坏时改为渲染
+            
+    def get_tile_key(self, page_num, zoom_level, tile):
+        """计算图块缓存键：页码、缩放分桶、图块索引和渲染标志"""
+        return (page_num, self.render_config.get_zoom_bucket(zoom_level), tile,
+                self.render_config.tile_size, self.render_config.device_pixel_ratio,
+                self.render_config.get_render_flags(zoom_level))
+        
+    def get_cached_tile(self, page_num, zoom_level, tile):
+        """从缓存获取图块，未缓存时返回None"""
+        return self.tile_cache.get(self.get_tile_key(page_num, zoom_level, tile))
+        
+    def get_tile(self, page_num, zoom_level, tile, doc=None):
+        """获取页面的一个图块 (列, 行)，图块边长为render_config.tile_size设备像素"""
+        key = self.get_tile_key(page_num, zoom_level, tile)
+        tile_image = self.tile_cache.get(key)
+        if tile_image is None:
+            with perf_stats.measure('render_tile'):
+                tile_image = self._render_tile(page_num, zoom_level, tile, doc)
+            self.tile_cache.put(key, tile_image, tile_image.nbytes)
+        return tile_image
+        
+    def _render_tile(self, page_num, zoom_level, tile, doc=None):
+        """使用clip只渲染页面的一个图块"""
+        page = (doc if doc is not None else self.doc)[page_num]
+        scale = self.render_config.get_target_scale(
+            self.render_config.get_zoom_bucket(zoom_level)
+        )
+        tile_size = self.render_config.tile_size
+        col, row = tile
+        
+        # 图块的设备像素范围换算为页面坐标
+        rect = page.rect
+        clip = fitz.Rect(
+            rect.x0 + col * tile_size / scale,
+            rect.y0 + row * tile_size / scale,
+            min(rect.x1, rect.x0 + (col + 1) * tile_size / scale),
+            min(rect.y1, rect.y0 + (row + 1) * tile_size / scale)
+        )
         pix = page.get_pixmap(
-            matrix=mat,
-            alpha=False,        # 不使用alpha通道以提高性能
-            annots=True,        # 包含注释
-            clip=None,          # 不裁剪
-            colorspace=fitz.csRGB  # 明确指定RGB色彩空间
+            matrix=fitz.Matrix(scale, scale),
+            alpha=False,
+            annots=True,
+            clip=clip,
+            colorspace=fitz.csRGB
         )
         
+        tile_image = PageImage.from_pixmap(pix)
+        tile_image.set_device_pixel_ratio(self.render_config.device_pixel_ratio)
+        return tile_image
+        
+    def _render_page(self, page_num, zoom_level, doc=None):
+        """渲染指定页面的图像
+        
+        默认直接按屏幕上的最终像素尺寸（缩放级别×设备像素比）光栅化一次；
+        开启超采样时先按较高DPI渲染，再LANCZOS缩小到目标尺寸。
+        """
+        page = (doc if doc is not None else self.doc)[page_num]
+        
+        # 计算渲染参数
+        target_scale = self.render_config.get_target_scale(zoom_level)
+        render_scale = self.render_config.get_render_scale(zoom_level)
+        use_hq = self.render_config.should_use_high_quality(zoom_level)
+        mat = fitz.Matrix(render_scale, render_scale)
+        
+        # 使用高质量渲染参数
+        with perf_stats.measure('rasterize'):
+            pix = page.get_pixmap(
+                matrix=mat,
+                alpha=False,        # 不使用alpha通道以提高性能
+                annots=True,        # 包含注释
+                clip=None,          # 不裁剪
+                colorspace=fitz.csRGB  # 明确指定RGB色彩空间
+            )
+        
         # 如果需要高质量，进行额外处理
         if use_hq:
             # 设置更好的渲染标志
             pix.set_origin(0, 0)
-        
-        # 转换为PIL图像
-        img_data = pix.tobytes("ppm")
-        pil_image = Image.open(io.BytesIO(img_data))
-        
-        # 确保图像质量和格式
-        if pil_image.mode != 'RGB':
-            pil_image = pil_image.convert('RGB')
             
-        # 如果缩放级别不是预期的，进行高质量重采样
-        if zoom_level != scale_factor:
+        # 超采样：缩小到目标尺寸（只有这时才需要PIL）
+        page_image = None
+        if render_scale != target_scale:
             target_size = (
-                int(pil_image.width * zoom_level / scale_factor),
-                int(pil_image.height * zoom_level / scale_factor)
+                max(1, int(pix.width * target_scale / render_scale)),
+                max(1, int(pix.height * target_scale / render_scale))
             )
-            if target_size != pil_image.size:
-                # 使用LANCZOS重采样以获得最佳质量
-                pil_image = pil_image.resize(target_size, Image.Resampling.LANCZOS)
+            if target_size != (pix.width, pix.height):
+                with perf_stats.measure('resize'):
+                    pil_image = Image.frombuffer(
+                        'RGB', (pix.width, pix.height), pix.samples_mv, 'raw', 'RGB', pix.stride, 1
+                    )
+                    # 使用LANCZOS重采样以获得最佳质量
+                    pil_image = pil_image.resize(target_size, Image.Resampling.LANCZOS)
+                    page_image = PageImage.from_pil(pil_image)
+                
+        if page_image is None:
+            # 直接包装pixmap的像素缓冲区，不做复制
+            page_image = PageImage.from_pixmap(pix)
+            
+        page_image.set_device_pixel_ratio(self.render_config.device_pixel_ratio)
+        return page_image
         
-        return pil_image
+    def get_page_size(self, page_num, doc=None):
+        """获取页面尺寸（已考虑旋转），尚未读取时从页面字典读取"""
+        if not self.page_geometry.is_loaded(page_num):
+            self.page_geometry.load_pages(doc if doc is not None else self.doc, page_num, page_num + 1)
+        return self.page_geometry.get_page_size(page_num)
         
-    def get_page_size(self, page_num):
-        """获取页面尺寸"""
-        page = self.doc[page_num]
-        rect = page.rect
-        return (rect.width, rect.height)
+    def get_layout_page_size(self, page_num):
+        """获取用于布局的页面尺寸：尺寸尚未读取时以第一页的尺寸估计（不读取页面）"""
+        return self.page_geometry.get_page_size(page_num)
         
-    def get_outline(self):
+    def get_outline(self, doc=None):
         """获取PDF目录"""
-        outline = self.doc.get_toc()
+        outline = (doc if doc is not None else self.doc).get_toc()
         return self._build_outline_tree(outline)
         
     def _build_outline_tree(self, toc):
@@ -107,33 +443,50 @@ class PDFDocument:
         return result
         
     def search_text(self, query, page_num=None):
-        """搜索文本"""
-        results = []
-        
+        """搜索文本（全文索引可用且能回答该查询时查询索引，否则逐页扫描）"""
+        if self.can_use_text_index(query):
+            return self.text_index.search(query, page_num)
+            
         if page_num is not None:
             # 搜索指定页面
-            page = self.doc[page_num]
-            text_instances = page.search_for(query)
-            for inst in text_instances:
-                results.append({
-                    'page': page_num,
-                    'bbox': inst,
-                    'text': query
-                })
-        else:
-            # 搜索整个文档
-            for page_num in range(len(self.doc)):
-                page = self.doc[page_num]
-                text_instances = page.search_for(query)
-                for inst in text_instances:
-                    results.append({
-                        'page': page_num,
-                        'bbox': inst,
-                        'text': query
-                    })
-                    
+            return self.search_page(page_num, query)
+            
+        # 搜索整个文档
+        results = []
+        for _, page_results in self.iter_search_text(query):
+            results.extend(page_results)
         return results
         
+    def iter_search_text(self, query, doc=None):
+        """逐页搜索文本，每处理一页产生 (页码, 该页结果列表)
+        
+        doc可以传入搜索线程自己打开的fitz.Document，避免与渲染共用文档对象
+        """
+        if self.can_use_text_index(query):
+            # 索引一次查询全部结果，再按页产生
+            results_by_page = {}
+            for result in self.text_index.search(query):
+                results_by_page.setdefault(result['page'], []).append(result)
+            for page_num in range(self.get_page_count()):
+                yield page_num, results_by_page.get(page_num, [])
+            return
+            
+        for page_num in range(self.get_page_count()):
+            yield page_num, self.search_page(page_num, query, doc)
+            
+    def can_use_text_index(self, query):
+        """全文索引是否已就绪且能回答该查询（含标点的查询逐页扫描）"""
+        return self.text_index is not None and self.text_index.can_search(query)
+        
+    def search_page(self, page_num, query, doc=None):
+        """在单个页面中搜索文本"""
+        with perf_stats.measure('search_page'):
+            page = (doc if doc is not None else self.doc)[page_num]
+            return [
+                {'page': page_num, 'bbox': inst, 'text': query}
+                for inst in page.search_for(query)
+            ]
+        
     def get_page_text(self, page_num):
         """获取页面文本"""
         page = self.doc[page_num]
@@ -145,7 +498,7 @@ class PDFDocument:
         
     def close(self):
         """关闭文档"""
-        if self.doc:
+        if self.doc is not None and not self.doc.is_closed:
             self.doc.close()
             
     def __del__(self):
@@ -1,8 +1,124 @@
 from PyQt5.QtWidgets import QScrollArea, QLabel, QVBoxLayout, QWidget
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QPoint, QPointF, QRectF
 from PyQt5.QtGui import QPixmap, QPainter, QPen, QColor
 from PIL import Image
 import numpy as np
+import bisect
+import math
+import time
+
+from .page_image import PageImage
+from .page_geometry import compute_offsets, rotate_box
+from .memory_budget import MemoryBudget, get_pixmap_nbytes
+from .perf_stats import perf_stats, timed
+from .render_scheduler import RenderScheduler, PRIORITY_VISIBLE, PRIORITY_PREFETCH
+from .page_prefetcher import PagePrefetcher
+
+
+# 搜索结果高亮颜色（半透明，叠加在页面图像上）
+HIT_COLOR = QColor(255, 230, 0, 90)
+CURRENT_HIT_COLOR = QColor(255, 120, 0, 130)
+
+
+class PageLabel(QLabel):
+    """页面标签，高缩放级别下以图块方式显示页面"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tiles = {}  # (列, 行) -> QPixmap
+        self.tile_size = 0.0  # 图块边长（逻辑像素）
+        self.paint_callback = None  # 下一次绘制出内容后调用（用于统计首次绘制时间）
+        self.page_size = (0.0, 0.0)  # 页面显示尺寸（PDF点），用于把搜索结果坐标映射到标签
+        self.rotation = 0  # 页面旋转角度，搜索结果在未旋转的页面坐标中
+        self.highlights = []  # 本页的搜索结果 [(命中序号, [(x0, y0, x1, y1), ...]), ...]
+        self.current_hit = -1  # 当前命中序号
+        
+    def set_tile(self, tile, pixmap, tile_size):
+        """设置一个图块"""
+        self.tile_size = tile_size
+        self.tiles[tile] = pixmap
+        col, row = tile
+        self.update(int(col * tile_size), int(row * tile_size),
+                    math.ceil(tile_size) + 1, math.ceil(tile_size) + 1)
+        
+    def retain_tiles(self, tiles):
+        """只保留指定的图块，释放其余图块"""
+        for tile in [t for t in self.tiles if t not in tiles]:
+            del self.tiles[tile]
+            
+    def scale_tiles(self, factor):
+        """按比例缩放已显示的图块（缩放预览，不重新渲染）"""
+        self.tile_size *= factor
+        for pixmap in self.tiles.values():
+            pixmap.setDevicePixelRatio(pixmap.devicePixelRatio() / factor)
+            
+    def clear_tiles(self):
+        """释放所有图块"""
+        if self.tiles:
+            self.tiles.clear()
+            self.update()
+            
+    def get_tiles_nbytes(self):
+        """图块占用的字节数"""
+        return sum(get_pixmap_nbytes(pixmap) for pixmap in self.tiles.values())
+        
+    def has_content(self):
+        """是否已有页面图像或图块"""
+        pixmap = self.pixmap()
+        return bool(self.tiles) or (pixmap is not None and not pixmap.isNull())
+        
+    def paintEvent(self, event):
+        """绘制事件"""
+        with perf_stats.measure('paint'):
+            self.paint_content(event)
+            
+        if self.paint_callback and self.has_content():
+            callback, self.paint_callback = self.paint_callback, None
+            callback()
+            
+    def paint_content(self, event):
+        """绘制页面图像、图块和搜索结果"""
+        pixmap = self.pixmap()
+        if pixmap is not None and not pixmap.isNull() and pixmap.devicePixelRatio() != self.devicePixelRatioF():
+            # 按缩放分桶渲染或缩放预览的图像需要缩放显示，使用平滑缩放避免文字出现锯齿
+            painter = QPainter(self)
+            self.drawFrame(painter)
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            self.style().drawItemPixmap(painter, self.contentsRect(), self.alignment(), pixmap)
+            painter.end()
+        else:
+            super().paintEvent(event)
+        if self.tiles:
+            painter = QPainter(self)
+            for (col, row), pixmap in self.tiles.items():
+                painter.drawPixmap(QPointF(col * self.tile_size, row * self.tile_size), pixmap)
+            painter.end()
+            
+        if self.highlights and self.page_size[0]:
+            self.paint_highlights()
+            
+    def paint_highlights(self):
+        """在页面图像上绘制搜索结果，按图像当前的显示尺寸换算坐标（缩放预览时同样适用）"""
+        origin = QPointF(0, 0)
+        width = self.width()
+        pixmap = self.pixmap()
+        if pixmap is not None and not pixmap.isNull():
+            # 图像居中显示在内容区域中
+            width = pixmap.width() / pixmap.devicePixelRatio()
+            height = pixmap.height() / pixmap.devicePixelRatio()
+            origin = QRectF(self.contentsRect()).center() - QPointF(width / 2, height / 2)
+            
+        page_width, page_height = self.page_size
+        scale = width / page_width
+        painter = QPainter(self)
+        painter.translate(origin)
+        for hit_index, boxes in self.highlights:
+            color = CURRENT_HIT_COLOR if hit_index == self.current_hit else HIT_COLOR
+            for box in boxes:
+                x0, y0, x1, y1 = rotate_box(box, self.rotation, page_width, page_height)
+                painter.fillRect(QRectF(x0 * scale, y0 * scale,
+                                        (x1 - x0) * scale, (y1 - y0) * scale), color)
+        painter.end()
 
 
 class PDFViewerWidget(QScrollArea):
@@ -10,8 +126,11 @@ class PDFViewerWidget(QScrollArea):
     
     pageClicked = pyqtSignal(int, int)  # 页面点击信号 (x, y)
     currentPageChanged = pyqtSignal(int)  # 当前页面改变信号
+    visibleRangeChanged = pyqtSignal(int, int)  # 连续模式下视口内的页面范围改变 (首页, 末页)，0基
     zoom_in_signal = pyqtSignal()  # 放大信号
     zoom_out_signal = pyqtSignal()  # 缩小信号
+    firstPaint = pyqtSignal(float)  # 打开或缩放后首次绘制出页面内容的耗时（毫秒）
+    currentHitChanged = pyqtSignal(int, int)  # 当前搜索结果改变 (序号, 结果总数)
     
     def __init__(self):
         super().__init__()
@@ -22,13 +141,41 @@ class PDFViewerWidget(QScrollArea):
         self.total_pages = 0
         self.zoom_level = 1.0
         self.pdf_document = None
+        self.render_scheduler = None  # 后台渲染调度器
+        self.prefetcher = None  # 单页模式的翻页预取
         self.continuous_mode = True  # 连续页面模式
         self.page_spacing = 10  # 页面间距
+        self.displayed_page = None  # 单页模式下显示的页码（0基）
+        self.single_page_tiles = False  # 单页模式下当前页面按图块显示
+        self.pending_scroll_y = None  # 页面布局完成前请求的滚动位置
+        
+        # 搜索结果高亮：只在页面图像上叠加绘制，不重新渲染页面
+        self.search_hits = []
+        self.page_hits = {}  # 页码 -> [(命中序号, 边界框列表)]
+        self.current_hit = -1
         
-        # 用于检测当前页面的定时器
-        self.page_check_timer = QTimer()
-        self.page_check_timer.timeout.connect(self.check_current_page)
-        self.page_check_timer.setInterval(100)  # 100ms检查一次
+        # 当前页面和可见范围在滚动或重新布局时更新，空闲时不做任何检查
+        self.visible_range = None
+        
+        # 虚拟化渲染：记录已渲染的页面，滚动时延迟更新可见页面
+        self.rendered_pages = set()
+        self.visible_tiles = {}  # 图块模式下每页可见的图块 {页码: {(列, 行)}}
+        
+        # 标签上的图像和文档缓存共用一个内存预算，超出时释放远离视口的图像；
+        # 预算在set_pdf_document中按文档的渲染配置设置
+        self.memory_budget = MemoryBudget(0)
+        self.visibleRangeChanged.connect(self.memory_budget.set_visible_range)
+        
+        # 渐进式渲染：正在显示预览的页面，以及缩放前的页面图像
+        self.preview_pages = set()
+        self.preview_pixmaps = {}
+        self.first_paint_start = None  # 等待首次绘制的起始时间
+        self.last_first_paint_ms = None
+        self.zoom_pending = False  # 已缩放预览、等待重新布局和渲染
+        self.visible_update_timer = QTimer()
+        self.visible_update_timer.setSingleShot(True)
+        self.visible_update_timer.setInterval(30)
+        self.visible_update_timer.timeout.connect(self.update_visible_pages)
         
         self.init_ui()
         
@@ -44,9 +191,30 @@ class PDFViewerWidget(QScrollArea):
         self.container_layout.setSpacing(self.page_spacing)
         self.container_layout.setContentsMargins(10, 10, 10, 10)
         
+        # 连续模式的页面标签放在页面容器中并直接按计算的位置摆放，
+        # 不经过布局管理器（QVBoxLayout对数千个页面的布局开销很大）
+        self.pages_widget = QWidget()
+        self.pages_widget.setFixedSize(0, 0)
+        self.pages_widget.hide()
+        self.pages_widget.setStyleSheet("""
+            PageLabel {
+                background-color: white;
+                border: 1px solid #ddd;
+                margin: 2px;
+                padding: 5px;
+            }
+        """)
+        self.container_layout.addWidget(self.pages_widget, 0, Qt.AlignHCenter | Qt.AlignTop)
+        
         # 设置容器为滚动区域的widget
         self.setWidget(self.container_widget)
         
+        # 滚动时更新当前页面和可见页面
+        self.verticalScrollBar().valueChanged.connect(self.update_current_page)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_visible_update)
+        self.horizontalScrollBar().valueChanged.connect(self.schedule_visible_update)
+        self.verticalScrollBar().rangeChanged.connect(self.on_scroll_range_changed)
+        
         # 添加提示标签
         self.placeholder_label = QLabel("请打开PDF文件")
         self.placeholder_label.setAlignment(Qt.AlignCenter)
@@ -55,83 +223,519 @@ class PDFViewerWidget(QScrollArea):
         
     def set_pdf_document(self, pdf_document):
         """设置PDF文档"""
+        self.shutdown_renderer()
+        self.clear_search_hits()
         self.pdf_document = pdf_document
         self.total_pages = pdf_document.get_page_count() if pdf_document else 0
+        self.memory_budget.clear()
+        self.memory_budget.set_caches()
+        
+        # 为新文档启动后台渲染线程
+        if pdf_document:
+            self.update_memory_budget()
+            self.memory_budget.set_caches(pdf_document.page_cache, pdf_document.tile_cache,
+                                          pdf_document.thumbnail_cache)
+            # 按屏幕的设备像素比渲染，高分屏上保持清晰
+            pdf_document.render_config.device_pixel_ratio = self.devicePixelRatioF()
+            self.render_scheduler = RenderScheduler(
+                pdf_document, pdf_document.render_config.render_threads
+            )
+            self.render_scheduler.pageRendered.connect(self.on_page_rendered)
+            self.render_scheduler.tileRendered.connect(self.on_tile_rendered)
+            self.render_scheduler.start()
+            self.prefetcher = PagePrefetcher(pdf_document, self.render_scheduler,
+                                             self.memory_budget)
+            
+    def update_memory_budget(self):
+        """按渲染配置更新内存预算"""
+        if self.pdf_document:
+            self.memory_budget.set_limit(self.pdf_document.render_config.get_max_memory_bytes())
+            
+    def enforce_memory_budget(self):
+        """后台线程把图像放入缓存后按预算释放（缓存的增长不经过track）"""
+        if self.pdf_document:
+            self.memory_budget.enforce()
+            
+    def on_thumbnail_ready(self, page_index, thumbnail):
+        """缩略图面板生成了一张缩略图（已放入缩略图缓存）"""
+        self.enforce_memory_budget()
+        
+    def get_memory_usage(self):
+        """获取页面图像、图块和缩略图的内存占用，格式见MemoryBudget.get_usage"""
+        return self.memory_budget.get_usage()
+        
+    def notify_page_turn(self, page_index, zoom_level):
+        """单页模式下即将显示page_index（在读取页面图像之前调用），由预取器记录命中并预取后面的页面"""
+        if self.prefetcher and not self.continuous_mode:
+            self.prefetcher.on_page_changed(page_index, zoom_level)
+            
+    def get_prefetch_stats(self):
+        """获取翻页预取的统计，格式见PagePrefetcher.get_stats，没有文档时返回None"""
+        return self.prefetcher.get_stats() if self.prefetcher else None
         
-    def load_all_pages(self, zoom_level=1.0):
-        """加载所有页面（连续模式）"""
+    def shutdown_renderer(self):
+        """停止后台渲染线程"""
+        if self.prefetcher:
+            self.prefetcher.cancel()
+            self.prefetcher = None
+        if self.render_scheduler:
+            self.render_scheduler.pageRendered.disconnect(self.on_page_rendered)
+            self.render_scheduler.tileRendered.disconnect(self.on_tile_rendered)
+            self.render_scheduler.shutdown()
+            self.render_scheduler = None
+        
+    def load_all_pages(self, zoom_level=1.0, start_time=None):
+        """加载所有页面（连续模式，虚拟化渲染）
+        
+        start_time为统计首次绘制时间的起点，默认为调用时刻
+        """
         if not self.pdf_document:
             return
             
+        self.expect_first_paint(start_time if start_time is not None else time.perf_counter())
+        
+        # 缩放前已渲染的页面图像，作为新缩放级别下的即时预览
+        preview_pixmaps = self.collect_preview_pixmaps(zoom_level)
+        
         self.zoom_level = zoom_level
         self.clear_pages()
+        self.preview_pixmaps = preview_pixmaps
         
         # 隐藏占位符
         self.placeholder_label.hide()
         
-        # 为每一页创建标签并加载图像
-        self.page_positions = []
-        current_y = 10  # 起始位置
+        # 根据页面尺寸创建占位标签，只渲染视口附近的页面
+        with perf_stats.measure('layout'):
+            sizes = self.pdf_document.page_geometry.get_display_sizes(zoom_level)
+            for page_num, (width, height) in enumerate(sizes):
+                page_label = self.create_page_label()
+                page_label.setFixedSize(width, height)
+                self.init_page_highlights(page_label, page_num)
+                self.page_labels.append(page_label)
+                
+            self.layout_pages()
+            for page_label in self.page_labels:
+                page_label.show()
+            self.pages_widget.show()
+        self.update_current_page()
+            
+        # 渲染当前视口内的页面，布局完成后再按实际位置更新一次
+        self.update_visible_pages()
+        self.schedule_visible_update()
+        
+    def collect_preview_pixmaps(self, zoom_level):
+        """收集已渲染的页面图像，并通过设备像素比由Qt缩放到新的显示尺寸"""
+        if not self.pdf_document or not self.pdf_document.render_config.progressive_rendering:
+            return {}
+            
+        preview_pixmaps = {}
+        for page_index in self.rendered_pages | self.preview_pages:
+            pixmap = self.page_labels[page_index].pixmap()
+            if pixmap is None or pixmap.isNull():
+                continue
+            width, _ = self.get_page_display_size(page_index, zoom_level)
+            preview = QPixmap(pixmap)
+            preview.setDevicePixelRatio(pixmap.width() / width)
+            preview_pixmaps[page_index] = preview
+        return preview_pixmaps
         
-        for page_num in range(self.total_pages):
-            # 获取页面图像
-            pil_image = self.pdf_document.get_page_image(page_num, zoom_level)
+    def show_preview(self, page_index):
+        """在完整渲染完成前先显示预览"""
+        if page_index in self.rendered_pages or page_index in self.preview_pages:
+            return
+        if not self.pdf_document.render_config.progressive_rendering:
+            return
             
-            # 创建页面标签
-            page_label = QLabel()
-            page_label.setAlignment(Qt.AlignCenter)
-            page_label.setStyleSheet("""
-                background-color: white; 
-                border: 1px solid #ddd;
-                margin: 2px;
-                padding: 5px;
-            """)
+        # 优先使用缩放前的图像，否则快速渲染低分辨率预览
+        pixmap = self.preview_pixmaps.pop(page_index, None)
+        if pixmap is None:
+            preview = self.pdf_document.render_preview(page_index, self.zoom_level)
+            pixmap = self.image_to_pixmap(preview)
+            
+        label = self.get_page_label(page_index)
+        label.setPixmap(pixmap)
+        self.preview_pages.add(page_index)
+        self.watch_first_paint(label)
+        self.track_page_pixmap(page_index, pixmap)
+        
+    def expect_first_paint(self, start_time):
+        """开始统计首次绘制时间（从start_time起，到下一次有页面绘制出内容为止）"""
+        self.first_paint_start = start_time
+        
+    def watch_first_paint(self, label):
+        """如果正在统计首次绘制时间，在标签绘制出内容时记录"""
+        if self.first_paint_start is not None:
+            label.paint_callback = self.on_first_paint
             
-            # 转换并设置图像
-            pixmap = self.pil_to_pixmap(pil_image)
+    def on_first_paint(self):
+        """首次绘制出页面内容"""
+        if self.first_paint_start is None:
+            return
+        self.last_first_paint_ms = (time.perf_counter() - self.first_paint_start) * 1000
+        self.first_paint_start = None
+        self.firstPaint.emit(self.last_first_paint_ms)
+        
+    def create_page_label(self):
+        """创建页面标签（样式由页面容器的样式表统一设置）"""
+        page_label = PageLabel(self.pages_widget)
+        page_label.setAlignment(Qt.AlignCenter)
+        page_label.setScaledContents(False)  # 禁用自动缩放以保持质量
+        return page_label
+        
+    def layout_pages(self):
+        """按页面标签的尺寸计算每页的位置并摆放标签，耗时与页数成线性关系"""
+        sizes = [(label.width(), label.height()) for label in self.page_labels]
+        offsets, max_width, total_height = compute_offsets(sizes, self.page_spacing)
+        margin = self.container_layout.contentsMargins().top()
+        for label, (width, _), y in zip(self.page_labels, sizes, offsets):
+            # 与布局管理器一样水平居中
+            label.move((max_width - width) // 2, y)
+        self.page_positions = [margin + y for y in offsets]
+        self.pages_widget.setFixedSize(max_width, total_height)
+        
+    def update_page_sizes(self, page_indexes):
+        """页面的实际尺寸读取完成后更新标签尺寸和位置，保持当前阅读位置不变"""
+        if not self.continuous_mode or not self.page_labels:
+            return
             
-            # 确保高质量渲染
-            page_label.setPixmap(pixmap)
-            page_label.setFixedSize(pixmap.size())
-            page_label.setScaledContents(False)  # 禁用自动缩放以保持质量
+        changed = False
+        for page_index in page_indexes:
+            if page_index >= len(self.page_labels):
+                continue
+            label = self.page_labels[page_index]
+            width, height = self.get_page_display_size(page_index, self.zoom_level)
+            self.init_page_size(label, page_index)
+            if label.width() == width and label.height() == height:
+                continue
+                
+            # 按估计尺寸渲染的图像作废
+            label.setFixedSize(width, height)
+            self.release_page(page_index)
+            self.release_tiles(page_index)
+            changed = True
             
-            # 添加到布局
-            self.container_layout.addWidget(page_label)
-            self.page_labels.append(page_label)
+        if not changed:
+            return
+            
+        # 以视口顶部所在的页面为锚点
+        anchor = self.get_visible_page_range()
+        offset = 0
+        if anchor is not None:
+            offset = self.verticalScrollBar().value() - self.page_positions[anchor[0]]
+        self.layout_pages()
+        if anchor is not None:
+            self.scroll_to_y(self.page_positions[anchor[0]] + offset)
+        self.update_current_page()
+        self.schedule_visible_update()
+        
+    def get_label_x(self, label):
+        """页面标签在容器中的水平位置"""
+        return label.mapTo(self.container_widget, QPoint(0, 0)).x()
+        
+    def get_label_y(self, label, page_index):
+        """页面标签在容器中的垂直位置"""
+        return self.page_positions[page_index] if self.continuous_mode else label.y()
+        
+    def get_page_display_size(self, page_num, zoom_level):
+        """计算页面在指定缩放级别下的显示尺寸（无需渲染）"""
+        return self.pdf_document.page_geometry.get_display_size(page_num, zoom_level)
+        
+    def schedule_visible_update(self):
+        """合并短时间内的多次滚动，延迟更新可见页面"""
+        if self.page_labels and (self.continuous_mode or self.single_page_tiles):
+            self.visible_update_timer.start()
+            
+    def get_visible_page_range(self):
+        """获取视口内可见的页面范围（0基，闭区间）"""
+        if not self.page_positions:
+            return None
+            
+        top = self.verticalScrollBar().value()
+        bottom = top + self.viewport().height()
+        first = max(0, bisect.bisect_right(self.page_positions, top) - 1)
+        last = max(first, bisect.bisect_left(self.page_positions, bottom) - 1)
+        return first, min(last, len(self.page_positions) - 1)
+        
+    @timed('visible_update')
+    def update_visible_pages(self):
+        """渲染视口附近的页面，并释放远离视口的页面图像"""
+        if self.single_page_tiles:
+            if not self.zoom_pending:
+                self.update_visible_tiles(self.displayed_page, self.displayed_page)
+            return
+            
+        visible_range = self.get_visible_page_range()
+        if visible_range is None or not self.pdf_document or self.zoom_pending:
+            return
+            
+        config = self.pdf_document.render_config
+        first, last = visible_range
+        for page_index in range(first, last + 1):
+            self.memory_budget.touch('pages', page_index)
+            self.memory_budget.touch('tiles', page_index)
+        render_start = max(0, first - config.preload_pages)
+        render_end = min(len(self.page_labels) - 1, last + config.preload_pages)
+        keep_start = first - config.release_distance
+        keep_end = last + config.release_distance
+        
+        # 释放远离视口的页面图像
+        for page_index in list(self.rendered_pages | self.preview_pages):
+            if page_index < keep_start or page_index > keep_end:
+                self.release_page(page_index)
+                
+        # 高缩放级别下只渲染可见图块，内存占用取决于视口而不是页面尺寸
+        if config.should_use_tiles(self.zoom_level):
+            for page_index in range(first, last + 1):
+                self.show_preview(page_index)
+            self.update_visible_tiles(first, last)
+            return
+            
+        # 丢弃已滚出范围或缩放级别过期的渲染任务
+        if self.render_scheduler:
+            self.render_scheduler.cancel_stale(self.zoom_level, render_start, render_end)
+            
+        # 可见页面优先，其次按距离视口远近预渲染
+        for page_index in range(render_start, render_end + 1):
+            if page_index in self.rendered_pages:
+                continue
+            if first <= page_index <= last:
+                priority = PRIORITY_VISIBLE
+            else:
+                priority = PRIORITY_PREFETCH + min(abs(page_index - first), abs(page_index - last))
+            self.render_page(page_index, priority)
             
-            # 记录页面位置
-            self.page_positions.append(current_y)
-            current_y += pixmap.height() + self.page_spacing
+        # 尚未渲染完成的可见页面先显示预览
+        for page_index in range(first, last + 1):
+            self.show_preview(page_index)
             
-        # 开始监控当前页面
-        self.page_check_timer.start()
+    def get_page_visible_tiles(self, page_index):
+        """计算页面在视口内可见的图块"""
+        label = self.get_page_label(page_index)
+        tile_size = self.get_tile_display_size()
         
-    def display_image(self, pil_image):
-        """显示单个页面图像（兼容性方法）"""
+        # 视口在页面标签坐标系中的位置
+        view_x = self.horizontalScrollBar().value() - self.get_label_x(label)
+        view_y = self.verticalScrollBar().value() - self.get_label_y(label, page_index)
+        
+        max_col = math.ceil(label.width() / tile_size) - 1
+        max_row = math.ceil(label.height() / tile_size) - 1
+        col_start = max(0, int(view_x // tile_size))
+        col_end = min(max_col, int((view_x + self.viewport().width()) // tile_size))
+        row_start = max(0, int(view_y // tile_size))
+        row_end = min(max_row, int((view_y + self.viewport().height()) // tile_size))
+        
+        return {(col, row)
+                for col in range(col_start, col_end + 1)
+                for row in range(row_start, row_end + 1)}
+        
+    def get_tile_display_size(self):
+        """图块边长（逻辑像素）"""
+        config = self.pdf_document.render_config
+        return config.tile_size / config.device_pixel_ratio
+        
+    def update_visible_tiles(self, first, last):
+        """图块模式：渲染可见图块，释放视口外的图块"""
+        visible_tiles = {page_index: self.get_page_visible_tiles(page_index)
+                         for page_index in range(first, last + 1)}
+        
+        # 释放不可见页面和图块
+        for page_index in list(self.visible_tiles):
+            if page_index not in visible_tiles:
+                self.release_tiles(page_index)
+        for page_index, tiles in visible_tiles.items():
+            self.get_page_label(page_index).retain_tiles(tiles)
+            self.track_tiles(page_index)
+        self.visible_tiles = visible_tiles
+        
+        if self.render_scheduler:
+            self.render_scheduler.cancel_stale(self.zoom_level, first, last, visible_tiles)
+            
+        tile_size = self.get_tile_display_size()
+        for page_index, tiles in visible_tiles.items():
+            label = self.get_page_label(page_index)
+            for tile in tiles:
+                if tile in label.tiles:
+                    continue
+                tile_image = self.pdf_document.get_cached_tile(page_index, self.zoom_level, tile)
+                if tile_image is None and not self.render_scheduler:
+                    tile_image = self.pdf_document.get_tile(page_index, self.zoom_level, tile)
+                    
+                if tile_image is not None:
+                    label.set_tile(tile, self.image_to_pixmap(tile_image), tile_size)
+                    self.watch_first_paint(label)
+                    self.track_tiles(page_index)
+                else:
+                    self.render_scheduler.request(page_index, self.zoom_level,
+                                                  PRIORITY_VISIBLE, tile)
+                                                  
+    def on_tile_rendered(self, page_index, zoom_level, tile, tile_image):
+        """后台图块渲染完成"""
+        self.enforce_memory_budget()
+        if zoom_level != self.zoom_level or self.zoom_pending:
+            return
+        if tile not in self.visible_tiles.get(page_index, ()):
+            return  # 图块已不可见，或单页模式下已翻到其他页面
+            
+        label = self.get_page_label(page_index)
+        label.set_tile(tile, self.image_to_pixmap(tile_image), self.get_tile_display_size())
+        self.watch_first_paint(label)
+        self.track_tiles(page_index)
+        
+    def render_page(self, page_index, priority=PRIORITY_VISIBLE):
+        """渲染单个页面到对应标签，缓存未命中时交给后台线程"""
+        page_image = self.pdf_document.get_cached_page(page_index, self.zoom_level)
+        if page_image is None and not self.render_scheduler:
+            page_image = self.pdf_document.get_page(page_index, self.zoom_level)
+            
+        if page_image is not None:
+            self.set_page_pixmap(page_index, self.image_to_pixmap(page_image))
+        else:
+            self.render_scheduler.request(page_index, self.zoom_level, priority)
+            
+    def set_page_pixmap(self, page_index, pixmap):
+        """显示完整渲染的页面图像（替换预览）"""
+        label = self.page_labels[page_index]
+        with perf_stats.measure('label_update'):
+            label.setPixmap(pixmap)
+        self.rendered_pages.add(page_index)
+        self.preview_pages.discard(page_index)
+        self.watch_first_paint(label)
+        self.track_page_pixmap(page_index, pixmap)
+        
+    def track_page_pixmap(self, page_index, pixmap):
+        """把标签上的页面图像登记到内存预算"""
+        self.memory_budget.track('pages', page_index, get_pixmap_nbytes(pixmap), self.release_page)
+        
+    def track_tiles(self, page_index):
+        """把页面的图块登记到内存预算"""
+        nbytes = self.get_page_label(page_index).get_tiles_nbytes()
+        self.memory_budget.track('tiles', page_index, nbytes, self.release_tiles)
+        
+    def release_page(self, page_index):
+        """释放页面标签上的图像（完整图像或预览）"""
+        self.get_page_label(page_index).clear()
+        self.rendered_pages.discard(page_index)
+        self.preview_pages.discard(page_index)
+        self.memory_budget.untrack('pages', page_index)
+        
+    def release_tiles(self, page_index):
+        """释放页面的所有图块"""
+        self.get_page_label(page_index).clear_tiles()
+        self.visible_tiles.pop(page_index, None)
+        self.memory_budget.untrack('tiles', page_index)
+            
+    def on_page_rendered(self, page_index, zoom_level, page_image):
+        """后台渲染完成"""
+        self.enforce_memory_budget()
+        if zoom_level != self.zoom_level or not self.continuous_mode or self.zoom_pending:
+            return
+        if page_index >= len(self.page_labels) or page_index in self.rendered_pages:
+            return
+            
+        # 渲染期间页面可能已经滚出保留范围
+        visible_range = self.get_visible_page_range()
+        release_distance = self.pdf_document.render_config.release_distance
+        if visible_range is None or not (visible_range[0] - release_distance <= page_index
+                                         <= visible_range[1] + release_distance):
+            return
+            
+        self.set_page_pixmap(page_index, self.image_to_pixmap(page_image))
+        
+    def refresh_pages(self):
+        """丢弃已渲染的页面图像并重新渲染可见页面"""
+        # 正在按旧设置渲染的任务不再显示
+        if self.render_scheduler:
+            self.render_scheduler.cancel_all()
+        for page_index in self.rendered_pages | self.preview_pages:
+            self.page_labels[page_index].clear()
+        for page_index in self.visible_tiles:
+            self.page_labels[page_index].clear_tiles()
+        self.rendered_pages.clear()
+        self.preview_pages.clear()
+        self.visible_tiles = {}
+        self.memory_budget.clear()
+        self.update_visible_pages()
+        
+    def resizeEvent(self, event):
+        """窗口尺寸改变事件"""
+        super().resizeEvent(event)
+        self.update_current_page()
+        self.schedule_visible_update()
+        
+    def display_image(self, pil_image, page_index=None):
+        """显示单个页面图像（兼容性方法，支持PageImage或PIL图像）
+        
+        page_index为单页模式下显示的页码（0基），用于绘制该页的搜索结果
+        """
         if self.continuous_mode:
             # 连续模式下，这个方法用于更新单个页面
             if hasattr(self, 'current_page') and self.current_page <= len(self.page_labels):
-                pixmap = self.pil_to_pixmap(pil_image)
+                pixmap = self.image_to_pixmap(pil_image)
                 page_index = self.current_page - 1
                 if page_index < len(self.page_labels):
+                    # 保持预先计算的页面尺寸，避免打乱页面位置
                     self.page_labels[page_index].setPixmap(pixmap)
-                    self.page_labels[page_index].setFixedSize(pixmap.size())
+                    self.rendered_pages.add(page_index)
+                    self.track_page_pixmap(page_index, pixmap)
         else:
             # 单页模式
             self.clear_pages()
             self.placeholder_label.hide()
+            self.displayed_page = page_index
             
-            page_label = QLabel()
+            page_label = PageLabel()
             page_label.setAlignment(Qt.AlignCenter)
             page_label.setStyleSheet("background-color: white;")
             
-            pixmap = self.pil_to_pixmap(pil_image)
+            pixmap = self.image_to_pixmap(pil_image)
             page_label.setPixmap(pixmap)
-            page_label.setFixedSize(pixmap.size())
+            # 标签按逻辑尺寸显示（按缩放分桶渲染的图像像素尺寸与显示尺寸不同）
+            ratio = pixmap.devicePixelRatio()
+            page_label.setFixedSize(round(pixmap.width() / ratio), round(pixmap.height() / ratio))
+            if page_index is not None:
+                self.init_page_highlights(page_label, page_index)
+            self.watch_first_paint(page_label)
             
             self.container_layout.addWidget(page_label)
             self.page_labels = [page_label]
             
+            # 单页模式只显示一页，登记后参与预算统计但不会被释放
+            if page_index is not None:
+                self.memory_budget.set_visible_range(page_index, page_index)
+                self.memory_budget.track('pages', page_index, get_pixmap_nbytes(pixmap),
+                                         lambda _: None)
+            
+    def display_tiled_page(self, page_index, zoom_level):
+        """单页模式下按图块显示页面：高缩放级别时不光栅化整页，只渲染视口内的图块"""
+        self.clear_pages()
+        self.placeholder_label.hide()
+        self.displayed_page = page_index
+        self.single_page_tiles = True
+        self.zoom_level = zoom_level
+        
+        page_label = PageLabel()
+        page_label.setAlignment(Qt.AlignCenter)
+        page_label.setStyleSheet("background-color: white;")
+        self.pdf_document.get_page_size(page_index)  # 读取页面的实际尺寸
+        page_label.setFixedSize(*self.get_page_display_size(page_index, zoom_level))
+        self.init_page_highlights(page_label, page_index)
+        
+        self.container_layout.addWidget(page_label)
+        self.page_labels = [page_label]
+        self.memory_budget.set_visible_range(page_index, page_index)
+        self.show_preview(page_index)
+        
+        # 标签摆放完成后才能计算可见的图块
+        self.visible_update_timer.start()
+        
+    @timed('to_pixmap')
+    def image_to_pixmap(self, image):
+        """将页面图像转换为QPixmap"""
+        if isinstance(image, PageImage):
+            # QImage直接引用渲染缓冲区，这里只有上传到QPixmap的一次复制
+            return QPixmap.fromImage(image.image)
+        return self.pil_to_pixmap(image)
+        
     def pil_to_pixmap(self, pil_image):
         """将PIL图像转换为QPixmap - 高质量版本"""
         # 确保图像为RGB模式
@@ -207,32 +811,43 @@ class PDFViewerWidget(QScrollArea):
         """清空所有页面"""
         # 删除所有页面标签
         for label in self.page_labels:
+            # 立即移出布局，避免延迟删除前仍占据位置
+            self.container_layout.removeWidget(label)
+            label.hide()
             label.deleteLater()
         self.page_labels.clear()
         self.page_positions.clear()
+        self.pages_widget.setFixedSize(0, 0)
+        self.pages_widget.hide()
+        self.rendered_pages.clear()
+        self.preview_pages.clear()
+        self.preview_pixmaps = {}
+        self.visible_tiles = {}
+        self.memory_budget.clear()
+        self.zoom_pending = False
+        self.displayed_page = None
+        self.single_page_tiles = False
+        self.pending_scroll_y = None
         
-        # 停止页面检查定时器
-        self.page_check_timer.stop()
+        # 取消尚未开始的渲染任务
+        if self.render_scheduler:
+            self.render_scheduler.cancel_all()
         
-    def check_current_page(self):
-        """检查当前显示的页面"""
-        if not self.page_positions:
+        self.visible_update_timer.stop()
+        self.visible_range = None
+        
+    def update_current_page(self):
+        """滚动或重新布局后更新当前页面（视口中心所在的页面）和可见范围，二分查找页面位置"""
+        if not self.continuous_mode or not self.page_positions:
             return
             
-        # 获取当前滚动位置
-        scroll_y = self.verticalScrollBar().value()
-        viewport_height = self.viewport().height()
-        center_y = scroll_y + viewport_height // 2
-        
-        # 找到当前中心位置对应的页面
-        current_page = 1
-        for i, pos in enumerate(self.page_positions):
-            if center_y >= pos:
-                current_page = i + 1
-            else:
-                break
-                
-        # 如果页面改变了，发出信号
+        visible_range = self.get_visible_page_range()
+        if visible_range != self.visible_range:
+            self.visible_range = visible_range
+            self.visibleRangeChanged.emit(*visible_range)
+            
+        center_y = self.verticalScrollBar().value() + self.viewport().height() // 2
+        current_page = max(1, bisect.bisect_right(self.page_positions, center_y))
         if current_page != self.current_page:
             self.current_page = current_page
             self.currentPageChanged.emit(current_page)
@@ -242,21 +857,228 @@ class PDFViewerWidget(QScrollArea):
         if 1 <= page_num <= len(self.page_positions):
             self.current_page = page_num
             # 滚动到指定页面
-            target_y = self.page_positions[page_num - 1]
-            self.verticalScrollBar().setValue(target_y)
+            self.scroll_to_y(self.page_positions[page_num - 1])
+            
+    def scroll_to_y(self, y):
+        """垂直滚动到指定位置，刚加载页面、布局尚未完成时在滚动范围更新后再滚动"""
+        scroll_bar = self.verticalScrollBar()
+        self.pending_scroll_y = y if y > scroll_bar.maximum() else None
+        scroll_bar.setValue(y)
+        
+    def on_scroll_range_changed(self, minimum, maximum):
+        """页面布局完成后执行等待中的滚动"""
+        if self.pending_scroll_y is not None:
+            y, self.pending_scroll_y = self.pending_scroll_y, None
+            self.verticalScrollBar().setValue(y)
             
     def set_continuous_mode(self, continuous):
         """设置连续页面模式"""
         self.continuous_mode = continuous
+        if self.prefetcher:
+            self.prefetcher.reset()
         
     def zoom_to_level(self, zoom_level):
         """缩放到指定级别"""
-        if self.pdf_document and self.continuous_mode:
+        if self.pdf_document and self.continuous_mode and self.page_labels:
+            self.relayout_pages(zoom_level)
+        elif self.pdf_document and self.continuous_mode:
             self.load_all_pages(zoom_level)
         elif self.pdf_document:
             # 单页模式下重新加载当前页
-            page_image = self.pdf_document.get_page_image(self.current_page - 1, zoom_level)
-            self.display_image(page_image)
+            page_image = self.pdf_document.get_page(self.current_page - 1, zoom_level)
+            self.display_image(page_image, self.current_page - 1)
+        
+    def relayout_pages(self, zoom_level):
+        """连续模式下缩放：保留页面标签，只按新的缩放级别调整尺寸和位置
+        
+        已显示的图像通过设备像素比缩放后作为预览保留，可见页面随后按新的缩放级别重新渲染，
+        视口中心在所在页面中的相对位置保持不变
+        """
+        anchor = self.get_zoom_anchor()
+        self.expect_first_paint(time.perf_counter())
+        self.zoom_level = zoom_level
+        self.zoom_pending = False
+        self.visible_update_timer.stop()
+        if self.render_scheduler:
+            self.render_scheduler.cancel_all()
+            
+        # 图块按旧缩放级别划分，整页图像改为预览，等可见时再重新渲染
+        for page_index in list(self.visible_tiles):
+            self.release_tiles(page_index)
+        progressive = self.pdf_document.render_config.progressive_rendering
+        for page_index in list(self.rendered_pages):
+            if progressive:
+                self.preview_pages.add(page_index)
+            else:
+                self.release_page(page_index)
+        self.rendered_pages.clear()
+        self.preview_pixmaps = {}  # 按更早的缩放级别收集的图像已经不适用
+        
+        with perf_stats.measure('layout'):
+            sizes = self.pdf_document.page_geometry.get_display_sizes(zoom_level)
+            for page_index, (width, height) in enumerate(sizes):
+                label = self.page_labels[page_index]
+                if label.width() == width and label.height() == height:
+                    continue
+                if page_index in self.preview_pages:
+                    self.scale_label_content(label, width / label.width())
+                label.setFixedSize(width, height)
+            self.layout_pages()
+            
+        if anchor is not None:
+            self.restore_zoom_anchor(anchor)
+        self.update_current_page()
+        self.update_visible_pages()
+        self.schedule_visible_update()
+        
+    def get_zoom_anchor(self):
+        """缩放锚点：视口中心所在的页面，以及中心在该页面中的相对位置"""
+        if not self.page_positions:
+            return None
+        center_y = self.verticalScrollBar().value() + self.viewport().height() // 2
+        page_index = max(0, bisect.bisect_right(self.page_positions, center_y) - 1)
+        height = max(1, self.page_labels[page_index].height())
+        return page_index, (center_y - self.page_positions[page_index]) / height
+        
+    def restore_zoom_anchor(self, anchor):
+        """重新布局后滚动到锚点，使锚点回到视口中心"""
+        page_index, fraction = anchor
+        center_y = self.page_positions[page_index] + fraction * self.page_labels[page_index].height()
+        self.scroll_to_y(max(0, round(center_y - self.viewport().height() // 2)))
+        
+    def preview_zoom(self, zoom_level, previous_zoom):
+        """立即缩放已显示的图像作为预览，不重新渲染，之后由zoom_to_level完成缩放"""
+        if not self.pdf_document or not self.page_labels:
+            return
+            
+        if not self.continuous_mode:
+            # 图块按旧缩放级别划分，翻页或重新显示前不再更新图块
+            self.zoom_pending = True
+            label = self.page_labels[0]
+            factor = zoom_level / previous_zoom
+            self.scale_label_content(label, factor)
+            label.setFixedSize(max(1, round(label.width() * factor)),
+                               max(1, round(label.height() * factor)))
+            return
+            
+        visible_range = self.get_visible_page_range()
+        if visible_range is None:
+            return
+            
+        # 停止按旧缩放级别渲染，直到重新布局
+        self.zoom_pending = True
+        if self.render_scheduler:
+            self.render_scheduler.cancel_all()
+            
+        # 只调整可见页面，其余页面在重新布局时处理；视口中心的内容保持不动
+        anchor = self.get_zoom_anchor()
+        first, last = visible_range
+        for page_index in range(first, last + 1):
+            label = self.page_labels[page_index]
+            width, height = self.get_page_display_size(page_index, zoom_level)
+            self.scale_label_content(label, width / label.width())
+            label.setFixedSize(width, height)
+        self.layout_pages()
+        self.restore_zoom_anchor(anchor)
+            
+    def scale_label_content(self, label, factor):
+        """通过设备像素比缩放标签中的图像"""
+        pixmap = label.pixmap()
+        if pixmap is not None and not pixmap.isNull():
+            scaled = QPixmap(pixmap)
+            scaled.setDevicePixelRatio(pixmap.devicePixelRatio() / factor)
+            label.setPixmap(scaled)
+        if isinstance(label, PageLabel):
+            label.scale_tiles(factor)
+            
+    def init_page_highlights(self, label, page_index):
+        """设置新页面标签的页面宽度和搜索结果"""
+        self.init_page_size(label, page_index)
+        label.highlights = self.page_hits.get(page_index, [])
+        label.current_hit = self.current_hit
+        
+    def init_page_size(self, label, page_index):
+        """设置页面标签的页面尺寸和旋转角度，用于换算搜索结果坐标"""
+        label.page_size = self.pdf_document.get_layout_page_size(page_index)
+        label.rotation = self.pdf_document.page_geometry.get_rotation(page_index)
+        
+    def get_page_label(self, page_index):
+        """获取正在显示指定页面的标签，没有时返回None"""
+        if self.continuous_mode:
+            if 0 <= page_index < len(self.page_labels):
+                return self.page_labels[page_index]
+        elif self.page_labels and self.displayed_page == page_index:
+            return self.page_labels[0]
+        return None
+        
+    def update_page_highlights(self, page_index):
+        """更新页面标签上的搜索结果并重绘（不重新渲染页面）"""
+        label = self.get_page_label(page_index)
+        if isinstance(label, PageLabel):
+            label.highlights = self.page_hits.get(page_index, [])
+            label.current_hit = self.current_hit
+            label.update()
+            
+    def add_search_hits(self, results):
+        """添加搜索结果高亮（结果格式与PDFDocument.search_text一致，可逐页追加）"""
+        pages = set()
+        for result in results:
+            boxes = result.get('boxes') or [tuple(result['bbox'])]
+            self.page_hits.setdefault(result['page'], []).append((len(self.search_hits), boxes))
+            self.search_hits.append(result)
+            pages.add(result['page'])
+        for page_index in pages:
+            self.update_page_highlights(page_index)
+            
+    def clear_search_hits(self):
+        """清除所有搜索结果高亮"""
+        pages = list(self.page_hits)
+        self.search_hits = []
+        self.page_hits = {}
+        self.current_hit = -1
+        for page_index in pages:
+            self.update_page_highlights(page_index)
+            
+    def goto_hit(self, index):
+        """定位到第index个搜索结果（超出范围时循环），并滚动到可见位置"""
+        if not self.search_hits:
+            return
+            
+        index %= len(self.search_hits)
+        previous_page = None
+        if 0 <= self.current_hit < len(self.search_hits):
+            previous_page = self.search_hits[self.current_hit]['page']
+        self.current_hit = index
+        
+        page_index = self.search_hits[index]['page']
+        if previous_page is not None and previous_page != page_index:
+            self.update_page_highlights(previous_page)
+        self.update_page_highlights(page_index)
+        self.scroll_to_hit(index)
+        self.currentHitChanged.emit(index, len(self.search_hits))
+        
+    def next_hit(self):
+        """下一个搜索结果"""
+        self.goto_hit(self.current_hit + 1)
+        
+    def prev_hit(self):
+        """上一个搜索结果"""
+        self.goto_hit(self.current_hit - 1 if self.current_hit >= 0 else -1)
+        
+    def scroll_to_hit(self, index):
+        """滚动使搜索结果可见，已经可见时不滚动"""
+        hit = self.search_hits[index]
+        label = self.get_page_label(hit['page'])
+        if not isinstance(label, PageLabel) or not label.page_size[0]:
+            return
+            
+        scale = label.width() / label.page_size[0]
+        bbox = rotate_box(tuple(hit['bbox']), label.rotation, *label.page_size)
+        top = self.get_label_y(label, hit['page'])
+        x = self.get_label_x(label) + (bbox[0] + bbox[2]) / 2 * scale
+        y = top + (bbox[1] + bbox[3]) / 2 * scale
+        self.ensureVisible(int(x), int(y), self.viewport().width() // 4,
+                           self.viewport().height() // 4)
         
     def mousePressEvent(self, event):
         """鼠标按下事件"""
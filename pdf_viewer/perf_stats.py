@@ -0,0 +1,187 @@
+"""
+性能统计
+在渲染、显示和搜索的关键路径上记录耗时，按阶段汇总为直方图，可导出为JSON
+
+记录的阶段：
+    render_page       PDFDocument.render_page（光栅化、缩放和写入缓存）
+    rasterize         fitz光栅化整页
+    resize            超采样时的LANCZOS缩小
+    disk_cache_read   从磁盘缓存读取页面
+    disk_cache_write  渲染线程将页面写入磁盘缓存
+    render_tile       渲染一个图块
+    render_preview    渲染低分辨率预览
+    render_thumbnail  渲染缩略图
+    to_pixmap         页面图像转换为QPixmap
+    label_update      设置页面标签的图像
+    paint             页面标签绘制
+    visible_update    滚动后更新可见页面
+    layout            连续模式创建和摆放页面标签
+    search_page       逐页扫描搜索一页
+    search            一次完整的搜索
+    open_first_page   打开文档到显示出第一页
+    open_interactive  打开文档到完全可交互（第一页已显示且页面尺寸已全部读取）
+"""
+
+import bisect
+from collections import deque
+from contextlib import contextmanager
+import functools
+import json
+import threading
+import time
+
+
+# 直方图桶的上界（毫秒），按2倍递增，最后一个桶收集更大的值
+BUCKET_BOUNDS = [0.0625 * 2 ** i for i in range(19)]  # 0.0625 ms .. 16384 ms
+
+# 每个阶段保留的最近样本数，用于实时显示
+RECENT_SAMPLES = 50
+
+
+class Histogram:
+    """耗时直方图（毫秒）"""
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        
+    def add(self, ms):
+        """记录一个样本"""
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+        self.recent.append(ms)
+        
+    def percentile(self, q):
+        """估计第q（0~1）分位数：取累计计数达到的桶的上界，并限制在[最小值, 最大值]内"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target and count:
+                bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return max(self.min, min(bound, self.max))
+        return self.max
+        
+    def get_mean(self):
+        """平均耗时"""
+        return self.total / self.count if self.count else 0.0
+        
+    def get_recent_mean(self):
+        """最近样本的平均耗时"""
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+        
+    def to_dict(self):
+        """转换为可序列化为JSON的字典（只包含非空的桶）"""
+        buckets = []
+        for index, count in enumerate(self.counts):
+            if count:
+                bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else None
+                buckets.append({'le_ms': bound, 'count': count})
+        return {
+            'count': self.count,
+            'total_ms': self.total,
+            'mean_ms': self.get_mean(),
+            'min_ms': self.min or 0.0,
+            'max_ms': self.max or 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p90_ms': self.percentile(0.9),
+            'p99_ms': self.percentile(0.99),
+            'buckets': buckets
+        }
+
+
+class PerfStats:
+    """按阶段汇总耗时（线程安全，渲染线程和界面线程都会记录）"""
+    
+    def __init__(self):
+        self.enabled = True
+        self.started = time.time()
+        self._histograms = {}
+        self._lock = threading.Lock()
+        
+    def record(self, name, ms):
+        """记录一个阶段的耗时（毫秒）"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(ms)
+            
+    @contextmanager
+    def measure(self, name):
+        """记录with块的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+            
+    def get_summary(self, name):
+        """获取某个阶段的统计 {'count', 'mean_ms', 'recent_ms', 'p50_ms', 'p90_ms', 'max_ms'}，
+        没有样本时返回None"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                return None
+            return {
+                'count': histogram.count,
+                'mean_ms': histogram.get_mean(),
+                'recent_ms': histogram.get_recent_mean(),
+                'p50_ms': histogram.percentile(0.5),
+                'p90_ms': histogram.percentile(0.9),
+                'max_ms': histogram.max
+            }
+            
+    def snapshot(self):
+        """获取所有阶段的直方图 {阶段: Histogram.to_dict()}"""
+        with self._lock:
+            return {name: histogram.to_dict()
+                    for name, histogram in sorted(self._histograms.items())}
+                    
+    def reset(self):
+        """清空所有统计"""
+        with self._lock:
+            self._histograms.clear()
+            self.started = time.time()
+            
+    def to_json(self, extra=None):
+        """导出为JSON字符串，extra为附加的信息（如缓存和内存统计）"""
+        data = {
+            'started': self.started,
+            'exported': time.time(),
+            'histograms': self.snapshot()
+        }
+        if extra:
+            data.update(extra)
+        return json.dumps(data, ensure_ascii=False, indent=2)
+        
+    def export_json(self, path, extra=None):
+        """导出到JSON文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json(extra))
+
+
+# 全局统计实例
+perf_stats = PerfStats()
+
+
+def timed(name):
+    """装饰器：记录函数每次调用的耗时"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with perf_stats.measure(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,117 @@
+"""
+多进程渲染后端
+每个工作进程只打开一次PDF文件，渲染结果通过共享内存传回主进程，
+用于批量预渲染和大文档渲染，绕开GIL对PyMuPDF调用的限制
+"""
+
+import copy
+import os
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+
+from PIL import Image
+
+from .pdf_document import PDFDocument
+from .render_config import RenderConfig
+
+
+# 工作进程中的文档对象（每个进程一份）
+_worker_document = None
+
+
+def _init_worker(file_path, render_config):
+    """工作进程初始化：按调用者的渲染配置打开文档"""
+    global _worker_document
+    # 结果由主进程管理，工作进程内不使用内存缓存和磁盘缓存
+    render_config = copy.copy(render_config)
+    render_config.cache_pages = False
+    render_config.disk_cache = False
+    _worker_document = PDFDocument(file_path, render_config)
+
+
+def _render_to_shared_memory(args):
+    """在工作进程中渲染页面，并将像素数据写入共享内存"""
+    page_num, zoom_level = args
+    # 与PDFDocument.get_page_image一致，按缩放级别本身渲染，不使用缩放分桶
+    page_image = _worker_document.get_page(page_num, zoom_level, snap=False)
+    
+    shm = shared_memory.SharedMemory(create=True, size=max(1, page_image.nbytes))
+    try:
+        shm.buf[:page_image.nbytes] = page_image.samples
+    finally:
+        shm.close()
+        
+    return page_num, shm.name, page_image.width, page_image.height, page_image.stride
+
+
+class ProcessPoolRenderer:
+    """多进程渲染器，接口与PDFDocument.get_page_image一致
+    
+    工作进程在启动时复制渲染配置，修改配置后需要调用restart()生效。
+    使用spawn方式启动工作进程：GUI进程中有渲染线程，fork可能复制到被占用的锁。
+    """
+    
+    def __init__(self, file_path, render_config=None, num_workers=None):
+        self.file_path = file_path
+        self.render_config = render_config or RenderConfig()
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self._pool = None
+        
+    def start(self):
+        """启动工作进程池"""
+        if self._pool is None:
+            # 先在主进程启动资源跟踪进程，使工作进程创建的共享内存
+            # 与主进程的释放登记在同一个跟踪进程中
+            if os.name == 'posix':
+                resource_tracker.ensure_running()
+            context = multiprocessing.get_context("spawn")
+            self._pool = context.Pool(
+                self.num_workers,
+                initializer=_init_worker,
+                initargs=(self.file_path, self.render_config)
+            )
+            
+    def restart(self):
+        """重启进程池以应用新的渲染配置"""
+        self.close()
+        self.start()
+        
+    def get_page_image(self, page_num, zoom_level=1.0):
+        """获取指定页面的图像"""
+        self.start()
+        result = self._pool.apply(_render_to_shared_memory, ((page_num, zoom_level),))
+        return self._receive(result)
+        
+    def render_pages(self, page_nums, zoom_level=1.0):
+        """批量渲染页面，按完成顺序逐个返回 (页码, 图像)"""
+        self.start()
+        tasks = [(page_num, zoom_level) for page_num in page_nums]
+        for result in self._pool.imap_unordered(_render_to_shared_memory, tasks):
+            yield result[0], self._receive(result)
+            
+    def _receive(self, result):
+        """从共享内存读取像素数据并释放共享内存"""
+        _, name, width, height, stride = result
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            pil_image = Image.frombuffer(
+                'RGB', (width, height), shm.buf, 'raw', 'RGB', stride, 1
+            ).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+        return pil_image
+        
+    def close(self):
+        """关闭工作进程池"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            
+    def __enter__(self):
+        self.start()
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -2,6 +2,10 @@
 PDF渲染配置和优化
 """
 
+import math
+import os
+
+
 class RenderConfig:
     """PDF渲染配置类"""
     
@@ -11,19 +15,58 @@ class RenderConfig:
         self.use_text_antialiasing = True
         self.use_high_quality = True
         
-        # DPI设置
+        # DPI设置（仅在超采样模式下使用）
         self.default_dpi = 150  # 默认DPI，影响渲染质量
         self.max_dpi = 300      # 最大DPI限制
         
+        # 默认按屏幕上的最终像素尺寸直接渲染；超采样需显式开启
+        self.supersample = False       # 先按较高DPI渲染再LANCZOS缩小
+        self.device_pixel_ratio = 1.0  # 设备像素比（高分屏大于1）
+        
         # 缩放相关
         self.scale_smooth = True  # 平滑缩放
         self.min_zoom = 0.1
         self.max_zoom = 5.0
+        self.fit_policy = 'page'  # 适合宽度/页面的依据：'page'按当前页面，'max_width'按最宽的页面
+        
+        # 缩放分桶：页面只按少量量化的缩放级别渲染，显示时通过设备像素比由Qt缩放到实际尺寸，
+        # 适合宽度、适合页面和连续×1.25缩放得到的任意缩放级别也能复用缓存
+        self.zoom_snapping = True
+        self.zoom_buckets_per_octave = 8  # 缩放级别每翻一倍分为几个桶（相邻分桶相差约9%）
+        self.zoom_snap_tolerance = 0.1    # 已缓存的相邻分桶与缩放级别的误差不超过该比例时直接复用
         
         # 性能设置
         self.cache_pages = True      # 缓存页面图像
         self.max_cache_size = 50     # 最大缓存页面数
+        self.max_cache_memory = 256  # 最大缓存内存（MB）
         self.lazy_loading = False    # 延迟加载（大文档）
+        self.preload_pages = 2       # 连续模式下视口前后预渲染的页数
+        self.release_distance = 6    # 距视口超过该页数的页面释放图像
+        self.render_threads = 2      # 后台渲染线程数
+        self.prefetch_pages = 3      # 单页模式下沿阅读方向最多预取的页数（0为关闭）
+        
+        # 内存预算：页面图像、图块和缩略图（包括各缓存）合计的内存上限，
+        # 超出时按与视口的距离和最近使用时间释放
+        self.max_memory = 512  # MB
+        
+        # 磁盘缓存：跨会话复用渲染结果（需同时开启cache_pages），默认关闭；
+        # 开启后由后台渲染线程写入
+        self.disk_cache = False
+        self.disk_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "pdf_viewer", "pages")
+        self.max_disk_cache_size = 1024  # 磁盘缓存上限（MB）
+        
+        # 渐进式渲染：先显示低分辨率预览，完整渲染完成后替换
+        self.progressive_rendering = True
+        self.preview_scale = 0.25    # 预览相对目标分辨率的比例
+        
+        # 图块渲染（高缩放级别下只渲染可见区域）
+        self.tile_zoom_threshold = 2.5  # 达到该缩放级别时启用图块渲染
+        self.tile_size = 512            # 图块边长（设备像素）
+        self.max_tile_cache_memory = 128  # 图块缓存内存上限（MB）
+        
+        # 缩略图
+        self.thumbnail_size = 120               # 缩略图最大宽度（逻辑像素），高度不超过宽度的1.4倍
+        self.max_thumbnail_cache_memory = 32    # 缩略图缓存内存上限（MB），与页面缓存分开
         
         # 显示设置
         self.page_shadow = True      # 页面阴影
@@ -35,6 +78,67 @@ class RenderConfig:
         dpi = self.default_dpi * zoom_level
         return min(dpi, self.max_dpi)
         
+    def get_target_scale(self, zoom_level):
+        """屏幕上最终像素尺寸对应的缩放比例（PDF点 → 设备像素）"""
+        return zoom_level * self.device_pixel_ratio
+        
+    def get_render_scale(self, zoom_level):
+        """光栅化使用的缩放比例"""
+        target_scale = self.get_target_scale(zoom_level)
+        if self.supersample:
+            return max(target_scale, self.get_render_dpi(zoom_level) / 72.0)
+        return target_scale
+        
     def should_use_high_quality(self, zoom_level):
         """判断是否使用高质量渲染"""
         return self.use_high_quality and zoom_level >= 1.0
+        
+    def get_max_cache_bytes(self):
+        """获取缓存字节数上限"""
+        return self.max_cache_memory * 1024 * 1024
+        
+    def get_max_memory_bytes(self):
+        """获取内存预算字节数"""
+        return self.max_memory * 1024 * 1024
+        
+    def get_render_flags(self, zoom_level):
+        """获取影响渲染结果的标志，用于区分缓存"""
+        return (
+            self.use_antialiasing,
+            self.use_text_antialiasing,
+            self.should_use_high_quality(zoom_level),
+            self.supersample
+        )
+        
+    def get_max_disk_cache_bytes(self):
+        """获取磁盘缓存字节数上限"""
+        return self.max_disk_cache_size * 1024 * 1024
+        
+    def get_max_tile_cache_bytes(self):
+        """获取图块缓存字节数上限"""
+        return self.max_tile_cache_memory * 1024 * 1024
+        
+    def get_max_thumbnail_cache_bytes(self):
+        """获取缩略图缓存字节数上限"""
+        return self.max_thumbnail_cache_memory * 1024 * 1024
+        
+    def get_thumbnail_box(self):
+        """缩略图的最大尺寸 (宽, 高)，单位为逻辑像素"""
+        return self.thumbnail_size, int(self.thumbnail_size * 1.4)
+        
+    def should_use_tiles(self, zoom_level):
+        """判断是否使用图块渲染"""
+        return zoom_level >= self.tile_zoom_threshold
+        
+    def snap_zoom(self, zoom_level, offset=0):
+        """缩放级别所在的渲染分桶：不小于zoom_level的最近分桶（缩小显示比放大清晰），
+        offset为相对该分桶的偏移；关闭分桶时返回zoom_level本身"""
+        if not self.zoom_snapping:
+            return zoom_level
+        steps = self.zoom_buckets_per_octave
+        index = math.ceil(round(math.log2(zoom_level) * steps, 6)) + offset
+        return round(2 ** (index / steps), 6)
+        
+    def get_zoom_bucket(self, zoom_level):
+        """将缩放级别量化为缓存分桶，消除浮点误差带来的缓存不命中"""
+        return round(zoom_level, 3)
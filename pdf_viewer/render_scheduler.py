@@ -0,0 +1,209 @@
+"""
+后台渲染调度器
+在工作线程中执行fitz光栅化，按优先级处理任务并支持取消过期任务
+"""
+
+import heapq
+import itertools
+import threading
+
+import fitz  # PyMuPDF
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+
+# 任务优先级：数值越小越先处理
+PRIORITY_VISIBLE = 0     # 视口内的页面
+PRIORITY_PREFETCH = 10   # 视口外的预渲染页面
+PRIORITY_IDLE = 20       # 单页模式下按阅读方向预取的页面
+
+
+class RenderJob:
+    """渲染任务（tile为None时渲染整页，否则渲染 (列, 行) 图块）"""
+    
+    def __init__(self, page_num, zoom_level, priority, generation, tile=None):
+        self.page_num = page_num
+        self.zoom_level = zoom_level
+        self.priority = priority
+        self.generation = generation
+        self.tile = tile
+        
+    @property
+    def key(self):
+        """任务标识，用于去重"""
+        return (self.page_num, self.zoom_level, self.tile)
+
+
+class RenderWorker(QThread):
+    """渲染工作线程，每个线程持有独立的fitz.Document"""
+    
+    def __init__(self, scheduler):
+        super().__init__()
+        self.scheduler = scheduler
+        
+    def run(self):
+        """处理渲染任务直到调度器停止"""
+        pdf_document = self.scheduler.pdf_document
+        doc = fitz.open(pdf_document.file_path)
+        try:
+            while True:
+                job = self.scheduler.take_job()
+                if job is None:
+                    break
+                    
+                try:
+                    if job.tile is None:
+                        page_image = pdf_document.get_page(job.page_num, job.zoom_level, doc,
+                                                           write_disk_cache=True)
+                    else:
+                        page_image = pdf_document.get_tile(job.page_num, job.zoom_level,
+                                                           job.tile, doc)
+                except Exception as e:
+                    print(f"渲染页面失败 {job.page_num + 1}: {e}")
+                    page_image = None
+                    
+                self.scheduler.finish_job(job, page_image)
+        finally:
+            doc.close()
+
+
+class RenderScheduler(QObject):
+    """渲染调度器
+    
+    可见页面优先于预渲染页面；缩放或滚动后通过cancel_stale丢弃过期任务。
+    渲染结果通过pageRendered信号回到GUI线程。
+    """
+    
+    # 页码(0基), 缩放级别, PageImage（传递对象本身以保持像素缓冲区有效）
+    pageRendered = pyqtSignal(int, float, object)
+    # 页码(0基), 缩放级别, (列, 行), PageImage
+    tileRendered = pyqtSignal(int, float, object, object)
+    
+    def __init__(self, pdf_document, num_workers=2):
+        super().__init__()
+        self.pdf_document = pdf_document
+        self.num_workers = max(1, num_workers)
+        self.workers = []
+        
+        self._queue = []  # (priority, seq, job)
+        self._pending = {}  # key -> job
+        self._running = {}  # 正在渲染的任务key -> 任务所属的代数
+        self._seq = itertools.count()
+        self._generation = 0
+        self._stopping = False
+        self._condition = threading.Condition()
+        
+    def start(self):
+        """启动工作线程"""
+        for _ in range(self.num_workers):
+            worker = RenderWorker(self)
+            worker.start()
+            self.workers.append(worker)
+            
+    def request(self, page_num, zoom_level, priority=PRIORITY_VISIBLE, tile=None):
+        """请求渲染页面或图块，已在队列中的任务只会提升优先级"""
+        with self._condition:
+            if self._stopping:
+                return
+                
+            key = (page_num, zoom_level, tile)
+            # cancel_all之前开始的任务完成后会被丢弃，需要重新渲染
+            if self._running.get(key) == self._generation:
+                return
+                
+            job = self._pending.get(key)
+            if job is not None:
+                if priority >= job.priority:
+                    return
+                # 以更高优先级重新入队，旧条目在取出时跳过
+                job.generation = -1
+                
+            job = RenderJob(page_num, zoom_level, priority, self._generation, tile)
+            self._pending[key] = job
+            heapq.heappush(self._queue, (priority, next(self._seq), job))
+            self._condition.notify()
+            
+    def cancel_stale(self, zoom_level, first_page, last_page, visible_tiles=None):
+        """取消缩放级别不同、页码超出范围或图块已不可见的待处理任务
+        
+        visible_tiles: {页码: 可见图块集合}，为None时不按图块过滤
+        """
+        with self._condition:
+            for key, job in list(self._pending.items()):
+                page_num, job_zoom, tile = key
+                stale = job_zoom != zoom_level or not first_page <= page_num <= last_page
+                if tile is not None and visible_tiles is not None:
+                    stale = stale or tile not in visible_tiles.get(page_num, ())
+                if stale:
+                    job.generation = -1
+                    del self._pending[key]
+            self._compact()
+            
+    def cancel_priority(self, priority):
+        """取消优先级数值不小于priority的待处理任务（如空闲时的预取）"""
+        with self._condition:
+            for key, job in list(self._pending.items()):
+                if job.priority >= priority:
+                    job.generation = -1
+                    del self._pending[key]
+            self._compact()
+            
+    def cancel_all(self):
+        """取消所有待处理任务"""
+        with self._condition:
+            self._generation += 1
+            self._queue.clear()
+            self._pending.clear()
+            
+    def _compact(self):
+        """清理队列中已取消的条目"""
+        self._queue = [entry for entry in self._queue if entry[2].generation >= 0]
+        heapq.heapify(self._queue)
+        
+    def take_job(self):
+        """工作线程取出下一个任务，调度器停止时返回None"""
+        with self._condition:
+            while True:
+                if self._stopping:
+                    return None
+                    
+                while self._queue:
+                    _, _, job = heapq.heappop(self._queue)
+                    if job.generation != self._generation:
+                        continue
+                    del self._pending[job.key]
+                    self._running[job.key] = job.generation
+                    return job
+                    
+                self._condition.wait()
+                
+    def finish_job(self, job, page_image):
+        """工作线程完成任务"""
+        with self._condition:
+            if self._running.get(job.key) == job.generation:
+                del self._running[job.key]
+            stale = job.generation != self._generation or self._stopping
+            
+        if page_image is None or stale:
+            return
+        if job.tile is None:
+            self.pageRendered.emit(job.page_num, job.zoom_level, page_image)
+        else:
+            self.tileRendered.emit(job.page_num, job.zoom_level, job.tile, page_image)
+            
+    def queue_depth(self):
+        """获取待处理任务数"""
+        with self._condition:
+            return len(self._pending)
+            
+    def shutdown(self):
+        """停止所有工作线程"""
+        with self._condition:
+            self._stopping = True
+            self._queue.clear()
+            self._pending.clear()
+            self._condition.notify_all()
+            
+        for worker in self.workers:
+            worker.wait()
+        self.workers.clear()
+
@@ -0,0 +1,309 @@
+"""
+全文索引
+在后台逐页提取一次文本，建立带单词位置和边界框的倒排索引，
+并按文档标识以JSON持久化到磁盘，之后的搜索只需查询索引
+"""
+
+from array import array
+import json
+import os
+import re
+
+import fitz  # PyMuPDF
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+INDEX_VERSION = 2
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pdf_viewer", "text_index")
+DEFAULT_INDEX_MAX_BYTES = 256 * 1024 * 1024  # 索引目录的总大小上限
+
+
+# 索引能够回答的查询：由空白分隔的字母数字词；含标点的查询逐页调用page.search_for
+PLAIN_QUERY = re.compile(r'\w+(?:\s+\w+)*')
+
+
+def normalize_word(word):
+    """索引和查询使用的词形式（不区分大小写）"""
+    return word.lower()
+
+
+def get_index_path(index_dir, document_key):
+    """文档索引文件路径"""
+    return os.path.join(index_dir, document_key + ".json")
+
+
+def trim_index_dir(index_dir, max_bytes, keep=None):
+    """删除最久未使用的索引文件，直到索引总大小不超过max_bytes
+    
+    与磁盘缓存相同，以文件修改时间作为最近使用时间；keep为不删除的文件路径（刚保存的索引）
+    """
+    files = []
+    try:
+        names = os.listdir(index_dir)
+    except OSError:
+        return
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(index_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append((stat.st_mtime_ns, path, stat.st_size))
+        
+    total = sum(size for _, _, size in files)
+    for _, path, size in sorted(files):
+        if total <= max_bytes:
+            break
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def narrow_box(box, start, end, length):
+    """词的边界框中第start到end个字符的范围（按字符数估计，横排文字）"""
+    x0, y0, x1, y1 = box
+    width = (x1 - x0) / max(1, length)
+    return (x0 + width * start, y0, x0 + width * end, y1)
+
+
+class TextIndex:
+    """倒排索引：词 -> 出现位置 (页码, 页内词序号)
+    
+    每页保存词序列和对应的边界框，用于短语匹配和结果定位。
+    """
+    
+    def __init__(self, page_count):
+        self.page_count = page_count
+        self.page_words = [None] * page_count  # 每页的词（已规范化）
+        self.page_boxes = [None] * page_count  # 每页的边界框 array('f') [x0, y0, x1, y1, ...]
+        self.postings = {}  # 词 -> array('I') [页码, 词序号, 页码, 词序号, ...]
+        
+    def add_page(self, page_num, words):
+        """加入一页的词，words为page.get_text("words")的结果"""
+        terms = []
+        boxes = array('f')
+        for x0, y0, x1, y1, text, *_ in words:
+            terms.append(normalize_word(text))
+            boxes.extend((x0, y0, x1, y1))
+        self.page_words[page_num] = terms
+        self.page_boxes[page_num] = boxes
+        self._add_postings(page_num, terms)
+        
+    def _add_postings(self, page_num, terms):
+        """将一页的词加入倒排表"""
+        for position, term in enumerate(terms):
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = array('I')
+            postings.append(page_num)
+            postings.append(position)
+            
+    def is_complete(self):
+        """是否所有页面都已索引"""
+        return all(words is not None for words in self.page_words)
+        
+    def get_word_box(self, page_num, position):
+        """获取词的边界框 (x0, y0, x1, y1)"""
+        boxes = self.page_boxes[page_num]
+        return tuple(boxes[position * 4:position * 4 + 4])
+        
+    def can_search(self, query):
+        """查询是否可以由索引回答（结果与page.search_for一致）"""
+        return PLAIN_QUERY.fullmatch(query.strip()) is not None
+        
+    def search(self, query, page_num=None):
+        """搜索文本，结果格式与PDFDocument.search_text一致
+        
+        与page.search_for相同按子串匹配、不区分大小写：单个词可以出现在词的任意位置，
+        多个词组成短语时首词匹配词尾、末词匹配词首、中间的词完全匹配。
+        边界框只包含匹配到的字符，boxes为短语中各个词的匹配部分。
+        调用前应先用can_search检查查询，含标点的查询不保证与page.search_for一致。
+        """
+        tokens = [normalize_word(token) for token in query.split()]
+        if not tokens:
+            return []
+            
+        # 在词表中查找首词的候选词，再沿页内词序列验证后续的词
+        if len(tokens) == 1:
+            first_terms = [term for term in self.postings if tokens[0] in term]
+        else:
+            first_terms = [term for term in self.postings if term.endswith(tokens[0])]
+            
+        matches = []
+        for term in first_terms:
+            postings = self.postings[term]
+            for i in range(0, len(postings), 2):
+                match_page, position = postings[i], postings[i + 1]
+                if page_num is not None and match_page != page_num:
+                    continue
+                if len(tokens) == 1:
+                    matches.extend((match_page, position, start, end)
+                                   for start, end in self._find_all(term, tokens[0]))
+                elif self._match_rest(match_page, position, tokens):
+                    matches.append((match_page, position, len(term) - len(tokens[0]), len(term)))
+                    
+        results = []
+        for match_page, position, start, end in sorted(matches):
+            boxes = self._get_match_boxes(match_page, position, start, end, tokens)
+            bbox = fitz.Rect(
+                min(box[0] for box in boxes), min(box[1] for box in boxes),
+                max(box[2] for box in boxes), max(box[3] for box in boxes)
+            )
+            results.append({
+                'page': match_page,
+                'bbox': bbox,
+                'text': query,
+                'boxes': boxes
+            })
+        return results
+        
+    def _find_all(self, term, token):
+        """词中所有不重叠的匹配 (起, 止)；与page.search_for一样，首尾相接的匹配合并为一处"""
+        spans = []
+        start = term.find(token)
+        while start >= 0:
+            end = start + len(token)
+            if spans and spans[-1][1] == start:
+                spans[-1] = (spans[-1][0], end)
+            else:
+                spans.append((start, end))
+            start = term.find(token, end)
+        return spans
+        
+    def _get_match_boxes(self, page_num, position, start, end, tokens):
+        """短语中每个词匹配部分的边界框：首词为第start到end个字符，末词只取与查询对应的前缀"""
+        words = self.page_words[page_num]
+        boxes = [narrow_box(self.get_word_box(page_num, position), start, end, len(words[position]))]
+        for i in range(1, len(tokens)):
+            word = words[position + i]
+            word_end = len(tokens[i]) if i == len(tokens) - 1 else len(word)
+            boxes.append(narrow_box(self.get_word_box(page_num, position + i), 0, word_end, len(word)))
+        return boxes
+        
+    def _match_rest(self, page_num, position, tokens):
+        """验证短语中首词之后的词"""
+        words = self.page_words[page_num]
+        if position + len(tokens) > len(words):
+            return False
+        for i in range(1, len(tokens)):
+            word = words[position + i]
+            if i == len(tokens) - 1:
+                if not word.startswith(tokens[i]):
+                    return False
+            elif word != tokens[i]:
+                return False
+        return True
+        
+    def save(self, path, document_key):
+        """保存为JSON（只保存每页的词和边界框，倒排表在加载时重建）"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'document_key': document_key,
+                'page_count': self.page_count,
+                'page_words': self.page_words,
+                'page_boxes': [
+                    None if boxes is None else [round(value, 2) for value in boxes]
+                    for boxes in self.page_boxes
+                ]
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, path)
+        
+    @classmethod
+    def load(cls, path, page_count, document_key):
+        """从文件加载，文件不存在、已损坏或与文档不匹配时返回None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(data, dict) or data.get('version') != INDEX_VERSION
+                or data.get('document_key') != document_key
+                or data.get('page_count') != page_count):
+            return None
+            
+        page_words = data.get('page_words')
+        page_boxes = data.get('page_boxes')
+        if (not isinstance(page_words, list) or not isinstance(page_boxes, list)
+                or len(page_words) != page_count or len(page_boxes) != page_count):
+            return None
+            
+        index = cls(page_count)
+        for page_num, (terms, boxes) in enumerate(zip(page_words, page_boxes)):
+            if terms is None and boxes is None:
+                continue
+            try:
+                if len(boxes) != 4 * len(terms) or not all(isinstance(term, str) for term in terms):
+                    return None
+                index.page_boxes[page_num] = array('f', boxes)
+            except (TypeError, OverflowError):
+                return None
+            index.page_words[page_num] = terms
+            index._add_postings(page_num, terms)
+        return index
+
+
+class TextIndexBuilder(QThread):
+    """后台建立或加载文档的全文索引，使用独立的fitz.Document"""
+    
+    progress = pyqtSignal(int, int)  # 已索引页数, 总页数
+    indexReady = pyqtSignal(object)  # TextIndex
+    
+    def __init__(self, pdf_document, index_dir=DEFAULT_INDEX_DIR, max_bytes=DEFAULT_INDEX_MAX_BYTES):
+        super().__init__()
+        self.pdf_document = pdf_document
+        self.index_dir = index_dir
+        self.index_path = get_index_path(index_dir, pdf_document.document_key)
+        self.max_bytes = max_bytes
+        self._stopping = False
+        
+    def run(self):
+        """加载已保存的索引，没有时逐页提取文本建立索引并保存，超出上限时删除最久未使用的索引"""
+        page_count = self.pdf_document.get_page_count()
+        document_key = self.pdf_document.document_key
+        index = TextIndex.load(self.index_path, page_count, document_key)
+        if index is not None:
+            try:
+                os.utime(self.index_path)  # 记录最近使用时间
+            except OSError:
+                pass
+        else:
+            index = self.build_index(page_count)
+            if index is None:
+                return  # 已取消
+            try:
+                index.save(self.index_path, document_key)
+            except OSError as e:
+                print(f"保存文本索引失败: {e}")
+            trim_index_dir(self.index_dir, self.max_bytes, keep=self.index_path)
+                
+        self.progress.emit(page_count, page_count)
+        self.indexReady.emit(index)
+        
+    def build_index(self, page_count):
+        """逐页提取文本建立索引，取消时返回None"""
+        index = TextIndex(page_count)
+        doc = fitz.open(self.pdf_document.file_path)
+        try:
+            for page_num in range(page_count):
+                if self._stopping:
+                    return None
+                index.add_page(page_num, doc[page_num].get_text("words"))
+                if page_num % 50 == 0:
+                    self.progress.emit(page_num, page_count)
+        finally:
+            doc.close()
+        return index
+        
+    def stop(self):
+        """取消并等待线程结束"""
+        self._stopping = True
+        self.wait()
@@ -0,0 +1,208 @@
+"""
+缩略图面板
+基于QListView的虚拟化列表，只为可见的缩略图请求渲染；
+缩略图在低优先级后台线程中生成，使用独立的缩略图缓存
+"""
+
+import threading
+
+import fitz  # PyMuPDF
+from PyQt5.QtWidgets import QListView, QAbstractItemView
+from PyQt5.QtCore import (
+    Qt, QThread, QAbstractListModel, QModelIndex, QSize, QPoint, pyqtSignal
+)
+from PyQt5.QtGui import QPixmap, QColor
+
+
+class ThumbnailWorker(QThread):
+    """缩略图工作线程，持有独立的fitz.Document
+    
+    后请求的缩略图先处理（最近滚动到的位置优先），
+    滚动后通过retain丢弃已不可见的请求。
+    """
+    
+    thumbnailReady = pyqtSignal(int, object)  # 页码(0基), PageImage
+    
+    def __init__(self, pdf_document):
+        super().__init__()
+        self.pdf_document = pdf_document
+        self._requests = []  # 待处理的页码，末尾最先处理
+        self._stopping = False
+        self._condition = threading.Condition()
+        
+    def request(self, page_num):
+        """请求生成缩略图"""
+        with self._condition:
+            if page_num in self._requests:
+                self._requests.remove(page_num)
+            self._requests.append(page_num)
+            self._condition.notify()
+            
+    def retain(self, first_page, last_page):
+        """只保留指定范围内的请求"""
+        with self._condition:
+            self._requests = [p for p in self._requests if first_page <= p <= last_page]
+            
+    def run(self):
+        """处理缩略图请求直到停止"""
+        doc = fitz.open(self.pdf_document.file_path)
+        try:
+            while True:
+                with self._condition:
+                    while not self._requests and not self._stopping:
+                        self._condition.wait()
+                    if self._stopping:
+                        break
+                    page_num = self._requests.pop()
+                    
+                try:
+                    thumbnail = self.pdf_document.get_thumbnail(page_num, doc)
+                except Exception as e:
+                    print(f"生成缩略图失败 {page_num + 1}: {e}")
+                    continue
+                self.thumbnailReady.emit(page_num, thumbnail)
+        finally:
+            doc.close()
+            
+    def stop(self):
+        """停止工作线程"""
+        with self._condition:
+            self._stopping = True
+            self._requests.clear()
+            self._condition.notify_all()
+        self.wait()
+
+
+class ThumbnailModel(QAbstractListModel):
+    """缩略图列表模型，视图绘制到某一项时才请求生成其缩略图"""
+    
+    def __init__(self, pdf_document, worker):
+        super().__init__()
+        self.pdf_document = pdf_document
+        self.worker = worker
+        self.page_count = pdf_document.get_page_count()  # 视图频繁调用rowCount，不每次访问文档
+        self._placeholders = {}  # 尺寸 -> 占位图
+        worker.thumbnailReady.connect(self.on_thumbnail_ready)
+        
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.page_count
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+            
+        page_num = index.row()
+        if role == Qt.DisplayRole:
+            return str(page_num + 1)
+        if role == Qt.DecorationRole:
+            thumbnail = self.pdf_document.get_cached_thumbnail(page_num)
+            if thumbnail is None:
+                self.worker.request(page_num)
+                return self.get_placeholder(page_num)
+            return QPixmap.fromImage(thumbnail.image)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+        
+    def get_placeholder(self, page_num):
+        """缩略图生成前显示的空白页面"""
+        size = self.pdf_document.get_thumbnail_size(page_num)
+        placeholder = self._placeholders.get(size)
+        if placeholder is None:
+            placeholder = QPixmap(*size)
+            placeholder.fill(QColor("white"))
+            self._placeholders[size] = placeholder
+        return placeholder
+        
+    def on_thumbnail_ready(self, page_num, thumbnail):
+        """缩略图生成完成，通知视图重绘"""
+        if page_num < self.rowCount():
+            index = self.index(page_num)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class ThumbnailPanel(QListView):
+    """缩略图面板"""
+    
+    pageSelected = pyqtSignal(int)  # 点击的页码（1基）
+    thumbnailReady = pyqtSignal(int, object)  # 页码(0基), PageImage，缩略图已放入缓存
+    
+    def __init__(self):
+        super().__init__()
+        self.pdf_document = None
+        self.worker = None
+        self.thumbnail_model = None
+        
+        # 单列图标视图，所有项尺寸相同，只绘制可见项
+        self.setViewMode(QListView.IconMode)
+        self.setFlow(QListView.TopToBottom)
+        self.setWrapping(False)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setUniformItemSizes(True)
+        self.setSpacing(6)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setStyleSheet("QListView { background-color: #f0f0f0; }")
+        
+        self.clicked.connect(self.on_item_clicked)
+        self.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+        
+    def set_pdf_document(self, pdf_document):
+        """设置PDF文档"""
+        self.shutdown()
+        self.pdf_document = pdf_document
+        if pdf_document is None:
+            self.setModel(None)
+            return
+            
+        box_width, box_height = pdf_document.render_config.get_thumbnail_box()
+        self.setIconSize(QSize(box_width, box_height))
+        
+        self.worker = ThumbnailWorker(pdf_document)
+        self.thumbnail_model = ThumbnailModel(pdf_document, self.worker)
+        self.worker.thumbnailReady.connect(self.thumbnailReady)
+        self.setModel(self.thumbnail_model)
+        # 低优先级运行，不影响页面渲染
+        self.worker.start(QThread.LowPriority)
+        
+    def set_current_page(self, page_num):
+        """高亮当前页（1基）并滚动到可见位置"""
+        if self.thumbnail_model is None or not 1 <= page_num <= self.thumbnail_model.rowCount():
+            return
+        index = self.thumbnail_model.index(page_num - 1)
+        self.setCurrentIndex(index)
+        self.scrollTo(index, QAbstractItemView.EnsureVisible)
+        
+    def get_visible_rows(self):
+        """获取可见的项范围（闭区间），没有项时返回None"""
+        if self.thumbnail_model is None or self.thumbnail_model.rowCount() == 0:
+            return None
+        # 各项左对齐排成一列，取第一项的水平中心查询
+        x = self.visualRect(self.thumbnail_model.index(0)).center().x()
+        viewport = self.viewport().rect()
+        first = self.indexAt(QPoint(x, viewport.top() + 1))
+        last = self.indexAt(QPoint(x, viewport.bottom() - 1))
+        first_row = first.row() if first.isValid() else 0
+        last_row = last.row() if last.isValid() else self.thumbnail_model.rowCount() - 1
+        return first_row, last_row
+        
+    def on_scrolled(self):
+        """滚动后丢弃已不可见的缩略图请求"""
+        visible_rows = self.get_visible_rows()
+        if visible_rows and self.worker:
+            # 保留一屏的余量，避免来回滚动时重复请求
+            margin = visible_rows[1] - visible_rows[0] + 1
+            self.worker.retain(visible_rows[0] - margin, visible_rows[1] + margin)
+            
+    def on_item_clicked(self, index):
+        """点击缩略图跳转到对应页面"""
+        self.pageSelected.emit(index.row() + 1)
+        
+    def shutdown(self):
+        """停止缩略图工作线程"""
+        if self.worker:
+            self.worker.stop()
+            self.worker = None
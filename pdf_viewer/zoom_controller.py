@@ -0,0 +1,64 @@
+"""
+缩放控制器
+合并短时间内的连续缩放请求（Ctrl+滚轮、快捷键、缩放下拉框），
+每次请求立即发出预览信号，输入停止后只提交一次重新渲染
+"""
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+class ZoomController(QObject):
+    """缩放控制器"""
+    
+    zoomChanged = pyqtSignal(float, float)  # 目标缩放级别改变 (新级别, 原级别)，立即发出
+    zoomCommitted = pyqtSignal(float)  # 输入停止后发出，需要按该级别重新渲染（预览过时即使级别未变也发出）
+    
+    def __init__(self, zoom_level=1.0, min_zoom=0.1, max_zoom=5.0, delay=150, parent=None):
+        super().__init__(parent)
+        self.zoom_level = zoom_level  # 目标缩放级别
+        self.committed_zoom = zoom_level  # 最近一次提交渲染的缩放级别
+        self.previewed = False  # 上次提交后是否发出过预览
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        
+        # 每次请求重新计时，停止输入delay毫秒后提交
+        self.commit_timer = QTimer(self)
+        self.commit_timer.setSingleShot(True)
+        self.commit_timer.setInterval(delay)
+        self.commit_timer.timeout.connect(self.commit)
+        
+    def request_zoom(self, zoom_level):
+        """请求缩放到指定级别"""
+        zoom_level = max(self.min_zoom, min(zoom_level, self.max_zoom))
+        if zoom_level == self.zoom_level:
+            return
+            
+        previous_zoom = self.zoom_level
+        self.zoom_level = zoom_level
+        self.previewed = True
+        self.zoomChanged.emit(zoom_level, previous_zoom)
+        self.commit_timer.start()
+        
+    def zoom_by(self, factor):
+        """按比例缩放"""
+        self.request_zoom(self.zoom_level * factor)
+        
+    def commit(self):
+        """立即提交等待中的缩放"""
+        self.commit_timer.stop()
+        # 缩放后又回到已提交的级别时也要提交，让视图撤销预览并恢复渲染
+        if self.zoom_level != self.committed_zoom or self.previewed:
+            self.committed_zoom = self.zoom_level
+            self.previewed = False
+            self.zoomCommitted.emit(self.zoom_level)
+            
+    def reset(self, zoom_level):
+        """直接设置缩放级别并丢弃等待中的缩放（页面将按该级别重新加载时使用）"""
+        self.commit_timer.stop()
+        self.zoom_level = zoom_level
+        self.committed_zoom = zoom_level
+        self.previewed = False
+        
+    def is_pending(self):
+        """是否有尚未提交的缩放"""
+        return self.commit_timer.isActive()
@@ -0,0 +1,219 @@
+"""
+文档库搜索插件
+为一个目录树中的所有PDF建立全文索引，跨文档搜索并打开结果所在页面
+"""
+
+import sys
+import os
+import time
+
+# 添加父目录到路径以便导入插件接口
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_viewer.plugin_manager import PluginInterface
+from pdf_viewer.library_index import LibraryIndex, LibraryIndexer
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
+    QListWidget, QListWidgetItem, QLabel, QFileDialog
+)
+from PyQt5.QtCore import Qt, QThread
+
+
+class LibrarySearchDialog(QDialog):
+    """文档库搜索对话框"""
+    
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.library_index = LibraryIndex()
+        self.indexer = None
+        self.index_start = 0.0
+        self.init_ui()
+        
+        # 恢复上次的目录并在后台增量更新索引
+        root = self.library_index.get_meta('root')
+        if root and os.path.isdir(root):
+            self.root_input.setText(root)
+            self.update_index()
+            
+    def init_ui(self):
+        """初始化UI"""
+        self.setWindowTitle("文档库搜索")
+        self.setModal(False)
+        self.resize(600, 500)
+        
+        layout = QVBoxLayout(self)
+        
+        # 文档库目录
+        root_layout = QHBoxLayout()
+        self.root_input = QLineEdit()
+        self.root_input.setReadOnly(True)
+        self.root_input.setPlaceholderText("选择包含PDF文件的目录...")
+        
+        browse_button = QPushButton("选择目录...")
+        browse_button.clicked.connect(self.choose_root)
+        
+        self.index_button = QPushButton("更新索引")
+        self.index_button.clicked.connect(self.update_index)
+        
+        root_layout.addWidget(self.root_input)
+        root_layout.addWidget(browse_button)
+        root_layout.addWidget(self.index_button)
+        layout.addLayout(root_layout)
+        
+        self.status_label = QLabel("尚未选择目录")
+        layout.addWidget(self.status_label)
+        
+        # 搜索输入
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("输入要搜索的文本...")
+        self.search_input.returnPressed.connect(self.start_search)
+        
+        search_button = QPushButton("搜索")
+        search_button.clicked.connect(self.start_search)
+        
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(search_button)
+        layout.addLayout(search_layout)
+        
+        # 结果列表
+        self.results_label = QLabel("搜索结果:")
+        layout.addWidget(self.results_label)
+        
+        self.results_list = QListWidget()
+        self.results_list.setWordWrap(True)
+        self.results_list.itemDoubleClicked.connect(self.on_result_clicked)
+        layout.addWidget(self.results_list)
+        
+    def choose_root(self):
+        """选择文档库目录"""
+        root = QFileDialog.getExistingDirectory(self, "选择文档库目录", self.root_input.text())
+        if root:
+            self.root_input.setText(root)
+            self.library_index.set_meta('root', root)
+            self.update_index()
+            
+    def update_index(self):
+        """在后台增量更新当前目录的索引"""
+        root = self.root_input.text()
+        if not root:
+            return
+            
+        self.stop_indexer()
+        self.index_start = time.perf_counter()
+        self.status_label.setText("正在扫描目录...")
+        self.indexer = LibraryIndexer(root)
+        self.indexer.progress.connect(self.on_index_progress)
+        self.indexer.indexingFinished.connect(self.on_indexing_finished)
+        # 低优先级运行，不影响页面渲染
+        self.indexer.start(QThread.LowPriority)
+        self.index_button.setEnabled(False)
+        
+    def on_index_progress(self, done, total):
+        """显示索引进度"""
+        elapsed = time.perf_counter() - self.index_start
+        files_per_second = done / elapsed if elapsed > 0 else 0.0
+        self.status_label.setText(
+            f"正在索引: {done}/{total} 个文件（{files_per_second:.0f} 文件/秒），可以同时搜索已索引的文件"
+        )
+        
+    def on_indexing_finished(self, stats):
+        """索引更新完成"""
+        self.index_button.setEnabled(True)
+        elapsed = time.perf_counter() - self.index_start
+        totals = self.library_index.get_stats(self.root_input.text())
+        self.status_label.setText(
+            f"已索引 {totals['files']} 个文件、{totals['pages']} 页；"
+            f"本次更新 {stats['indexed_files']} 个文件，删除 {stats['removed_files']} 个，"
+            f"耗时 {elapsed:.1f} 秒"
+        )
+        
+    def stop_indexer(self):
+        """停止正在进行的索引"""
+        if self.indexer is not None:
+            self.indexer.progress.disconnect(self.on_index_progress)
+            self.indexer.indexingFinished.disconnect(self.on_indexing_finished)
+            self.indexer.stop()
+            self.indexer = None
+            self.index_button.setEnabled(True)
+            
+    def start_search(self):
+        """搜索文档库"""
+        query = self.search_input.text().strip()
+        root = self.root_input.text()
+        if not query or not root:
+            return
+            
+        start = time.perf_counter()
+        results = self.library_index.search(query, root)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        self.results_list.clear()
+        for result in results:
+            file_name = os.path.basename(result['path'])
+            item = QListWidgetItem(f"{file_name} - 页面 {result['page'] + 1}\n{result['snippet']}")
+            item.setToolTip(result['path'])
+            item.setData(Qt.UserRole, (result['path'], result['page'] + 1))
+            self.results_list.addItem(item)
+            
+        self.results_label.setText(
+            f"搜索 \"{query}\" 找到 {len(results)} 个结果（{elapsed_ms:.0f} ms）:"
+        )
+        
+    def on_result_clicked(self, item):
+        """打开结果所在的文件并跳转到对应页面"""
+        path, page_num = item.data(Qt.UserRole)
+        current_pdf = self.main_window.current_pdf
+        if current_pdf is None or os.path.abspath(current_pdf.file_path) != path:
+            self.main_window.open_pdf(path)
+        self.main_window.goto_page(page_num)
+        self.main_window.page_spinbox.setValue(page_num)
+        
+    def shutdown(self):
+        """停止后台索引并关闭数据库"""
+        self.stop_indexer()
+        self.library_index.close()
+
+
+class LibrarySearchPlugin(PluginInterface):
+    """文档库搜索插件"""
+    
+    @property
+    def name(self):
+        return "文档库搜索"
+        
+    @property
+    def version(self):
+        return "1.0.0"
+        
+    @property
+    def description(self):
+        return "为目录中的所有PDF建立全文索引并跨文档搜索"
+        
+    def initialize(self, main_window):
+        """初始化插件"""
+        self.main_window = main_window
+        self.search_dialog = None
+        
+        # 添加菜单项
+        library_action = main_window.plugins_menu.addAction("文档库搜索")
+        library_action.setShortcut("Ctrl+Shift+F")
+        library_action.triggered.connect(self.show_search_dialog)
+        
+        print(f"插件 {self.name} 初始化完成")
+        
+    def finalize(self):
+        """清理插件资源"""
+        if self.search_dialog is not None:
+            self.search_dialog.shutdown()
+            self.search_dialog.close()
+        print(f"插件 {self.name} 已清理")
+        
+    def show_search_dialog(self):
+        """显示文档库搜索对话框（首次打开时创建，开始后台索引）"""
+        if self.search_dialog is None:
+            self.search_dialog = LibrarySearchDialog(self.main_window)
+        self.search_dialog.show()
+        self.search_dialog.raise_()
+        self.search_dialog.activateWindow()
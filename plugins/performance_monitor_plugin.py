@@ -0,0 +1,219 @@
+"""
+性能监视插件
+实时显示渲染耗时、缓存命中率、渲染队列长度、翻页预取命中率和内存占用，
+并可将各阶段的耗时直方图导出为JSON
+"""
+
+import sys
+import os
+
+# 添加父目录到路径以便导入插件接口
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_viewer.plugin_manager import PluginInterface
+from pdf_viewer.perf_stats import perf_stats
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QPushButton, QLabel,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from PyQt5.QtCore import Qt, QTimer
+
+
+# 刷新间隔（毫秒）
+REFRESH_INTERVAL = 500
+
+# 表格中显示的统计列
+STAT_COLUMNS = [
+    ("次数", 'count'), ("最近平均", 'recent_ms'), ("平均", 'mean_ms'),
+    ("P50", 'p50_ms'), ("P90", 'p90_ms'), ("最大", 'max_ms')
+]
+
+
+class PerformanceMonitorDialog(QDialog):
+    """性能监视对话框，显示时定时刷新"""
+    
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.init_ui()
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+        
+    def init_ui(self):
+        """初始化UI"""
+        self.setWindowTitle("性能监视")
+        self.setModal(False)
+        self.resize(640, 480)
+        
+        layout = QVBoxLayout(self)
+        
+        # 实时概览
+        summary_layout = QFormLayout()
+        self.render_label = QLabel("-")
+        summary_layout.addRow("渲染耗时:", self.render_label)
+        self.cache_label = QLabel("-")
+        summary_layout.addRow("缓存命中率:", self.cache_label)
+        self.queue_label = QLabel("-")
+        summary_layout.addRow("渲染队列:", self.queue_label)
+        self.prefetch_label = QLabel("-")
+        summary_layout.addRow("翻页预取:", self.prefetch_label)
+        self.memory_label = QLabel("-")
+        summary_layout.addRow("内存占用:", self.memory_label)
+        layout.addLayout(summary_layout)
+        
+        # 各阶段耗时（毫秒）
+        self.stats_table = QTableWidget(0, len(STAT_COLUMNS))
+        self.stats_table.setHorizontalHeaderLabels([title for title, _ in STAT_COLUMNS])
+        self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.stats_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.stats_table)
+        
+        # 按钮
+        button_layout = QHBoxLayout()
+        reset_button = QPushButton("重置统计")
+        reset_button.clicked.connect(self.reset_stats)
+        export_button = QPushButton("导出JSON...")
+        export_button.clicked.connect(self.export_stats)
+        close_button = QPushButton("关闭")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(reset_button)
+        button_layout.addWidget(export_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        
+    def showEvent(self, event):
+        """显示时开始刷新"""
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+        
+    def hideEvent(self, event):
+        """隐藏时停止刷新"""
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+        
+    def refresh(self):
+        """刷新概览和统计表"""
+        render = perf_stats.get_summary('render_page')
+        if render is not None:
+            self.render_label.setText(
+                f"{render['recent_ms']:.1f} ms/页（最近），平均 {render['mean_ms']:.1f} ms，"
+                f"共 {render['count']} 页"
+            )
+            
+        current_pdf = self.main_window.current_pdf
+        if current_pdf is not None:
+            stats = current_pdf.page_cache.get_stats()
+            tile_stats = current_pdf.tile_cache.get_stats()
+            self.cache_label.setText(
+                f"页面 {stats['hit_rate']:.0%}（命中 {stats['hits']} / 未命中 {stats['misses']}），"
+                f"图块 {tile_stats['hit_rate']:.0%}"
+            )
+            
+        render_scheduler = self.main_window.pdf_viewer.render_scheduler
+        self.queue_label.setText(
+            f"{render_scheduler.queue_depth()} 个待渲染" if render_scheduler else "-"
+        )
+        
+        prefetch = self.main_window.pdf_viewer.get_prefetch_stats()
+        if prefetch is not None:
+            direction = "向后" if prefetch['direction'] > 0 else "向前"
+            self.prefetch_label.setText(
+                f"命中率 {prefetch['hit_rate']:.0%}（命中 {prefetch['hits']} / 未命中 {prefetch['misses']}），"
+                f"{direction}预取 {prefetch['lookahead']} 页，{prefetch['speed']:.1f} 页/秒"
+            )
+            
+        usage = self.main_window.pdf_viewer.get_memory_usage()
+        self.memory_label.setText(
+            f"{usage['used'] / 1024 / 1024:.1f} / {usage['max'] / 1024 / 1024:.0f} MB"
+            f"（标签图像 {usage['pixmaps'] / 1024 / 1024:.1f} MB，缓存 {usage['caches'] / 1024 / 1024:.1f} MB）"
+        )
+        
+        self.update_table(perf_stats.snapshot())
+        
+    def update_table(self, histograms):
+        """更新各阶段的统计"""
+        self.stats_table.setRowCount(len(histograms))
+        self.stats_table.setVerticalHeaderLabels(list(histograms))
+        for row, name in enumerate(histograms):
+            summary = perf_stats.get_summary(name)
+            if summary is None:
+                continue
+            for column, (_, key) in enumerate(STAT_COLUMNS):
+                value = summary[key]
+                text = str(value) if key == 'count' else f"{value:.2f}"
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.stats_table.setItem(row, column, item)
+                
+    def reset_stats(self):
+        """清空统计"""
+        perf_stats.reset()
+        self.refresh()
+        
+    def export_stats(self):
+        """导出直方图和当前的缓存、内存统计"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出性能统计", "perf_stats.json", "JSON文件 (*.json)"
+        )
+        if not file_path:
+            return
+            
+        extra = {
+            'memory': self.main_window.pdf_viewer.get_memory_usage(),
+            'prefetch': self.main_window.pdf_viewer.get_prefetch_stats()
+        }
+        current_pdf = self.main_window.current_pdf
+        if current_pdf is not None:
+            extra['file'] = current_pdf.file_path
+            extra['page_cache'] = current_pdf.page_cache.get_stats()
+            extra['tile_cache'] = current_pdf.tile_cache.get_stats()
+        try:
+            perf_stats.export_json(file_path, extra)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"无法导出性能统计:\n{e}")
+
+
+class PerformanceMonitorPlugin(PluginInterface):
+    """性能监视插件"""
+    
+    @property
+    def name(self):
+        return "性能监视"
+        
+    @property
+    def version(self):
+        return "1.0.0"
+        
+    @property
+    def description(self):
+        return "实时显示渲染耗时、缓存命中率、渲染队列和内存占用，导出耗时直方图"
+        
+    def initialize(self, main_window):
+        """初始化插件"""
+        self.main_window = main_window
+        self.monitor_dialog = None
+        
+        # 添加菜单项
+        monitor_action = main_window.plugins_menu.addAction("性能监视")
+        monitor_action.setShortcut("Ctrl+Shift+P")
+        monitor_action.triggered.connect(self.show_monitor_dialog)
+        
+        print(f"插件 {self.name} 初始化完成")
+        
+    def finalize(self):
+        """清理插件资源"""
+        if self.monitor_dialog is not None:
+            self.monitor_dialog.close()
+        print(f"插件 {self.name} 已清理")
+        
+    def show_monitor_dialog(self):
+        """显示性能监视对话框"""
+        if self.monitor_dialog is None:
+            self.monitor_dialog = PerformanceMonitorDialog(self.main_window)
+        self.monitor_dialog.show()
+        self.monitor_dialog.raise_()
+        self.monitor_dialog.activateWindow()
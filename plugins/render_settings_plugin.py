@@ -89,6 +89,14 @@ class RenderSettingsDialog(QDialog):
         self.max_dpi_spin.setSuffix(" DPI")
         dpi_layout.addRow("最大DPI:", self.max_dpi_spin)
         
+        self.supersample_cb = QCheckBox("超采样（按上述DPI渲染后缩小到屏幕尺寸）")
+        self.supersample_cb.setChecked(False)
+        self.supersample_cb.toggled.connect(self.default_dpi_spin.setEnabled)
+        self.supersample_cb.toggled.connect(self.max_dpi_spin.setEnabled)
+        self.default_dpi_spin.setEnabled(False)
+        self.max_dpi_spin.setEnabled(False)
+        dpi_layout.addRow(self.supersample_cb)
+        
         layout.addWidget(dpi_group)
         
         # 抗锯齿设置组
@@ -117,6 +125,16 @@ class RenderSettingsDialog(QDialog):
         self.scale_smooth_cb.setChecked(True)
         zoom_layout.addRow("缩放选项:", self.scale_smooth_cb)
         
+        self.zoom_snapping_cb = QCheckBox("缩放分桶（按量化的缩放级别渲染，缩放时复用缓存）")
+        self.zoom_snapping_cb.setChecked(True)
+        zoom_layout.addRow("", self.zoom_snapping_cb)
+        
+        self.fit_policy_combo = QComboBox()
+        self.fit_policy_combo.addItem("按当前页面", 'page')
+        self.fit_policy_combo.addItem("按最宽的页面", 'max_width')
+        self.fit_policy_combo.setToolTip("页面大小不一的文档中，适合宽度/适合页面以哪一页为准")
+        zoom_layout.addRow("适合宽度/页面:", self.fit_policy_combo)
+        
         layout.addWidget(zoom_group)
         
         layout.addStretch()
@@ -141,6 +159,40 @@ class RenderSettingsDialog(QDialog):
         self.max_cache_spin.setSuffix(" 页")
         cache_layout.addRow("最大缓存:", self.max_cache_spin)
         
+        self.max_cache_memory_spin = QSpinBox()
+        self.max_cache_memory_spin.setRange(32, 4096)
+        self.max_cache_memory_spin.setValue(256)
+        self.max_cache_memory_spin.setSuffix(" MB")
+        cache_layout.addRow("缓存内存上限:", self.max_cache_memory_spin)
+        
+        self.cache_stats_label = QLabel("-")
+        cache_layout.addRow("缓存命中率:", self.cache_stats_label)
+        
+        self.max_memory_spin = QSpinBox()
+        self.max_memory_spin.setRange(64, 16384)
+        self.max_memory_spin.setValue(512)
+        self.max_memory_spin.setSuffix(" MB")
+        cache_layout.addRow("内存预算:", self.max_memory_spin)
+        
+        self.memory_usage_label = QLabel("-")
+        cache_layout.addRow("内存占用:", self.memory_usage_label)
+        
+        self.disk_cache_cb = QCheckBox("启用磁盘缓存（跨会话复用渲染结果）")
+        self.disk_cache_cb.setChecked(False)
+        cache_layout.addRow("磁盘缓存:", self.disk_cache_cb)
+        
+        self.max_disk_cache_spin = QSpinBox()
+        self.max_disk_cache_spin.setRange(64, 65536)
+        self.max_disk_cache_spin.setValue(1024)
+        self.max_disk_cache_spin.setSuffix(" MB")
+        self.disk_cache_cb.toggled.connect(self.max_disk_cache_spin.setEnabled)
+        self.max_disk_cache_spin.setEnabled(self.disk_cache_cb.isChecked())
+        cache_layout.addRow("磁盘缓存上限:", self.max_disk_cache_spin)
+        
+        self.clear_disk_cache_btn = QPushButton("清空磁盘缓存")
+        self.clear_disk_cache_btn.clicked.connect(self.clear_disk_cache)
+        cache_layout.addRow("", self.clear_disk_cache_btn)
+        
         layout.addWidget(cache_group)
         
         # 加载设置组
@@ -151,6 +203,27 @@ class RenderSettingsDialog(QDialog):
         self.lazy_loading_cb.setChecked(False)
         loading_layout.addWidget(self.lazy_loading_cb)
         
+        preload_layout = QFormLayout()
+        self.preload_pages_spin = QSpinBox()
+        self.preload_pages_spin.setRange(0, 10)
+        self.preload_pages_spin.setValue(2)
+        self.preload_pages_spin.setSuffix(" 页")
+        preload_layout.addRow("预渲染页数:", self.preload_pages_spin)
+        
+        self.release_distance_spin = QSpinBox()
+        self.release_distance_spin.setRange(1, 50)
+        self.release_distance_spin.setValue(6)
+        self.release_distance_spin.setSuffix(" 页")
+        preload_layout.addRow("释放距离:", self.release_distance_spin)
+        
+        self.prefetch_pages_spin = QSpinBox()
+        self.prefetch_pages_spin.setRange(0, 10)
+        self.prefetch_pages_spin.setValue(3)
+        self.prefetch_pages_spin.setSuffix(" 页")
+        self.prefetch_pages_spin.setToolTip("单页模式下沿阅读方向预先渲染的最多页数，0为关闭")
+        preload_layout.addRow("翻页预取:", self.prefetch_pages_spin)
+        loading_layout.addLayout(preload_layout)
+        
         layout.addWidget(loading_group)
         
         # 显示设置组
@@ -178,6 +251,7 @@ class RenderSettingsDialog(QDialog):
             # 加载DPI设置
             self.default_dpi_spin.setValue(config.default_dpi)
             self.max_dpi_spin.setValue(config.max_dpi)
+            self.supersample_cb.setChecked(config.supersample)
             
             # 加载抗锯齿设置
             self.use_antialiasing_cb.setChecked(config.use_antialiasing)
@@ -186,12 +260,36 @@ class RenderSettingsDialog(QDialog):
             
             # 加载其他设置
             self.scale_smooth_cb.setChecked(config.scale_smooth)
+            self.zoom_snapping_cb.setChecked(config.zoom_snapping)
+            self.fit_policy_combo.setCurrentIndex(max(0, self.fit_policy_combo.findData(config.fit_policy)))
             self.cache_pages_cb.setChecked(config.cache_pages)
             self.max_cache_spin.setValue(config.max_cache_size)
+            self.max_cache_memory_spin.setValue(config.max_cache_memory)
+            self.max_memory_spin.setValue(config.max_memory)
+            self.disk_cache_cb.setChecked(config.disk_cache)
+            self.max_disk_cache_spin.setValue(config.max_disk_cache_size)
             self.lazy_loading_cb.setChecked(config.lazy_loading)
+            self.preload_pages_spin.setValue(config.preload_pages)
+            self.release_distance_spin.setValue(config.release_distance)
+            self.prefetch_pages_spin.setValue(config.prefetch_pages)
             self.page_shadow_cb.setChecked(config.page_shadow)
             self.page_border_cb.setChecked(config.page_border)
             
+            # 显示缓存统计
+            stats = self.main_window.current_pdf.page_cache.get_stats()
+            self.cache_stats_label.setText(
+                f"{stats['hit_rate']:.0%} (命中 {stats['hits']} / 未命中 {stats['misses']}, "
+                f"{stats['pages']} 页, {stats['bytes'] / 1024 / 1024:.1f} MB)"
+            )
+            
+            # 显示内存预算的使用情况
+            usage = self.main_window.pdf_viewer.get_memory_usage()
+            self.memory_usage_label.setText(
+                f"{usage['used'] / 1024 / 1024:.1f} / {usage['max'] / 1024 / 1024:.0f} MB "
+                f"(页面 {usage['pages'] / 1024 / 1024:.1f} MB, 图块 {usage['tiles'] / 1024 / 1024:.1f} MB, "
+                f"缩略图 {usage['thumbnails'] / 1024 / 1024:.1f} MB, 已释放 {usage['evictions']} 次)"
+            )
+            
     def apply_settings(self):
         """应用设置"""
         if hasattr(self.main_window, 'current_pdf') and self.main_window.current_pdf:
@@ -200,6 +298,7 @@ class RenderSettingsDialog(QDialog):
             # 应用DPI设置
             config.default_dpi = self.default_dpi_spin.value()
             config.max_dpi = self.max_dpi_spin.value()
+            config.supersample = self.supersample_cb.isChecked()
             
             # 应用抗锯齿设置
             config.use_antialiasing = self.use_antialiasing_cb.isChecked()
@@ -208,30 +307,58 @@ class RenderSettingsDialog(QDialog):
             
             # 应用其他设置
             config.scale_smooth = self.scale_smooth_cb.isChecked()
+            config.zoom_snapping = self.zoom_snapping_cb.isChecked()
+            config.fit_policy = self.fit_policy_combo.currentData()
             config.cache_pages = self.cache_pages_cb.isChecked()
             config.max_cache_size = self.max_cache_spin.value()
+            config.max_cache_memory = self.max_cache_memory_spin.value()
+            config.max_memory = self.max_memory_spin.value()
+            config.disk_cache = self.disk_cache_cb.isChecked()
+            config.max_disk_cache_size = self.max_disk_cache_spin.value()
             config.lazy_loading = self.lazy_loading_cb.isChecked()
+            config.preload_pages = self.preload_pages_spin.value()
+            config.release_distance = max(self.release_distance_spin.value(),
+                                          config.preload_pages)
+            config.prefetch_pages = self.prefetch_pages_spin.value()
             config.page_shadow = self.page_shadow_cb.isChecked()
             config.page_border = self.page_border_cb.isChecked()
             
-            # 重新渲染当前页面
-            self.main_window.display_page()
+            # 清除缓存并重新渲染当前页面
+            self.main_window.on_render_settings_changed()
             
             QMessageBox.information(self, "成功", "渲染设置已应用，页面将重新渲染。")
         else:
             QMessageBox.warning(self, "警告", "请先打开PDF文件再调整设置。")
             
+    def clear_disk_cache(self):
+        """清空磁盘缓存"""
+        if hasattr(self.main_window, 'current_pdf') and self.main_window.current_pdf:
+            disk_cache = self.main_window.current_pdf.disk_cache
+            if disk_cache is not None:
+                disk_cache.clear()
+                QMessageBox.information(self, "成功", "磁盘缓存已清空。")
+                
     def reset_settings(self):
         """重置为默认设置"""
         self.default_dpi_spin.setValue(150)
         self.max_dpi_spin.setValue(300)
+        self.supersample_cb.setChecked(False)
         self.use_antialiasing_cb.setChecked(True)
         self.use_text_antialiasing_cb.setChecked(True)
         self.use_high_quality_cb.setChecked(True)
         self.scale_smooth_cb.setChecked(True)
+        self.zoom_snapping_cb.setChecked(True)
+        self.fit_policy_combo.setCurrentIndex(0)
         self.cache_pages_cb.setChecked(True)
         self.max_cache_spin.setValue(50)
+        self.max_cache_memory_spin.setValue(256)
+        self.max_memory_spin.setValue(512)
+        self.disk_cache_cb.setChecked(False)
+        self.max_disk_cache_spin.setValue(1024)
         self.lazy_loading_cb.setChecked(False)
+        self.preload_pages_spin.setValue(2)
+        self.release_distance_spin.setValue(6)
+        self.prefetch_pages_spin.setValue(3)
         self.page_shadow_cb.setChecked(True)
         self.page_border_cb.setChecked(True)
 
@@ -272,6 +399,7 @@ class RenderSettingsPlugin(PluginInterface):
         
     def show_settings_dialog(self):
         """显示设置对话框"""
+        self.settings_dialog.load_current_settings()
         self.settings_dialog.show()
         self.settings_dialog.raise_()
         self.settings_dialog.activateWindow()
@@ -5,38 +5,105 @@
 
 import sys
 import os
+import re
+import time
 
 # 添加父目录到路径以便导入插件接口
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from pdf_viewer.plugin_manager import PluginInterface
+from pdf_viewer.perf_stats import perf_stats
+from pdf_viewer.parallel_search import (
+    ParallelSearchEngine, compile_pattern, search_page, to_rect_results
+)
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
-    QListWidget, QListWidgetItem, QLabel, QMessageBox
+    QListWidget, QListWidgetItem, QLabel, QMessageBox, QCheckBox
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
+import fitz  # PyMuPDF
+
+
+# 超过该页数且有多个CPU核心时，没有全文索引可用的搜索使用多进程
+PARALLEL_SEARCH_MIN_PAGES = 200
 
 
 class SearchThread(QThread):
-    """搜索线程"""
-    result_found = pyqtSignal(dict)
+    """搜索线程，逐页产生结果，可随时取消"""
+    results_found = pyqtSignal(list)  # 一页的搜索结果
+    progress = pyqtSignal(int, int, float)  # 已搜索页数, 总页数, 页/秒
     search_finished = pyqtSignal()
     
-    def __init__(self, pdf_document, query):
+    def __init__(self, pdf_document, query, case_sensitive=False, whole_word=False, regex=False,
+                 search_engine=None):
         super().__init__()
         self.pdf_document = pdf_document
+        self.search_engine = search_engine  # 多进程搜索使用的引擎，为None时临时创建
         self.query = query
+        self.options = {'case_sensitive': case_sensitive, 'whole_word': whole_word, 'regex': regex}
+        self.method = self.choose_method()
+        self._cancelled = False
+        
+    def choose_method(self):
+        """选择搜索方式：全文索引、多进程或逐页扫描"""
+        if not any(self.options.values()) and self.pdf_document.can_use_text_index(self.query):
+            return "全文索引"
+        if (self.pdf_document.get_page_count() >= PARALLEL_SEARCH_MIN_PAGES
+                and (os.cpu_count() or 1) > 1):
+            return "多进程"
+        return "逐页扫描"
         
+    def cancel(self):
+        """取消搜索（在当前页处理完后停止）"""
+        self._cancelled = True
+        
+    def iter_results(self, doc):
+        """按页码顺序产生 (页码, 结果列表)"""
+        if self.method == "全文索引":
+            yield from self.pdf_document.iter_search_text(self.query, doc)
+        elif self.method == "多进程":
+            if self.search_engine is not None:
+                yield from self.search_engine.search(self.query, **self.options)
+            else:
+                with ParallelSearchEngine(self.pdf_document.file_path) as engine:
+                    yield from engine.search(self.query, **self.options)
+        else:
+            for page in doc:
+                with perf_stats.measure('search_page'):
+                    results = to_rect_results(search_page(page, self.query, **self.options))
+                yield page.number, results
+                
     def run(self):
         """执行搜索"""
+        # 使用独立的文档对象，不与渲染线程争用
+        doc = fitz.open(self.pdf_document.file_path)
+        results_iter = self.iter_results(doc)
         try:
-            results = self.pdf_document.search_text(self.query)
-            for result in results:
-                self.result_found.emit(result)
+            total = len(doc)
+            start = last_report = time.perf_counter()
+            for page_num, results in results_iter:
+                if self._cancelled:
+                    return
+                if results:
+                    self.results_found.emit(results)
+                    
+                # 每100毫秒报告一次进度
+                now = time.perf_counter()
+                if now - last_report >= 0.1:
+                    last_report = now
+                    self.progress.emit(page_num + 1, total, (page_num + 1) / (now - start))
+                    
+            elapsed = time.perf_counter() - start
+            perf_stats.record('search', elapsed * 1000)
+            self.progress.emit(total, total, total / elapsed if elapsed > 0 else 0.0)
             self.search_finished.emit()
         except Exception as e:
             print(f"搜索错误: {e}")
             self.search_finished.emit()
+        finally:
+            # 关闭生成器，多进程搜索时放弃已提交的任务（工作进程留给下一次搜索）
+            results_iter.close()
+            doc.close()
 
 
 class SearchDialog(QDialog):
@@ -48,6 +115,10 @@ class SearchDialog(QDialog):
         super().__init__(main_window)
         self.main_window = main_window
         self.search_thread = None
+        # 当前文档的多进程搜索引擎，多次搜索共用一个进程池，切换文档或清理插件时关闭
+        self.search_engine = None
+        self.search_start = 0.0
+        self.pages_per_second = 0.0
         self.init_ui()
         
     def init_ui(self):
@@ -67,14 +138,43 @@ class SearchDialog(QDialog):
         self.search_button = QPushButton("搜索")
         self.search_button.clicked.connect(self.start_search)
         
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_search)
+        
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(self.search_button)
+        search_layout.addWidget(self.cancel_button)
         layout.addLayout(search_layout)
         
+        # 搜索选项
+        options_layout = QHBoxLayout()
+        self.case_sensitive_cb = QCheckBox("区分大小写")
+        self.whole_word_cb = QCheckBox("全字匹配")
+        self.regex_cb = QCheckBox("正则表达式")
+        options_layout.addWidget(self.case_sensitive_cb)
+        options_layout.addWidget(self.whole_word_cb)
+        options_layout.addWidget(self.regex_cb)
+        options_layout.addStretch()
+        layout.addLayout(options_layout)
+        
         # 结果列表
         self.results_label = QLabel("搜索结果:")
         layout.addWidget(self.results_label)
         
+        # 结果导航
+        navigation_layout = QHBoxLayout()
+        self.prev_button = QPushButton("上一个")
+        self.prev_button.clicked.connect(self.prev_hit)
+        self.next_button = QPushButton("下一个")
+        self.next_button.clicked.connect(self.next_hit)
+        self.hit_label = QLabel("")
+        navigation_layout.addWidget(self.prev_button)
+        navigation_layout.addWidget(self.next_button)
+        navigation_layout.addWidget(self.hit_label)
+        navigation_layout.addStretch()
+        layout.addLayout(navigation_layout)
+        
         self.results_list = QListWidget()
         self.results_list.itemDoubleClicked.connect(self.on_result_clicked)
         layout.addWidget(self.results_list)
@@ -89,36 +189,136 @@ class SearchDialog(QDialog):
             QMessageBox.warning(self, "警告", "请先打开PDF文件")
             return
             
-        # 清空之前的结果
+        options = {
+            'case_sensitive': self.case_sensitive_cb.isChecked(),
+            'whole_word': self.whole_word_cb.isChecked(),
+            'regex': self.regex_cb.isChecked()
+        }
+        try:
+            compile_pattern(query, **options)
+        except re.error as e:
+            QMessageBox.warning(self, "警告", f"无效的正则表达式: {e}")
+            return
+            
+        # 取消上一次搜索并清空结果
+        self.cancel_search()
         self.results_list.clear()
+        self.hit_label.setText("")
+        self.main_window.pdf_viewer.clear_search_hits()
         self.results_label.setText(f"搜索 \"{query}\" 中...")
         
-        # 启动搜索线程
-        self.search_thread = SearchThread(self.main_window.current_pdf, query)
-        self.search_thread.result_found.connect(self.add_result)
+        # 启动搜索线程（全文索引可用时直接查询索引，大文档使用多进程）
+        self.search_start = time.perf_counter()
+        self.pages_per_second = 0.0
+        pdf_document = self.main_window.current_pdf
+        self.search_thread = SearchThread(pdf_document, query, **options,
+                                          search_engine=self.get_search_engine(pdf_document))
+        self.search_thread.results_found.connect(self.add_results)
+        self.search_thread.progress.connect(self.update_progress)
         self.search_thread.search_finished.connect(self.search_completed)
         self.search_thread.start()
+        self.cancel_button.setEnabled(True)
         
-    def add_result(self, result):
-        """添加搜索结果"""
-        page_num = result['page'] + 1  # 转换为1基索引
-        text = f"页面 {page_num}: {result['text']}"
+    def get_search_engine(self, pdf_document):
+        """获取当前文档的多进程搜索引擎（进程池在第一次多进程搜索时才启动）"""
+        if self.search_engine is not None and self.search_engine.file_path != pdf_document.file_path:
+            self.close_search_engine()
+        if self.search_engine is None:
+            self.search_engine = ParallelSearchEngine(pdf_document.file_path)
+        return self.search_engine
         
-        item = QListWidgetItem(text)
-        item.setData(Qt.UserRole, page_num)
-        self.results_list.addItem(item)
+    def close_search_engine(self):
+        """关闭多进程搜索引擎（先取消使用它的搜索）"""
+        self.cancel_search()
+        if self.search_engine is not None:
+            self.search_engine.close()
+            self.search_engine = None
+            
+    def on_document_opened(self, pdf_document):
+        """打开了新文档：旧文档的搜索和进程池不再需要"""
+        self.close_search_engine()
+        
+    def cancel_search(self):
+        """取消正在进行的搜索，已显示的结果保留"""
+        if self.search_thread is None:
+            return
+            
+        thread = self.search_thread
+        self.search_thread = None
+        cancelled = thread.isRunning()
+        thread.results_found.disconnect(self.add_results)
+        thread.progress.disconnect(self.update_progress)
+        thread.search_finished.disconnect(self.search_completed)
+        thread.cancel()
+        thread.wait()
+        
+        self.cancel_button.setEnabled(False)
+        if cancelled:
+            self.results_label.setText(f"搜索已取消，已找到 {self.results_list.count()} 个结果:")
+            
+    def add_results(self, results):
+        """添加一页的搜索结果，并在页面上高亮"""
+        self.main_window.pdf_viewer.add_search_hits(results)
+        for result in results:
+            page_num = result['page'] + 1  # 转换为1基索引
+            text = f"页面 {page_num}: {result['text']}"
+            
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, page_num)
+            self.results_list.addItem(item)
+            
+    def update_progress(self, searched_pages, total_pages, pages_per_second):
+        """更新搜索进度"""
+        self.pages_per_second = pages_per_second
+        query = self.search_input.text().strip()
+        self.results_label.setText(
+            f"搜索 \"{query}\" 中... {searched_pages}/{total_pages} 页"
+            f"（{pages_per_second:.0f} 页/秒），已找到 {self.results_list.count()} 个结果"
+        )
         
     def search_completed(self):
         """搜索完成"""
+        self.cancel_button.setEnabled(False)
         count = self.results_list.count()
         query = self.search_input.text().strip()
-        self.results_label.setText(f"搜索 \"{query}\" 完成，找到 {count} 个结果:")
+        elapsed_ms = (time.perf_counter() - self.search_start) * 1000
+        method = self.search_thread.method if self.search_thread else ""
+        self.results_label.setText(
+            f"搜索 \"{query}\" 完成，找到 {count} 个结果"
+            f"（{method}，{elapsed_ms:.0f} ms，{self.pages_per_second:.0f} 页/秒）:"
+        )
         
     def on_result_clicked(self, item):
         """结果项被点击"""
-        page_num = item.data(Qt.UserRole)
-        if page_num:
+        self.show_hit(self.results_list.row(item))
+        
+    def show_hit(self, index):
+        """定位到第index个结果（结果列表与查看器中的高亮顺序一致）"""
+        pdf_viewer = self.main_window.pdf_viewer
+        if not pdf_viewer.search_hits:
+            return
+        index %= len(pdf_viewer.search_hits)
+        
+        # 单页模式下先切换到结果所在页面，连续模式直接滚动
+        page_num = pdf_viewer.search_hits[index]['page'] + 1
+        if not pdf_viewer.continuous_mode and self.main_window.current_page != page_num:
             self.goto_page.emit(page_num)
+        pdf_viewer.goto_hit(index)
+        
+    def next_hit(self):
+        """下一个结果"""
+        self.show_hit(self.main_window.pdf_viewer.current_hit + 1)
+        
+    def prev_hit(self):
+        """上一个结果"""
+        current_hit = self.main_window.pdf_viewer.current_hit
+        self.show_hit(current_hit - 1 if current_hit >= 0 else -1)
+        
+    def on_current_hit_changed(self, index, total):
+        """查看器中的当前结果改变"""
+        self.hit_label.setText(f"{index + 1}/{total}")
+        if index < self.results_list.count():
+            self.results_list.setCurrentRow(index)
 
 
 class TextSearchPlugin(PluginInterface):
@@ -143,17 +343,32 @@ class TextSearchPlugin(PluginInterface):
         # 创建搜索对话框
         self.search_dialog = SearchDialog(main_window)
         self.search_dialog.goto_page.connect(self.goto_page)
+        main_window.pdf_viewer.currentHitChanged.connect(self.search_dialog.on_current_hit_changed)
+        main_window.documentOpened.connect(self.search_dialog.on_document_opened)
         
         # 添加菜单项
         search_action = main_window.plugins_menu.addAction("文本搜索")
         search_action.setShortcut("Ctrl+F")
         search_action.triggered.connect(self.show_search_dialog)
         
+        next_hit_action = main_window.plugins_menu.addAction("下一个搜索结果")
+        next_hit_action.setShortcut("F3")
+        next_hit_action.triggered.connect(self.search_dialog.next_hit)
+        
+        prev_hit_action = main_window.plugins_menu.addAction("上一个搜索结果")
+        prev_hit_action.setShortcut("Shift+F3")
+        prev_hit_action.triggered.connect(self.search_dialog.prev_hit)
+        
         print(f"插件 {self.name} 初始化完成")
         
     def finalize(self):
         """清理插件资源"""
         if hasattr(self, 'search_dialog'):
+            self.search_dialog.close_search_engine()
+            self.main_window.pdf_viewer.currentHitChanged.disconnect(
+                self.search_dialog.on_current_hit_changed
+            )
+            self.main_window.documentOpened.disconnect(self.search_dialog.on_document_opened)
             self.search_dialog.close()
         print(f"插件 {self.name} 已清理")
         
@@ -0,0 +1,84 @@
+"""
+磁盘缓存测试
+"""
+
+import os
+
+from PIL import Image
+
+from pdf_viewer.disk_cache import DiskCache, get_document_key
+from pdf_viewer.page_image import PageImage
+from pdf_viewer.pdf_document import PDFDocument
+
+
+TEST_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_document.pdf")
+
+
+def make_image(width=4, height=3, color=(255, 0, 0)):
+    """创建纯色的PageImage"""
+    return PageImage.from_pil(Image.new('RGB', (width, height), color))
+
+
+def test_disk_cache_round_trip(tmp_path):
+    """写入后读取得到相同的像素，新的实例能找到已有的文件"""
+    page_image = make_image(5, 4, (10, 20, 30))
+    cache = DiskCache(str(tmp_path), max_bytes=1024 * 1024)
+    cache.put(('doc', 0), page_image)
+
+    cached = cache.get(('doc', 0))
+    assert cached.size() == (5, 4)
+    assert cached.stride == page_image.stride
+    assert bytes(cached.samples) == bytes(page_image.samples)
+    assert cache.get(('doc', 1)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    reopened = DiskCache(str(tmp_path), max_bytes=1024 * 1024)
+    assert len(reopened) == 1
+    assert bytes(reopened.get(('doc', 0)).samples) == bytes(page_image.samples)
+
+
+def test_document_key_changes_with_mtime(tmp_path):
+    """文件修改时间改变后文档标识改变，旧的缓存不再命中"""
+    path = tmp_path / "a.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    key = get_document_key(str(path))
+    assert get_document_key(str(path)) == key
+
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert get_document_key(str(path)) != key
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    """超过字节数上限时删除最久未使用的文件"""
+    page_image = make_image(10, 10)
+    cache = DiskCache(str(tmp_path), max_bytes=1024 * 1024)
+    cache.put('a', page_image)
+    entry_bytes = cache.current_bytes
+    cache.set_limit(entry_bytes * 2)
+
+    cache.put('b', page_image)
+    assert cache.get('a') is not None
+    cache.put('c', page_image)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.evictions == 1
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_disk_cache_not_written_on_gui_thread(tmp_path):
+    """只有write_disk_cache为True（渲染线程）时才写入磁盘缓存"""
+    document = PDFDocument(TEST_PDF)
+    try:
+        assert document.disk_cache is None  # 默认关闭
+        document.render_config.disk_cache = True
+        document.render_config.disk_cache_dir = str(tmp_path)
+        document.apply_render_config()
+
+        document.get_page(0, 1.0)
+        assert len(document.disk_cache) == 0
+        document.get_page(1, 1.0, write_disk_cache=True)
+        assert len(document.disk_cache) == 1
+    finally:
+        document.close()
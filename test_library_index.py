@@ -0,0 +1,92 @@
+"""
+文档库增量索引测试
+"""
+
+import os
+
+import fitz  # PyMuPDF
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+from pdf_viewer.library_index import LibraryIndex, LibraryIndexer, build_match_query, connect
+
+
+@pytest.fixture(scope="module")
+def app():
+    """QThread需要应用对象"""
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def write_pdf(path, pages, mtime_ns):
+    """写入每页文本已知的PDF并设置修改时间"""
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def update(root, db_path):
+    """执行一次增量索引，返回统计信息"""
+    connection = connect(db_path)
+    try:
+        return LibraryIndexer(str(root), db_path, num_workers=1).update_index(connection)
+    finally:
+        connection.close()
+
+
+def search_paths(db_path, query):
+    """返回包含查询的 (文件名, 页码)"""
+    index = LibraryIndex(db_path)
+    try:
+        return sorted((os.path.basename(r['path']), r['page']) for r in index.search(query))
+    finally:
+        index.close()
+
+
+def test_incremental_reindex(app, tmp_path):
+    """只重新索引新增或修改过的文件，删除已不存在的文件"""
+    root = tmp_path / "library"
+    (root / "sub").mkdir(parents=True)
+    db_path = str(tmp_path / "library.sqlite3")
+    write_pdf(root / "a.pdf", ["alpha apple", "beta banana"], 1_000_000_000)
+    write_pdf(root / "sub" / "b.pdf", ["gamma grape"], 1_000_000_000)
+    (root / "notes.txt").write_text("alpha")
+
+    stats = update(root, db_path)
+    assert (stats['files'], stats['indexed_files'], stats['indexed_pages']) == (2, 2, 3)
+    assert search_paths(db_path, "banana") == [("a.pdf", 1)]
+    assert search_paths(db_path, "gra") == [("b.pdf", 0)]
+
+    # 没有变化时不重新索引
+    stats = update(root, db_path)
+    assert (stats['indexed_files'], stats['removed_files']) == (0, 0)
+
+    # 修改过的文件替换旧的页面
+    write_pdf(root / "a.pdf", ["alpha cherry"], 2_000_000_000)
+    stats = update(root, db_path)
+    assert (stats['indexed_files'], stats['indexed_pages']) == (1, 1)
+    assert search_paths(db_path, "banana") == []
+    assert search_paths(db_path, "cherry") == [("a.pdf", 0)]
+    assert search_paths(db_path, "gamma") == [("b.pdf", 0)]
+
+    # 删除的文件从索引中移除
+    os.remove(root / "sub" / "b.pdf")
+    stats = update(root, db_path)
+    assert (stats['indexed_files'], stats['removed_files']) == (0, 1)
+    assert search_paths(db_path, "gamma") == []
+
+    index = LibraryIndex(db_path)
+    try:
+        assert index.get_stats(str(root)) == {'files': 1, 'pages': 1}
+    finally:
+        index.close()
+
+
+def test_build_match_query():
+    """每个词按前缀匹配，中日韩字符逐字分词，引号被转义"""
+    assert build_match_query("foo bar") == '"foo"* "bar"*'
+    assert build_match_query("全文索引") == '"全 文 索 引"*'
+    assert build_match_query('say "hi"') == '"say"* """hi"""*'
+    assert build_match_query("   ") == ""
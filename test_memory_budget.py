@@ -0,0 +1,35 @@
+"""
+内存预算测试
+"""
+
+from pdf_viewer.memory_budget import MemoryBudget
+from pdf_viewer.page_cache import PageCache
+
+
+def test_memory_budget_enforce_order():
+    """先释放离视口最远的页面，同距离先丢弃缓存副本，视口内的图像不释放"""
+    budget = MemoryBudget(100)
+    released = []
+    budget.set_visible_range(5, 5)
+    budget.track('pages', 5, 40, released.append)
+    budget.track('pages', 7, 20, released.append)
+    budget.track('pages', 9, 20, released.append)
+
+    cache = PageCache(max_pages=10, max_bytes=1000)
+    cache.put((9, 'cached'), 'image', 10)
+    cache.put((6, 'cached'), 'image', 10)
+    budget.set_caches(pages=cache)
+    assert budget.get_used_bytes() == 100
+    assert released == []
+
+    # 超出25字节：先丢弃第9页的缓存，再释放第9页的图像
+    budget.track('pages', 4, 25, released.append)
+    assert (9, 'cached') not in cache
+    assert released == [9]
+    assert budget.get_used_bytes() == 95
+
+    # 预算为0时只剩视口内的图像
+    budget.set_limit(0)
+    assert sorted(released) == [4, 7, 9]
+    assert len(cache) == 0
+    assert budget.get_used_bytes() == 40
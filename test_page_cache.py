@@ -0,0 +1,87 @@
+"""
+页面缓存测试
+"""
+
+import os
+
+from pdf_viewer.page_cache import PageCache
+from pdf_viewer.pdf_document import PDFDocument
+
+
+TEST_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_document.pdf")
+
+
+def test_page_cache_evicts_least_recently_used():
+    """超过页数上限时淘汰最久未使用的图像，读取会刷新使用顺序"""
+    cache = PageCache(max_pages=2, max_bytes=1000)
+    cache.put((0,), 'a', 10)
+    cache.put((1,), 'b', 10)
+    assert cache.get((0,)) == 'a'
+    cache.put((2,), 'c', 10)
+
+    assert (1,) not in cache
+    assert (0,) in cache and (2,) in cache
+    assert cache.evictions == 1
+    assert [key for key, _, _ in cache.get_entries()] == [(0,), (2,)]
+
+
+def test_page_cache_byte_limit():
+    """按字节数淘汰，单张超过上限的图像不缓存"""
+    cache = PageCache(max_pages=10, max_bytes=100)
+    cache.put((0,), 'a', 60)
+    cache.put((1,), 'b', 60)
+    assert (0,) not in cache
+    assert cache.current_bytes == 60
+
+    cache.put((2,), 'c', 200)
+    assert (2,) not in cache
+    assert cache.current_bytes == 60
+
+    # 替换同一个键时不重复计算字节数
+    cache.put((1,), 'b2', 40)
+    assert cache.current_bytes == 40
+
+    cache.set_limits(10, 30)
+    assert len(cache) == 0
+    assert cache.current_bytes == 0
+
+
+def test_page_cache_hit_miss_counters():
+    """命中、未命中统计；get_nbytes和in不影响统计"""
+    cache = PageCache(max_pages=10, max_bytes=1000)
+    cache.put((0,), 'a', 10)
+    cache.get((0,))
+    cache.get((0,))
+    cache.get((1,))
+    assert cache.get_nbytes((0,)) == 10
+    assert cache.get_nbytes((1,)) == 0
+    assert (1,) not in cache
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert stats['hit_rate'] == 2 / 3
+
+
+def test_apply_render_config_invalidates_caches():
+    """修改渲染设置后页面和图块缓存失效并使用新的限制，缩略图保留"""
+    document = PDFDocument(TEST_PDF)
+    try:
+        document.get_page(0, 1.0)
+        document.get_tile(0, 3.0, (0, 0))
+        document.get_thumbnail(0)
+        assert len(document.page_cache) == 1
+        assert len(document.tile_cache) == 1
+
+        document.render_config.max_cache_size = 7
+        document.render_config.use_antialiasing = False
+        document.apply_render_config()
+
+        assert len(document.page_cache) == 0
+        assert document.page_cache.current_bytes == 0
+        assert document.page_cache.max_pages == 7
+        assert len(document.tile_cache) == 0
+        assert len(document.thumbnail_cache) == 1
+        # 渲染标志改变后缓存键也不同
+        assert document.get_cached_page(0, 1.0) is None
+    finally:
+        document.close()
@@ -0,0 +1,113 @@
+"""
+页面几何信息表测试
+"""
+
+import fitz  # PyMuPDF
+import pytest
+
+from pdf_viewer.page_geometry import FIT_POLICY_MAX_WIDTH, PageGeometry, compute_offsets, rotate_box
+
+
+@pytest.fixture
+def mixed_pdf(tmp_path):
+    """大小混排的文档：A4、横向、旋转90度、带CropBox的页面"""
+    path = str(tmp_path / "mixed.pdf")
+    doc = fitz.open()
+    doc.new_page(width=595, height=842)
+    doc.new_page(width=842, height=595)
+    doc.new_page(width=612, height=792).set_rotation(90)
+    page = doc.new_page(width=600, height=800)
+    page.set_cropbox(fitz.Rect(50, 100, 450, 700))
+    doc.new_page(width=300, height=400).set_rotation(270)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def test_geometry_matches_page_rect(mixed_pdf):
+    """页面尺寸（已考虑旋转和CropBox）与page.rect一致"""
+    with fitz.open(mixed_pdf) as doc:
+        geometry = PageGeometry.from_document(doc)
+        assert geometry.is_complete()
+        for page in doc:
+            assert geometry.get_page_size(page.number) == pytest.approx((page.rect.width,
+                                                                          page.rect.height))
+        assert geometry.get_rotation(2) == 90
+        assert geometry.get_page_size(2) == pytest.approx((792, 612))
+        assert geometry.get_page_size(3) == pytest.approx((400, 600))
+        assert geometry.get_max_size() == pytest.approx((842, 842))
+
+
+def test_geometry_estimates_until_loaded(mixed_pdf):
+    """只读取第一页时其余页面按第一页估计，读取后更新"""
+    with fitz.open(mixed_pdf) as doc:
+        geometry = PageGeometry.for_document(doc)
+        assert not geometry.is_complete()
+        assert geometry.is_loaded(0) and not geometry.is_loaded(1)
+        assert geometry.get_page_size(1) == pytest.approx((595, 842))
+
+        geometry.load_pages(doc, 1, 3)
+        assert geometry.get_page_size(1) == pytest.approx((842, 595))
+        assert geometry.get_max_size() == pytest.approx((842, 842))
+
+        # 重复读取同一范围不会重复计数
+        geometry.load_pages(doc, 0, 3)
+        assert geometry.loaded_count == 3
+        geometry.load_pages(doc, 0, 100)
+        assert geometry.is_complete()
+        assert geometry.loaded_count == geometry.page_count
+
+
+def test_geometry_layout_and_fit(mixed_pdf):
+    """布局按每页的显示尺寸累加，适合宽度可按当前页面或最宽的页面"""
+    with fitz.open(mixed_pdf) as doc:
+        geometry = PageGeometry.from_document(doc)
+        sizes, offsets, max_width, total_height = geometry.compute_layout(0.5, 10)
+
+        assert sizes[1] == (421, 297)
+        assert sizes[2] == (396, 306)
+        assert offsets[0] == 0
+        assert offsets[1] == sizes[0][1] + 10
+        assert max_width == 421
+        assert total_height == sum(height for _, height in sizes) + 10 * (len(sizes) - 1)
+
+        assert geometry.get_fit_width_zoom(595, 0) == pytest.approx(1.0)
+        assert geometry.get_fit_width_zoom(842, 0, FIT_POLICY_MAX_WIDTH) == pytest.approx(1.0)
+        assert geometry.get_fit_page_zoom(842, 842, 1) == pytest.approx(1.0)
+
+
+def test_compute_offsets_empty():
+    """没有页面时总高度为0"""
+    assert compute_offsets([], 10) == ([], 0, 0)
+
+
+@pytest.mark.parametrize("rotation", [0, 90, 180, 270])
+def test_rotate_box_maps_search_hits_to_display(tmp_path, rotation):
+    """搜索结果（未旋转的页面坐标）转换后与page.rotation_matrix一致，并落在渲染出的文字上"""
+    path = str(tmp_path / "rotated.pdf")
+    doc = fitz.open()
+    page = doc.new_page(width=400, height=600)
+    page.insert_text((50, 100), "fox", fontsize=40)
+    page.set_rotation(rotation)
+    doc.save(path)
+    doc.close()
+
+    with fitz.open(path) as doc:
+        page = doc[0]
+        geometry = PageGeometry.from_document(doc)
+        width, height = geometry.get_page_size(0)
+        hit = page.search_for("fox")[0]
+        box = rotate_box(tuple(hit), geometry.get_rotation(0), width, height)
+        assert box == pytest.approx(tuple(hit * page.rotation_matrix))
+
+        # 渲染出的页面图像中，框内有文字像素，框外的对称位置没有
+        pix = page.get_pixmap()
+        assert (pix.width, pix.height) == (round(width), round(height))
+
+        def has_ink(x0, y0, x1, y1):
+            return any(pix.pixel(x, y)[0] < 128
+                       for x in range(int(x0), int(x1)) for y in range(int(y0), int(y1)))
+
+        assert has_ink(*box)
+        x0, y0, x1, y1 = box
+        assert not has_ink(width - x1, height - y1, width - x0, height - y0)
@@ -0,0 +1,134 @@
+"""
+翻页预取测试
+"""
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+from pdf_viewer import page_prefetcher
+from pdf_viewer.memory_budget import MemoryBudget
+from pdf_viewer.page_cache import PageCache
+from pdf_viewer.page_prefetcher import PagePrefetcher
+from pdf_viewer.render_config import RenderConfig
+from pdf_viewer.render_scheduler import PRIORITY_IDLE
+
+
+@pytest.fixture(scope="module")
+def app():
+    """预取定时器需要应用对象"""
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+class FakeScheduler:
+    """记录预取请求的渲染调度器"""
+
+    def __init__(self):
+        self.requests = []
+        self.cancelled = 0
+
+    def request(self, page_num, zoom_level, priority):
+        self.requests.append((page_num, zoom_level, priority))
+
+    def cancel_priority(self, priority):
+        assert priority == PRIORITY_IDLE
+        self.cancelled += 1
+
+
+class FakeDocument:
+    """只提供预取器需要的接口，请求过的页面视为已缓存"""
+
+    def __init__(self, scheduler, page_count=100):
+        self.render_config = RenderConfig()
+        self.page_cache = PageCache(50, 1024 * 1024 * 1024)
+        self.scheduler = scheduler
+        self.page_count = page_count
+
+    def get_page_count(self):
+        return self.page_count
+
+    def is_page_cached(self, page_num, zoom_level):
+        return (page_num, zoom_level, PRIORITY_IDLE) in self.scheduler.requests
+
+    def get_cached_page_nbytes(self, page_num, zoom_level):
+        return 1000
+
+
+class FakeClock:
+    """可控制的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def prefetcher(app, monkeypatch):
+    """使用假时钟、不受系统负载影响的预取器"""
+    clock = FakeClock()
+    monkeypatch.setattr(page_prefetcher, 'time', clock)
+    monkeypatch.setattr(page_prefetcher, 'get_cpu_load', lambda: None)
+    scheduler = FakeScheduler()
+    prefetcher = PagePrefetcher(FakeDocument(scheduler), scheduler, MemoryBudget(1 << 30))
+    prefetcher.clock = clock
+    yield prefetcher
+    prefetcher.cancel()
+
+
+def turn_pages(prefetcher, pages, interval=0.5):
+    """按固定间隔翻页，每次翻页后立即预取"""
+    for page_index in pages:
+        prefetcher.on_page_changed(page_index, 1.0)
+        prefetcher.prefetch()
+        prefetcher.clock.now += interval
+
+
+def requested_pages(prefetcher):
+    """按请求顺序返回预取的页码"""
+    return [page_num for page_num, _, _ in prefetcher.render_scheduler.requests]
+
+
+def test_prefetch_forward(prefetcher):
+    """向后翻页时预取后面的页面，预取过的页面计为命中"""
+    turn_pages(prefetcher, [10, 11, 12])
+    assert prefetcher.get_direction() == 1
+    assert prefetcher.lookahead == 3
+    assert requested_pages(prefetcher)[-3:] == [13, 14, 15]
+
+    turn_pages(prefetcher, [13])
+    assert (prefetcher.hits, prefetcher.misses) == (3, 0)
+    assert prefetcher.get_stats()['hit_rate'] == 1.0
+
+
+def test_prefetch_backward(prefetcher):
+    """向前翻页时预取前面的页面，不越过第一页"""
+    turn_pages(prefetcher, [5, 4, 3, 2])
+    assert prefetcher.get_direction() == -1
+    assert requested_pages(prefetcher)[-2:] == [1, 0]
+    assert -1 not in requested_pages(prefetcher)
+
+
+def test_prefetch_slow_reading_fetches_one_page(prefetcher):
+    """翻页很慢时只预取下一页"""
+    turn_pages(prefetcher, [10, 11], interval=20.0)
+    assert prefetcher.lookahead == 1
+
+
+def test_prefetch_jump_cancels(prefetcher):
+    """跳转时取消预取并重新学习方向，跳转不计入命中率"""
+    turn_pages(prefetcher, [20, 19, 18])
+    cancelled = prefetcher.render_scheduler.cancelled
+    prefetcher.on_page_changed(60, 1.0)
+
+    assert prefetcher.render_scheduler.cancelled > cancelled
+    assert [page_index for _, page_index in prefetcher.history] == [60]
+    assert prefetcher.get_direction() == 1
+    assert prefetcher.hits + prefetcher.misses == 2
+
+
+def test_prefetch_disabled(prefetcher):
+    """prefetch_pages为0时不预取"""
+    prefetcher.pdf_document.render_config.prefetch_pages = 0
+    turn_pages(prefetcher, [1, 2, 3])
+    assert requested_pages(prefetcher) == []
@@ -0,0 +1,107 @@
+"""
+逐页搜索选项测试
+"""
+
+import re
+
+import fitz  # PyMuPDF
+import pytest
+
+from pdf_viewer import parallel_search
+from pdf_viewer.parallel_search import ParallelSearchEngine, compile_pattern, search_page
+
+
+PAGES = [
+    "The quick brown fox jumps over the lazy dog.\nFoxes are quick; foxhounds are quicker.",
+    "Information retrieval, e.g. foo-bar (foo bar) jumps.\nThe Fox and the FOX.",
+    "Nothing to see here.",
+]
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """生成内容已知的测试文档"""
+    path = str(tmp_path / "search.pdf")
+    doc = fitz.open()
+    for text in PAGES:
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(72, 72, 540, 300), text)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.mark.parametrize("query, options, text, expected", [
+    ("fox", {}, "Fox fox FOX", ["Fox", "fox", "FOX"]),
+    ("fox", {'case_sensitive': True}, "Fox fox FOX", ["fox"]),
+    ("fox", {'whole_word': True}, "fox foxes firefox fox.", ["fox", "fox"]),
+    ("quick  brown", {}, "quick\nbrown", ["quick\nbrown"]),
+    ("a.c", {}, "abc a.c", ["a.c"]),
+    (r"fo+x?", {'regex': True}, "fo foo foox", ["fo", "foo", "foox"]),
+    (r"\d+", {'regex': True, 'whole_word': True}, "a1 22 b3", ["22"]),
+])
+def test_compile_pattern(query, options, text, expected):
+    """区分大小写、全字匹配和正则表达式选项"""
+    assert compile_pattern(query, **options).findall(text) == expected
+
+
+def test_compile_pattern_invalid_regex():
+    """正则语法错误时抛出re.error，非正则模式下按字面匹配"""
+    with pytest.raises(re.error):
+        compile_pattern("(", regex=True)
+    assert compile_pattern("(").search("a(b")
+
+
+def test_search_page_options(pdf_path):
+    """逐页搜索的各个选项"""
+    with fitz.open(pdf_path) as doc:
+        page = doc[1]
+        assert len(search_page(page, "fox")) == len(page.search_for("fox"))
+        assert [r['text'] for r in search_page(page, "fox", case_sensitive=True)] == []
+        assert [r['text'] for r in search_page(page, "FOX", case_sensitive=True)] == ["FOX"]
+
+        page = doc[0]
+        whole_word = search_page(page, "fox", whole_word=True)
+        assert [r['text'] for r in whole_word] == ["fox"]
+        regex = search_page(page, r"quick\w*", regex=True)
+        assert [r['text'] for r in regex] == ["quick", "quick", "quicker"]
+
+        # 短语可以跨行，boxes为每一行上的边界框
+        across = search_page(page, "dog. Foxes", case_sensitive=True)
+        assert len(across) == 1
+        assert len(across[0]['boxes']) == 2
+        for result in regex:
+            assert fitz.Rect(result['bbox']).contains(fitz.Rect(result['boxes'][0]))
+
+
+class SharedValue:
+    """代替multiprocessing.Value，在本进程中测试工作进程的函数"""
+
+    def __init__(self, value):
+        self.value = value
+
+
+def test_search_chunk_stops_when_search_is_abandoned(pdf_path, monkeypatch):
+    """搜索代数改变后，工作进程中的任务不再搜索剩余页面"""
+    generation = SharedValue(0)
+    with fitz.open(pdf_path) as doc:
+        monkeypatch.setattr(parallel_search, '_worker_doc', doc)
+        monkeypatch.setattr(parallel_search, '_worker_generation', generation)
+        chunk = (0, len(PAGES), "fox", {}, 0)
+        assert [page_num for page_num, _ in parallel_search._search_chunk(chunk)] == [0, 1, 2]
+
+        generation.value = 1
+        assert parallel_search._search_chunk(chunk) == []
+
+
+def test_engine_close_generator_abandons_pending_chunks(pdf_path):
+    """提前关闭生成器时放弃已提交的任务，同一个进程池可以继续搜索"""
+    with ParallelSearchEngine(pdf_path, num_workers=1, chunk_size=1) as engine:
+        results = engine.search("fox")
+        assert next(results)[0] == 0
+        results.close()
+        assert engine._generation.value == 1
+
+        pages = [page_num for page_num, hits in engine.search("fox") if hits]
+        assert pages == [0, 1]
+        assert engine._generation.value == 1
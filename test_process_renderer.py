@@ -0,0 +1,23 @@
+"""
+多进程渲染后端测试
+"""
+
+import os
+
+from pdf_viewer.pdf_document import PDFDocument
+from pdf_viewer.process_renderer import ProcessPoolRenderer
+
+
+TEST_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_document.pdf")
+
+
+def test_pool_image_matches_in_process_image():
+    """进程池与进程内渲染的图像尺寸一致（不按缩放分桶渲染）"""
+    document = PDFDocument(TEST_PDF)
+    try:
+        with ProcessPoolRenderer(TEST_PDF, num_workers=1) as renderer:
+            for zoom_level in (1.0, 1.1, 1.37):
+                pool_image = renderer.get_page_image(0, zoom_level)
+                assert pool_image.size == document.get_page_image(0, zoom_level).size
+    finally:
+        document.close()
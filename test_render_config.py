@@ -0,0 +1,29 @@
+"""
+渲染配置中缩放级别的量化和分桶测试
+"""
+
+from pdf_viewer.render_config import RenderConfig
+
+
+def test_get_zoom_bucket():
+    """缩放级别量化到三位小数，消除浮点误差"""
+    config = RenderConfig()
+    assert config.get_zoom_bucket(0.1 + 0.2) == config.get_zoom_bucket(0.3)
+    assert config.get_zoom_bucket(1.25 * 1.25 / 1.25) == 1.25
+    assert config.get_zoom_bucket(1.23456) == 1.235
+
+
+def test_snap_zoom():
+    """缩放分桶取不小于缩放级别的最近分桶，整数倍恰好是分桶"""
+    config = RenderConfig()
+    assert config.snap_zoom(1.0) == 1.0
+    assert config.snap_zoom(2.0) == 2.0
+    assert config.snap_zoom(0.5) == 0.5
+    assert config.snap_zoom(1.1) == round(2 ** (2 / 8), 6)
+    assert config.snap_zoom(1.1, -1) == round(2 ** (1 / 8), 6)
+    for zoom_level in (0.1, 0.33, 0.95, 1.25, 1.5625, 3.7, 5.0):
+        bucket = config.snap_zoom(zoom_level)
+        assert zoom_level <= bucket < zoom_level * 2 ** (1 / 8) + 1e-6
+
+    config.zoom_snapping = False
+    assert config.snap_zoom(1.1) == 1.1
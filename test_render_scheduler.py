@@ -0,0 +1,60 @@
+"""
+后台渲染调度器测试（不启动工作线程，直接调用take_job和finish_job）
+"""
+
+from pdf_viewer.render_scheduler import PRIORITY_PREFETCH, PRIORITY_VISIBLE, RenderScheduler
+
+
+def make_scheduler():
+    """创建调度器并记录发出的渲染结果"""
+    scheduler = RenderScheduler(None)
+    rendered = []
+    scheduler.pageRendered.connect(lambda page_num, zoom, image: rendered.append((page_num, image)))
+    return scheduler, rendered
+
+
+def test_request_deduplicates_and_raises_priority():
+    """重复请求不重复入队，更高优先级的请求先被取出"""
+    scheduler, _ = make_scheduler()
+    scheduler.request(0, 1.0, PRIORITY_PREFETCH)
+    scheduler.request(1, 1.0, PRIORITY_PREFETCH)
+    scheduler.request(1, 1.0, PRIORITY_VISIBLE)
+    scheduler.request(0, 1.0, PRIORITY_PREFETCH)
+    assert scheduler.queue_depth() == 2
+
+    assert scheduler.take_job().page_num == 1
+    assert scheduler.take_job().page_num == 0
+    assert scheduler.queue_depth() == 0
+
+
+def test_running_job_is_not_requested_twice():
+    """正在渲染的任务在同一代内不重新入队"""
+    scheduler, rendered = make_scheduler()
+    scheduler.request(0, 1.0)
+    job = scheduler.take_job()
+    scheduler.request(0, 1.0)
+    assert scheduler.queue_depth() == 0
+
+    scheduler.finish_job(job, 'image')
+    assert rendered == [(0, 'image')]
+
+
+def test_rerequest_after_cancel_all_requeues_running_job():
+    """cancel_all之前开始的任务结果被丢弃，重新请求时需要再次渲染"""
+    scheduler, rendered = make_scheduler()
+    scheduler.request(0, 1.0)
+    old_job = scheduler.take_job()
+
+    scheduler.cancel_all()
+    scheduler.request(0, 1.0)
+    assert scheduler.queue_depth() == 1
+    new_job = scheduler.take_job()
+
+    # 旧任务先完成：结果过期，也不影响新任务的去重
+    scheduler.finish_job(old_job, 'old')
+    assert rendered == []
+    scheduler.request(0, 1.0)
+    assert scheduler.queue_depth() == 0
+
+    scheduler.finish_job(new_job, 'new')
+    assert rendered == [(0, 'new')]
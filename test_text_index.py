@@ -0,0 +1,127 @@
+"""
+全文索引测试
+"""
+
+import os
+
+import fitz  # PyMuPDF
+import pytest
+
+from pdf_viewer.pdf_document import PDFDocument
+from pdf_viewer.text_index import TextIndex, trim_index_dir
+
+
+PAGES = [
+    "The quick brown fox jumps over the lazy dog.\nFoxes are quick; foxhounds are quicker.",
+    "Information retrieval, e.g. foo-bar (foo bar) jumps.\nThe Fox and the FOX.",
+    "Nothing to see here.",
+]
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """生成内容已知的测试文档"""
+    path = str(tmp_path / "search.pdf")
+    doc = fitz.open()
+    for text in PAGES:
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(72, 72, 540, 300), text)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def build_index(doc):
+    """为文档的所有页面建立全文索引"""
+    index = TextIndex(len(doc))
+    for page in doc:
+        index.add_page(page.number, page.get_text("words"))
+    return index
+
+
+def search_for(doc, query):
+    """逐页调用page.search_for，返回 [(页码, Rect)]"""
+    return [(page.number, rect) for page in doc for rect in page.search_for(query)]
+
+
+@pytest.mark.parametrize("query", [
+    "fox", "FOX", "ump", "quick", "o", "the", "quick brown", "ick bro", "the lazy dog", "missing"
+])
+def test_index_matches_search_for(pdf_path, query):
+    """索引的结果（页码、个数和位置）与page.search_for一致"""
+    with fitz.open(pdf_path) as doc:
+        index = build_index(doc)
+        assert index.can_search(query)
+        results = index.search(query)
+        expected = search_for(doc, query)
+
+        assert [result['page'] for result in results] == [page_num for page_num, _ in expected]
+        for result, (_, rect) in zip(results, expected):
+            # 边界框只包含匹配到的字符（按字符数估计），与search_for的结果重叠
+            assert result['bbox'].intersects(rect)
+            assert result['bbox'].width <= rect.width * 1.5 + 1
+
+
+def test_index_substring_box_is_narrowed(pdf_path):
+    """词中的子串只占词的一部分"""
+    with fitz.open(pdf_path) as doc:
+        index = build_index(doc)
+        result = index.search("ump")[0]
+        word_box = fitz.Rect(index.get_word_box(result['page'], 4))  # "jumps"
+        assert word_box.contains(result['bbox'])
+        assert result['bbox'].width < word_box.width
+
+
+def test_index_single_page(pdf_path):
+    """page_num限制在一页内搜索"""
+    with fitz.open(pdf_path) as doc:
+        index = build_index(doc)
+        assert {result['page'] for result in index.search("fox", page_num=1)} == {1}
+
+
+def test_punctuation_queries_fall_back_to_search_for(pdf_path):
+    """含标点的查询不由索引回答，结果与page.search_for一致"""
+    document = PDFDocument(pdf_path)
+    try:
+        document.text_index = build_index(document.doc)
+        for query in ("e.g.", "foo-bar", "retrieval,", "(foo bar)"):
+            assert not document.text_index.can_search(query)
+            results = document.search_text(query)
+            expected = search_for(document.doc, query)
+            assert [(r['page'], tuple(r['bbox'])) for r in results] == \
+                [(page_num, tuple(rect)) for page_num, rect in expected]
+    finally:
+        document.close()
+
+
+def test_index_save_and_load(pdf_path, tmp_path):
+    """索引保存为JSON，文档标识或页数不匹配时不加载"""
+    path = str(tmp_path / "index" / "doc.json")
+    with fitz.open(pdf_path) as doc:
+        index = build_index(doc)
+    index.save(path, "key")
+
+    loaded = TextIndex.load(path, len(PAGES), "key")
+    assert loaded.page_words == index.page_words
+    assert [r['page'] for r in loaded.search("fox")] == [r['page'] for r in index.search("fox")]
+    assert TextIndex.load(path, len(PAGES), "other") is None
+    assert TextIndex.load(path, len(PAGES) + 1, "key") is None
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("not json")
+    assert TextIndex.load(path, len(PAGES), "key") is None
+
+
+def test_trim_index_dir_removes_least_recently_used(tmp_path):
+    """索引目录超过上限时按修改时间删除最久未使用的索引，保留刚保存的索引"""
+    for i, name in enumerate(["a.json", "b.json", "c.json", "notes.txt"]):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 100)
+        os.utime(path, ns=((i + 1) * 1_000_000_000, (i + 1) * 1_000_000_000))
+
+    trim_index_dir(str(tmp_path), 250)
+    assert sorted(os.listdir(tmp_path)) == ["b.json", "c.json", "notes.txt"]
+
+    # 刚保存的索引即使最旧也不删除
+    trim_index_dir(str(tmp_path), 100, keep=str(tmp_path / "b.json"))
+    assert sorted(os.listdir(tmp_path)) == ["b.json", "notes.txt"]
@@ -0,0 +1,77 @@
+"""
+缩放控制器测试
+"""
+
+import pytest
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from pdf_viewer.zoom_controller import ZoomController
+
+
+@pytest.fixture(scope="module")
+def app():
+    """QTimer需要事件循环"""
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def wait(app, milliseconds):
+    """运行事件循环一段时间"""
+    loop = QEventLoop()
+    QTimer.singleShot(milliseconds, loop.quit)
+    loop.exec_()
+
+
+def test_zoom_controller_coalesces_requests(app):
+    """连续的缩放请求立即预览，输入停止后只提交一次"""
+    controller = ZoomController(1.0, delay=20)
+    changed = []
+    committed = []
+    controller.zoomChanged.connect(lambda zoom, previous: changed.append((zoom, previous)))
+    controller.zoomCommitted.connect(committed.append)
+
+    for _ in range(5):
+        controller.zoom_by(1.25)
+    assert len(changed) == 5
+    assert changed[0] == (1.25, 1.0)
+    assert controller.is_pending()
+    assert committed == []
+
+    wait(app, 100)
+    assert committed == [pytest.approx(1.25 ** 5)]
+    assert not controller.is_pending()
+
+
+def test_zoom_controller_zoom_in_and_out_commits(app):
+    """延迟内放大又缩小回到已提交的级别时仍然提交，使视图撤销预览"""
+    controller = ZoomController(1.0, delay=20)
+    committed = []
+    controller.zoomCommitted.connect(committed.append)
+
+    controller.zoom_by(1.25)
+    controller.zoom_by(1 / 1.25)
+    assert controller.zoom_level == pytest.approx(controller.committed_zoom)
+
+    wait(app, 100)
+    assert committed == [pytest.approx(1.0)]
+
+    # 没有新的预览时不重复提交
+    controller.commit()
+    assert len(committed) == 1
+
+
+def test_zoom_controller_clamps_and_resets(app):
+    """缩放级别限制在范围内；reset后不再提交"""
+    controller = ZoomController(1.0, min_zoom=0.5, max_zoom=2.0, delay=20)
+    committed = []
+    controller.zoomCommitted.connect(committed.append)
+
+    controller.request_zoom(10.0)
+    assert controller.zoom_level == 2.0
+    controller.commit()
+    assert committed == [2.0]
+
+    controller.request_zoom(1.5)
+    controller.reset(0.75)
+    wait(app, 60)
+    assert committed == [2.0]
+    assert controller.zoom_level == controller.committed_zoom == 0.75